@@ -0,0 +1,510 @@
+"""
+Synthetic-Scale Benchmark for Prompt Building and Report Formatting
+
+Times the all-Python formatting paths of both report generators on synthetic
+inputs at multiples of current production size, and reports wall time and peak
+memory (tracemalloc) for each:
+
+    - LLMAnalyzer._prepare_data_summary     (generate_capacity_summary.py)
+    - CapacityReportGenerator._format_report (generate_capacity_summary.py)
+      (both time building the ReportDataset from the query rows as well)
+    - LLMAnalyzer._prepare_data_summary     (generate_sga_weekly_report.py)
+    - SGAWeeklyReportGenerator._unpack_dispositions (generate_sga_weekly_report.py,
+      on a synthetic Query H result; output is the number of SGA entries)
+
+No BigQuery or LLM calls are made. The "growth" column is the time ratio against
+the previous scale divided by the scale ratio: ~1.0 means linear growth, values
+well above 1.0 flag a path that grows superlinearly with headcount.
+
+Usage:
+    python benchmark_report_formatting.py [--scales 1 10 100] [--repeat 3] [--seed 42]
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import generate_capacity_summary as capacity
+import generate_sga_weekly_report as sga_weekly
+from report_dataset import ReportDataset
+
+# Approximate production size at 1x (from recent reports)
+BASE_SGMS = 10
+BASE_SGAS = 15
+BASE_OPEN_DEALS = 125
+BASE_CHANNELS = 8
+BASE_SOURCES = 25
+BASE_DISPOSITIONS = 12
+
+CURRENT_PERIOD = 'Current Quarter / Last 90 Days'
+L12M_PERIOD = 'Last 12 Months'
+STAGES = ['Discovery', 'Qualifying', 'Sales Process', 'Negotiating', 'Signed']
+COVERAGE_STATUSES = ['On Ramp', 'Sufficient', 'At Risk', 'Under-Capacity']
+TRENDS = ['Improving', 'Declining', 'Stable']
+
+
+def build_capacity_inputs(scale: int, rng: random.Random) -> Dict:
+    """Synthetic keyword arguments for the capacity ReportDataset"""
+    sgm_names = [f"SGM {i:04d}" for i in range(BASE_SGMS * scale)]
+    sga_names = [f"SGA {i:04d}" for i in range(BASE_SGAS * scale)]
+    channels = [f"Channel {i:03d}" for i in range(BASE_CHANNELS * scale)]
+    sources = [f"Source {i:04d}" for i in range(BASE_SOURCES * scale)]
+    num_deals = BASE_OPEN_DEALS * scale
+
+    sgm_coverage_data = []
+    sgm_risk_data = []
+    quarterly_forecast_data = []
+    forecast_velocity_data = []
+    what_if_analysis_data = []
+    concentration_data = []
+    stage_dist_data = []
+    for name in sgm_names:
+        capacity_estimate = rng.uniform(5, 60)
+        qtr_actuals = rng.uniform(0, 40)
+        expected_end = qtr_actuals + rng.uniform(0, 20)
+        expected_next = rng.uniform(5, 45)
+        required_sqos = rng.randint(24, 56)
+        sgm_coverage_data.append({
+            'sgm_name': name,
+            'coverage_status': rng.choice(COVERAGE_STATUSES),
+            'coverage_ratio_estimate': capacity_estimate / 36.75,
+            'capacity_estimate': capacity_estimate,
+            'capacity_gap_millions_estimate': 36.75 - capacity_estimate,
+            'active_sqo_count': rng.randint(0, 30),
+            'stale_sqo_count': rng.randint(0, 10),
+            'current_quarter_actual_joined_aum_millions': qtr_actuals,
+        })
+        sgm_risk_data.append({
+            'sgm_name': name,
+            'quarterly_target_status': rng.choice(['On Track', 'Behind', 'At Risk']),
+            'stale_pct': rng.uniform(0, 60),
+            'sqo_gap_count': rng.randint(-10, 30),
+            'required_sqos_per_quarter': required_sqos,
+            'required_joined_per_quarter': rng.randint(2, 6),
+            'current_pipeline_sqo_count': rng.randint(0, 40),
+            'current_quarter_sqo_count': rng.randint(0, 50),
+            'pipeline_estimate_m': rng.uniform(10, 200),
+            'weighted_pipeline_m': rng.uniform(5, 80),
+            'qtr_actuals_m': qtr_actuals,
+        })
+        quarterly_forecast_data.append({
+            'sgm_name': name,
+            'current_quarter_actuals': qtr_actuals,
+            'expected_end_of_quarter': expected_end,
+            'expected_next_quarter': expected_next,
+            'pipeline_forecast_this_quarter': expected_end - qtr_actuals,
+            'pipeline_forecast_next_quarter': expected_next,
+            'coverage_status': rng.choice(COVERAGE_STATUSES),
+        })
+        forecast_velocity_data.append({
+            'sgm_name': name,
+            'current_qtr_velocity_forecast': rng.uniform(0, 30),
+            'overdue_slip_forecast': rng.uniform(0, 10),
+            'next_qtr_velocity_forecast': rng.uniform(0, 40),
+            'overdue_deal_count': rng.randint(0, 8),
+            'next_qtr_deal_count': rng.randint(0, 15),
+            'total_pipeline_value': rng.uniform(10, 200),
+        })
+        current_gap = max(0.0, 36.75 - expected_end)
+        next_gap = max(0.0, 36.75 - expected_next)
+        what_if_analysis_data.append({
+            'sgm_name': name,
+            'current_qtr_gap_millions': current_gap,
+            'next_qtr_gap_millions': next_gap,
+            'expected_end_of_quarter': expected_end,
+            'expected_next_quarter': expected_next,
+            'joined_needed_current_qtr': round(current_gap / 11.35),
+            'joined_needed_next_qtr': round(next_gap / 11.35),
+            'sqos_needed_current_qtr': round(current_gap / 11.35 / 0.1004),
+            'sqos_needed_next_qtr': round(next_gap / 11.35 / 0.1004),
+            'sqls_needed_current_qtr': round(current_gap / 11.35 / 0.1004 / 0.6),
+            'sqls_needed_next_qtr': round(next_gap / 11.35 / 0.1004 / 0.6),
+            'sql_to_sqo_conversion_rate': rng.uniform(0.4, 0.8),
+            'effective_avg_margin_aum_per_joined': 11.35,
+            'effective_sqo_to_joined_conversion_rate': 0.1004,
+        })
+        max_deal_val = rng.uniform(5, 50)
+        total_pipeline_val = max_deal_val + rng.uniform(10, 150)
+        concentration_data.append({
+            'sgm_name': name,
+            'top_deal_concentration_pct': max_deal_val / total_pipeline_val,
+            'largest_deal_name': f"Deal for {name}",
+            'max_deal_val': max_deal_val,
+            'total_pipeline_val': total_pipeline_val,
+        })
+        for stage in STAGES:
+            stage_dist_data.append({
+                'sgm_name': name,
+                'StageName': stage,
+                'stage_value_m': rng.uniform(0, 40),
+            })
+
+    deals_data = [{
+        'opportunity_name': f"Opportunity {i:06d}",
+        'sgm_name': rng.choice(sgm_names),
+        'StageName': rng.choice(STAGES),
+        'estimated_margin_aum_m': rng.uniform(1, 60),
+        'days_open_since_sqo': rng.randint(1, 400),
+        'is_stale': rng.choice(['Yes', 'No']),
+    } for i in range(num_deals)]
+    deals_data.sort(key=lambda d: d['estimated_margin_aum_m'], reverse=True)
+
+    def conversion_row(metric_type: str, dimension_value: str, period: str) -> Dict:
+        sql_denom = rng.randint(10, 500)
+        sql_num = rng.randint(0, sql_denom)
+        sqo_denom = rng.randint(5, 200)
+        sqo_num = rng.randint(0, sqo_denom)
+        return {
+            'metric_type': metric_type,
+            'dimension_value': dimension_value,
+            'period': period,
+            'sql_to_sqo_rate': sql_num / sql_denom,
+            'sql_to_sqo_num': sql_num,
+            'sql_to_sqo_denom': sql_denom,
+            'sqo_to_joined_rate': sqo_num / sqo_denom,
+            'sqo_to_joined_num': sqo_num,
+            'sqo_to_joined_denom': sqo_denom,
+        }
+
+    conversion_rates_data = []
+    for period in (CURRENT_PERIOD, L12M_PERIOD):
+        conversion_rates_data.append(conversion_row('Overall', 'Overall', period))
+        conversion_rates_data.extend(conversion_row('Channel', c, period) for c in channels)
+        conversion_rates_data.extend(conversion_row('Source', s, period) for s in sources)
+
+    conversion_trends_data = []
+    for source in sources:
+        current_sql_sqo = rng.uniform(0.3, 0.9)
+        l12m_sql_sqo = rng.uniform(0.3, 0.9)
+        current_sqo_joined = rng.uniform(0.02, 0.2)
+        l12m_sqo_joined = rng.uniform(0.02, 0.2)
+        conversion_trends_data.append({
+            'channel': rng.choice(channels),
+            'source': source,
+            'current_qtr_sql_to_sqo_rate': current_sql_sqo,
+            'l12m_sql_to_sqo_rate': l12m_sql_sqo,
+            'sql_to_sqo_rate_change': current_sql_sqo - l12m_sql_sqo,
+            'current_qtr_sqo_to_joined_rate': current_sqo_joined,
+            'l12m_sqo_to_joined_rate': l12m_sqo_joined,
+            'sqo_to_joined_rate_change': current_sqo_joined - l12m_sqo_joined,
+            'current_qtr_sql_volume': rng.randint(0, 80),
+            'avg_l12m_sql_volume_per_quarter': rng.uniform(0, 80),
+        })
+
+    sga_conversion_rates_data = []
+    for name in sga_names:
+        row = {'sga_name': name,
+               'current_qtr_sql_volume': rng.randint(0, 40),
+               'current_qtr_sqo_volume': rng.randint(0, 20)}
+        for stage_rate in ('contacted_to_mql', 'mql_to_sql', 'sql_to_sqo'):
+            current_rate = rng.uniform(0.02, 0.8)
+            l12m_rate = rng.uniform(0.02, 0.8)
+            row[f'current_qtr_{stage_rate}_rate'] = current_rate
+            row[f'l12m_{stage_rate}_rate'] = l12m_rate
+            row[f'{stage_rate}_rate_change'] = current_rate - l12m_rate
+        sga_conversion_rates_data.append(row)
+
+    firm_summary = {
+        'total_sgms': len(sgm_names),
+        'total_target': 36.75 * len(sgm_names),
+        'total_quarter_actuals': sum(s['qtr_actuals_m'] for s in sgm_risk_data),
+        'total_required_sqos': sum(s['required_sqos_per_quarter'] for s in sgm_risk_data),
+        'total_current_sqos': sum(s['current_pipeline_sqo_count'] for s in sgm_risk_data),
+        'total_stale_sqos': sum(s['stale_sqo_count'] for s in sgm_coverage_data),
+        'total_stale_pipeline_estimate': sum(d['estimated_margin_aum_m'] for d in deals_data if d['is_stale'] == 'Yes'),
+        'total_pipeline_estimate': sum(d['estimated_margin_aum_m'] for d in deals_data),
+    }
+    coverage_summary = {
+        'total_capacity': sum(s['capacity_estimate'] for s in sgm_coverage_data),
+        'avg_coverage_ratio': statistics.mean(s['coverage_ratio_estimate'] for s in sgm_coverage_data),
+        'on_ramp_count': sum(1 for s in sgm_coverage_data if s['coverage_status'] == 'On Ramp'),
+        'sufficient_count': sum(1 for s in sgm_coverage_data if s['coverage_status'] == 'Sufficient'),
+        'at_risk_count': sum(1 for s in sgm_coverage_data if s['coverage_status'] == 'At Risk'),
+        'under_capacity_count': sum(1 for s in sgm_coverage_data if s['coverage_status'] == 'Under-Capacity'),
+    }
+
+    return {
+        'firm_summary': firm_summary,
+        'coverage_summary': coverage_summary,
+        'sgm_coverage_data': sgm_coverage_data,
+        'sgm_risk_data': sgm_risk_data,
+        'deals_data': deals_data,
+        'conversion_rates_data': conversion_rates_data,
+        'conversion_trends_data': conversion_trends_data,
+        'sga_conversion_rates_data': sga_conversion_rates_data,
+        'quarterly_forecast_data': quarterly_forecast_data,
+        'forecast_velocity_data': forecast_velocity_data,
+        'what_if_analysis_data': what_if_analysis_data,
+        'concentration_data': concentration_data,
+        'stage_dist_data': stage_dist_data,
+    }
+
+
+def build_sga_inputs(scale: int, rng: random.Random) -> Dict:
+    """Synthetic keyword arguments for the SGA weekly _prepare_data_summary"""
+    sga_names = [f"SGA {i:04d}" for i in range(BASE_SGAS * scale)]
+    sgm_names = [f"SGM {i:04d}" for i in range(BASE_SGMS * scale)]
+    dispositions = [f"Disposition {i:02d}" for i in range(BASE_DISPOSITIONS)]
+    today = datetime(2025, 11, 20).date()
+
+    def recent_date(max_days: int) -> str:
+        return (today - timedelta(days=rng.randint(0, max_days))).strftime('%Y-%m-%d')
+
+    def upcoming_date() -> str:
+        return (today + timedelta(days=rng.randint(1, 7))).strftime('%Y-%m-%d')
+
+    def disposition_counts() -> Dict[str, int]:
+        return {d: rng.randint(1, 30) for d in rng.sample(dispositions, rng.randint(3, len(dispositions)))}
+
+    qtd_leaderboard = []
+    activity_data = []
+    contacting_activity = []
+    conversion_trends = []
+    disposition_analysis = []
+    initial_calls_last7 = []
+    initial_calls_next7 = []
+    qual_calls_last7 = []
+    qual_calls_next7 = []
+    team_mql_dispositions = disposition_counts()
+    team_sql_dispositions = disposition_counts()
+    for name in sga_names:
+        qtd_sqos = rng.randint(0, 15)
+        qtd_leaderboard.append({
+            'sga_name': name,
+            'ramp_status': rng.choice(['Ramped', 'On Ramp']),
+            'days_since_creation': rng.randint(10, 900),
+            'sga_created_date': recent_date(900),
+            'sqo_goal': 9,
+            'qtd_sqos': qtd_sqos,
+            'pct_of_goal': qtd_sqos / 9 * 100,
+            'last_7_days_sqos': rng.randint(0, 3),
+            'sga_type': rng.choice(['Outbound', 'Inbound']),
+            'sqo_list': [{'advisor_name': f"Advisor {name}-{i}", 'sqo_date': recent_date(60), 'sga_name': name}
+                         for i in range(qtd_sqos)],
+        })
+        activity_data.append({
+            'sga_name': name,
+            'trailing_initial_calls': rng.randint(0, 10),
+            'upcoming_initial_calls': rng.randint(0, 10),
+            'trailing_qual_calls': rng.randint(0, 5),
+            'upcoming_qual_calls': rng.randint(0, 5),
+        })
+        contacting_activity.append({
+            'sga_name': name,
+            'avg_weekly_contacted_90d': rng.uniform(20, 120),
+            'contacted_last_7d': rng.randint(0, 150),
+            'comparison_status': rng.choice(['Above Average', 'Below Average', 'On Par']),
+        })
+        trend_row = {'sga_name': name}
+        for stage_rate in ('contacted_to_mql', 'mql_to_sql', 'sql_to_sqo'):
+            trend_row[f'{stage_rate}_90d'] = rng.uniform(0.02, 0.8)
+            trend_row[f'{stage_rate}_lifetime'] = rng.uniform(0.02, 0.8)
+            trend_row[f'{stage_rate}_trend'] = rng.choice(TRENDS)
+        conversion_trends.append(trend_row)
+        disposition_analysis.append({
+            'sga_name': name,
+            'mql_dispositions_90d': disposition_counts(),
+            'mql_dispositions_lifetime': disposition_counts(),
+            'mql_dispositions_team': team_mql_dispositions,
+            'sql_dispositions_90d': disposition_counts(),
+            'sql_dispositions_lifetime': disposition_counts(),
+            'sql_dispositions_team': team_sql_dispositions,
+        })
+        for i in range(rng.randint(0, 5)):
+            initial_calls_last7.append({'sga_name': name, 'advisor_name': f"Prospect {name}-{i}",
+                                        'call_date': recent_date(7)})
+        for i in range(rng.randint(0, 5)):
+            initial_calls_next7.append({'sga_name': name, 'prospect_name': f"Prospect {name}-n{i}",
+                                        'call_date': upcoming_date()})
+        for i in range(rng.randint(0, 3)):
+            qual_calls_last7.append({'sga_name': name, 'advisor_name': f"Advisor {name}-q{i}",
+                                     'call_date': recent_date(7), 'sgm_name': rng.choice(sgm_names)})
+        for i in range(rng.randint(0, 3)):
+            qual_calls_next7.append({'sga_name': name, 'advisor_name': f"Advisor {name}-qn{i}",
+                                     'call_date': upcoming_date(), 'sgm_name': rng.choice(sgm_names)})
+
+    lost_reasons = []
+    for disposition in dispositions:
+        breakdown = [{'sga_name': name, 'count': rng.randint(1, 20)}
+                     for name in rng.sample(sga_names, min(len(sga_names), 5))]
+        breakdown.sort(key=lambda b: b['count'], reverse=True)
+        lost_reasons.append({'disposition': disposition,
+                             'count': sum(b['count'] for b in breakdown),
+                             'sga_breakdown': breakdown})
+
+    channel_source_data = [{
+        'channel_grouping': f"Channel {i % (BASE_CHANNELS * scale):03d}",
+        'original_source': f"Source {i:04d}",
+        'sqo_rate_90d': rng.uniform(0, 0.2),
+        'sqo_rate_365d': rng.uniform(0, 0.2),
+    } for i in range(BASE_SOURCES * scale)]
+
+    return {
+        'qtd_leaderboard': qtd_leaderboard,
+        'activity_data': activity_data,
+        'conversion_trends': conversion_trends,
+        'lost_reasons': lost_reasons,
+        'channel_source_data': channel_source_data,
+        'initial_calls_last7': initial_calls_last7,
+        'initial_calls_next7': initial_calls_next7,
+        'qual_calls_last7': qual_calls_last7,
+        'qual_calls_next7': qual_calls_next7,
+        'contacting_activity': contacting_activity,
+        'team_conversion_rates': {
+            'contacted_to_mql_90d': rng.uniform(0.02, 0.2),
+            'mql_to_sql_90d': rng.uniform(0.2, 0.6),
+            'sql_to_sqo_90d': rng.uniform(0.4, 0.8),
+        },
+        'disposition_analysis': disposition_analysis,
+        'current_date': today.strftime('%Y-%m-%d'),
+        'current_quarter_start': '2025-10-01',
+        'current_year': today.year,
+    }
+
+
+def build_disposition_frame(scale: int, rng: random.Random) -> Dict:
+    """Synthetic Query H result (tagged disposition counts) for _unpack_dispositions"""
+    import pandas as pd
+
+    sga_names = [f"SGA {i:04d}" for i in range(BASE_SGAS * scale)]
+    dispositions = [f"Disposition {i:02d}" for i in range(BASE_DISPOSITIONS)]
+
+    def count_rows(scope: str, sga_name, funnel_stage: str, time_window: str) -> List[Dict]:
+        chosen = rng.sample(dispositions, rng.randint(3, len(dispositions)))
+        rows = [{'scope': scope, 'sga_name': sga_name, 'funnel_stage': funnel_stage,
+                 'time_window': time_window, 'disposition': d, 'count': rng.randint(1, 30)} for d in chosen]
+        return sorted(rows, key=lambda row: row['count'], reverse=True)
+
+    rows = []
+    for name in sga_names:
+        rows.append({'scope': 'roster', 'sga_name': name, 'funnel_stage': None,
+                     'time_window': None, 'disposition': None, 'count': None})
+        for funnel_stage in ('mql', 'sql'):
+            for time_window in ('90d', 'lifetime'):
+                rows.extend(count_rows('sga', name, funnel_stage, time_window))
+    for funnel_stage in ('mql', 'sql'):
+        rows.extend(count_rows('team', None, funnel_stage, '90d'))
+
+    df = pd.DataFrame(rows)
+    df['count'] = df['count'].astype('Int64')
+    return {'disposition_df': df}
+
+
+def measure(func: Callable[[], str], repeat: int) -> Dict:
+    """Median wall time over `repeat` runs, plus peak traced memory of one extra run"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func()
+        timings.append(time.perf_counter() - start)
+
+    # Measured separately: tracemalloc slows allocation-heavy code considerably
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_s': statistics.median(timings),
+        'peak_bytes': peak,
+        'output_chars': len(output),
+    }
+
+
+def build_benchmarks() -> List[tuple]:
+    """(name, input builder, runner) for every benchmarked formatting path"""
+    # The formatting methods only read their arguments, so skip provider setup in __init__
+    capacity_analyzer = capacity.LLMAnalyzer.__new__(capacity.LLMAnalyzer)
+    capacity_generator = capacity.CapacityReportGenerator.__new__(capacity.CapacityReportGenerator)
+    capacity_generator.project_id = "benchmark-project"
+    capacity_generator.dataset = "savvy_analytics"
+    sga_analyzer = sga_weekly.LLMAnalyzer.__new__(sga_weekly.LLMAnalyzer)
+    sga_generator = sga_weekly.SGAWeeklyReportGenerator.__new__(sga_weekly.SGAWeeklyReportGenerator)
+
+    return [
+        ("capacity._prepare_data_summary", build_capacity_inputs,
+         lambda inputs: capacity_analyzer._prepare_data_summary(ReportDataset(**inputs))),
+        ("capacity._format_report", build_capacity_inputs,
+         lambda inputs: capacity_generator._format_report(ReportDataset(**inputs),
+                                                          llm_analysis="(LLM analysis placeholder)")),
+        ("sga_weekly._prepare_data_summary", build_sga_inputs,
+         lambda inputs: sga_analyzer._prepare_data_summary(**inputs)),
+        ("sga_weekly._unpack_dispositions", build_disposition_frame,
+         lambda inputs: sga_generator._unpack_dispositions(**inputs)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark prompt building and report formatting on synthetic data'
+    )
+    parser.add_argument(
+        '--scales',
+        type=int,
+        nargs='+',
+        default=[1, 10, 100],
+        help='Multiples of current size to benchmark (default: 1 10 100)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Timed runs per scale; the median is reported (default: 3)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Random seed for the synthetic data (default: 42)'
+    )
+
+    args = parser.parse_args()
+    scales = sorted(set(args.scales))
+
+    print(f"Base size (1x): {BASE_SGMS} SGMs, {BASE_SGAS} SGAs, {BASE_OPEN_DEALS} open deals, "
+          f"{BASE_CHANNELS} channels, {BASE_SOURCES} sources")
+    print(f"Scales: {', '.join(f'{s}x' for s in scales)} | repeat={args.repeat}\n")
+
+    header = f"{'Path':<34} {'Scale':>6} {'Time (ms)':>11} {'Peak mem':>10} {'Output':>10} {'Growth':>7}"
+    print(header)
+    print("-" * len(header))
+
+    superlinear = []
+    for name, build_inputs, run in build_benchmarks():
+        previous = None
+        for scale in scales:
+            inputs = build_inputs(scale, random.Random(args.seed))
+            result = measure(lambda: run(inputs), args.repeat)
+
+            growth = ""
+            if previous is not None and previous['time_s'] > 0:
+                growth_factor = (result['time_s'] / previous['time_s']) / (scale / previous['scale'])
+                growth = f"{growth_factor:.2f}"
+                if growth_factor > 1.5:
+                    superlinear.append(f"{name} ({previous['scale']}x -> {scale}x: {growth_factor:.2f})")
+
+            print(f"{name:<34} {f'{scale}x':>6} {result['time_s'] * 1000:>11.1f} "
+                  f"{capacity.format_bytes(result['peak_bytes']):>10} "
+                  f"{result['output_chars']:>10,} {growth:>7}")
+            previous = dict(result, scale=scale)
+        print()
+
+    print("Growth = (time ratio) / (scale ratio) vs the previous scale; ~1.0 is linear.")
+    if superlinear:
+        print("\nSuperlinear paths (growth > 1.5):")
+        for entry in superlinear:
+            print(f"  - {entry}")
+    else:
+        print("\nNo superlinear growth detected.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
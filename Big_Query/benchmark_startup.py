@@ -0,0 +1,240 @@
+"""
+Cold-Start Benchmark for the Capacity Report Cloud Function
+
+Every run starts a fresh Python interpreter (like a Cloud Function cold start) and
+measures:
+
+    - import generate_capacity_summary
+    - import cloud_function_main
+    - which heavy dependencies those imports pulled in (they should all be lazy)
+    - first-request latency, split into generator setup (BigQuery client and LLM
+      provider SDK) and report generation
+
+The first request needs data: with --replay-fixtures it runs offline on fixtures
+recorded with --record-fixtures (the LLM call is still made unless --llm-cache points
+at a response cache that already holds the analysis); with --live it goes through the
+Cloud Function entry point against BigQuery and the LLM. Without either, only the
+generator setup is timed.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--llm-provider gemini]
+                                [--replay-fixtures DIR [--llm-cache PATH] | --live]
+                                [--importtime]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Dependencies that should not be imported until a request needs them
+HEAVY_MODULES = [
+    'pandas',
+    'pyarrow',
+    'google.cloud.bigquery',
+    'google.cloud.bigquery_storage',
+    'openai',
+    'anthropic',
+    'google.generativeai',
+    'requests',
+]
+
+RESULT_PREFIX = "BENCHMARK_RESULT "
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def child_run(options: Dict) -> Dict:
+    """One cold start, measured inside the fresh interpreter"""
+    timings = {}
+
+    start = time.perf_counter()
+    import generate_capacity_summary
+    timings['import_generate_capacity_summary_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import cloud_function_main
+    timings['import_cloud_function_main_s'] = time.perf_counter() - start
+
+    result = {
+        'timings': timings,
+        'modules_after_import': len(sys.modules),
+        'heavy_modules_after_import': [name for name in HEAVY_MODULES if name in sys.modules],
+        'first_request_error': None,
+    }
+
+    try:
+        if options['live']:
+            class Request:
+                method = 'POST'
+                args = {}
+
+                def get_json(self, silent=True):
+                    return {'llm_provider': options['llm_provider']}
+
+            start = time.perf_counter()
+            body, status, _ = cloud_function_main.generate_capacity_report(Request())
+            timings['first_request_s'] = time.perf_counter() - start
+            if status != 200:
+                result['first_request_error'] = json.loads(body).get('error')
+        else:
+            start = time.perf_counter()
+            bq_client = None
+            if options['replay_fixtures']:
+                bq_client = generate_capacity_summary.ReplayBigQueryClient(options['replay_fixtures'])
+            generator = generate_capacity_summary.CapacityReportGenerator(
+                project_id=options['project_id'],
+                llm_provider=options['llm_provider'],
+                bq_client=bq_client,
+                llm_cache_path=options['llm_cache']
+            )
+            timings['generator_setup_s'] = time.perf_counter() - start
+
+            if bq_client is not None:
+                start = time.perf_counter()
+                generator.generate_report(output_file=None)
+                timings['report_generation_s'] = time.perf_counter() - start
+                timings['first_request_s'] = timings['generator_setup_s'] + timings['report_generation_s']
+    except Exception as e:
+        result['first_request_error'] = f"{type(e).__name__}: {e}"
+
+    result['heavy_modules_after_request'] = [name for name in HEAVY_MODULES if name in sys.modules]
+    return result
+
+
+def run_cold_start(options: Dict) -> Dict:
+    """Run child_run in a new interpreter and return its result"""
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', json.dumps(options)],
+        cwd=SCRIPT_DIR, capture_output=True, text=True
+    )
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"Benchmark run failed:\n{process.stdout[-2000:]}\n{process.stderr[-2000:]}")
+
+
+def print_import_profile(top_n: int = 15) -> None:
+    """Slowest imports of generate_capacity_summary, from python -X importtime"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import generate_capacity_summary, cloud_function_main'],
+        cwd=SCRIPT_DIR, capture_output=True, text=True
+    )
+    entries = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, module = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        entries.append((int(cumulative_us), int(self_us), module))
+
+    print(f"\nSlowest imports (python -X importtime, top {top_n} by cumulative time):")
+    print(f"{'Module':<50} {'Cumulative (ms)':>16} {'Self (ms)':>10}")
+    for cumulative_us, self_us, module in sorted(entries, reverse=True)[:top_n]:
+        print(f"{module.strip():<50} {cumulative_us / 1000:>16.1f} {self_us / 1000:>10.1f}")
+
+
+def summarize(name: str, values: List[float]) -> str:
+    values_ms = [value * 1000 for value in values]
+    return (f"{name:<36} {statistics.median(values_ms):>10.1f} {min(values_ms):>10.1f} "
+            f"{max(values_ms):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark cold-start import time and first-request latency'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='Cold starts to measure; median/min/max are reported (default: 5)'
+    )
+    parser.add_argument(
+        '--llm-provider',
+        type=str,
+        choices=['openai', 'anthropic', 'gemini'],
+        default='gemini',
+        help='LLM provider for the first request (default: gemini)'
+    )
+    parser.add_argument(
+        '--project-id',
+        type=str,
+        default=os.getenv('GOOGLE_CLOUD_PROJECT', 'savvy-gtm-analytics'),
+        help='BigQuery project ID'
+    )
+    parser.add_argument(
+        '--replay-fixtures',
+        type=str,
+        default=None,
+        help='Run the first request offline on fixtures recorded with --record-fixtures'
+    )
+    parser.add_argument(
+        '--llm-cache',
+        type=str,
+        default=None,
+        help='LLM response cache (SQLite) for the first request, so a cached analysis skips the LLM call'
+    )
+    parser.add_argument(
+        '--live',
+        action='store_true',
+        help='Send the first request through the Cloud Function entry point (BigQuery + LLM)'
+    )
+    parser.add_argument(
+        '--importtime',
+        action='store_true',
+        help='Also show the slowest imports from python -X importtime'
+    )
+    parser.add_argument('--child', type=str, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        result = child_run(json.loads(args.child))
+        print(RESULT_PREFIX + json.dumps(result))
+        return 0
+
+    options = {
+        'llm_provider': args.llm_provider,
+        'project_id': args.project_id,
+        'replay_fixtures': os.path.abspath(args.replay_fixtures) if args.replay_fixtures else None,
+        'llm_cache': os.path.abspath(args.llm_cache) if args.llm_cache else None,
+        'live': args.live,
+    }
+
+    print(f"Measuring {args.runs} cold starts (fresh interpreter each, {args.llm_provider})...")
+    results = [run_cold_start(options) for _ in range(args.runs)]
+
+    header = f"{'Step':<36} {'Median ms':>10} {'Min ms':>10} {'Max ms':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for key, label in [
+        ('import_generate_capacity_summary_s', 'import generate_capacity_summary'),
+        ('import_cloud_function_main_s', 'import cloud_function_main'),
+        ('generator_setup_s', 'generator setup (clients, SDK)'),
+        ('report_generation_s', 'report generation'),
+        ('first_request_s', 'first request total'),
+    ]:
+        values = [result['timings'][key] for result in results if key in result['timings']]
+        if values:
+            print(summarize(label, values))
+
+    last = results[-1]
+    print(f"\nModules loaded after import: {last['modules_after_import']}")
+    print(f"Heavy dependencies loaded by the imports: {', '.join(last['heavy_modules_after_import']) or 'none'}")
+    print(f"Heavy dependencies loaded by the first request: {', '.join(last['heavy_modules_after_request']) or 'none'}")
+    if last['first_request_error']:
+        print(f"\n⚠️  First request failed: {last['first_request_error']}")
+    if not (args.replay_fixtures or args.live):
+        print("\n(Use --replay-fixtures DIR or --live to time a complete first request.)")
+
+    if args.importtime:
+        print_import_profile()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,109 @@
+"""
+BigQuery Fixtures Module
+Record query results to a fixture directory and replay them without BigQuery
+
+Recording: pass a FixtureRecorder to BigQueryClient (or use --record-fixtures DIR)
+and every query result is saved as <query_id>.parquet, with the SQL alongside it in
+<query_id>.sql. Query ids are the report's query names (e.g. "firm_summary",
+"query_h"), so fixtures stay stable when the SQL text changes.
+
+Replay: ReplayBigQueryClient serves those fixtures through the same interface as
+BigQueryClient, with no network access or GCP credentials. Both report generators
+accept it as bq_client, which makes the Python side of the pipeline (prompt
+building, report formatting, disposition unpacking) deterministic to benchmark.
+"""
+
+import os
+import re
+import hashlib
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Optional
+
+# pandas is imported when a result is first read (keeps importing the report modules fast)
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow
+
+
+def query_id_for(query: str, name: Optional[str] = None) -> str:
+    """Stable identifier for a query: its report name, or a hash of the normalized SQL"""
+    if name:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    normalized_query = re.sub(r"\s+", " ", query).strip()
+    return "query_" + hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()[:16]
+
+
+class FixtureRecorder:
+    """Saves query results (and their SQL) to a fixture directory"""
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def save(self, query: str, df: "pd.DataFrame", name: Optional[str] = None) -> None:
+        """Save one query result as <query_id>.parquet (+ <query_id>.sql)"""
+        query_id = query_id_for(query, name)
+        try:
+            df.to_parquet(os.path.join(self.fixture_dir, f"{query_id}.parquet"), index=False)
+            with open(os.path.join(self.fixture_dir, f"{query_id}.sql"), 'w', encoding='utf-8') as f:
+                f.write(query)
+        except Exception as e:
+            print(f"Warning: Could not record fixture for {query_id}: {e}")
+
+
+class ReplayBigQueryClient:
+    """Drop-in replacement for BigQueryClient that serves recorded fixtures"""
+
+    def __init__(self, fixture_dir: str):
+        if not os.path.isdir(fixture_dir):
+            raise ValueError(f"Fixture directory not found: {fixture_dir}")
+        self.fixture_dir = fixture_dir
+        self.cache = None
+        self.manifest = None
+
+    def query_to_dataframe(self, query: str, name: Optional[str] = None) -> "pd.DataFrame":
+        """Return the recorded result for a query"""
+        start = time.perf_counter()
+        path = self._fixture_path(query, name)
+        import pandas as pd
+        df = pd.read_parquet(path)
+        if self.manifest is not None:
+            self.manifest.record_query(query_id_for(query, name), None, time.perf_counter() - start,
+                                       rows=len(df), source="replay")
+        return df
+
+    def query_to_arrow(self, query: str, name: Optional[str] = None) -> "pyarrow.Table":
+        """Return the recorded result for a query as a pyarrow Table"""
+        start = time.perf_counter()
+        path = self._fixture_path(query, name)
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(path)
+        if self.manifest is not None:
+            self.manifest.record_query(query_id_for(query, name), None, time.perf_counter() - start,
+                                       rows=table.num_rows, source="replay")
+        return table
+
+    def _fixture_path(self, query: str, name: Optional[str]) -> str:
+        query_id = query_id_for(query, name)
+        path = os.path.join(self.fixture_dir, f"{query_id}.parquet")
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No recorded fixture for query '{query_id}' in {self.fixture_dir}. "
+                "Record one with --record-fixtures first."
+            )
+        return path
+
+    def run_queries_concurrently(self, queries: Dict[str, str], max_workers: int = 1,
+                                 labels: Optional[Dict[str, str]] = None) -> Dict[str, "pd.DataFrame"]:
+        """Return recorded results for every query (read sequentially; no network involved)"""
+        return {name: self.query_to_dataframe(query, name=name) for name, query in queries.items()}
+
+    @contextmanager
+    def run_context(self, tables: Dict[str, str], dataset: str):
+        """Run tables aren't created when replaying"""
+        yield self
+
+    def dry_run_queries(self, queries: Dict[str, str]) -> Dict[str, int]:
+        """Dry runs need BigQuery; fixtures carry no cost information"""
+        raise ValueError("Dry runs are not available when replaying fixtures")
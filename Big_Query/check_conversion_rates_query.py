@@ -0,0 +1,600 @@
+"""
+Equivalence Check for the Single-Pass Conversion Rates Query
+
+The capacity report's conversion_rates query used to read vw_conversion_rates once
+per period/slice and the Opportunity/Lead join once per slice for the 90-day SQO→Joined
+rates. It now reads each base relation once (GROUPING SETS + conditional aggregates).
+This script checks that the single-pass query returns the same metric_type /
+dimension_value / period rows with the same counts and rates as the previous query,
+which is kept here as legacy_conversion_rates_query().
+
+Checks (the script exits with 1 if any of them finds a difference):
+
+    - Offline (default): the recorded fixture pair in fixtures/conversion_rates/
+      (legacy/ and consolidated/, each conversion_rates.parquet + .sql). The recorded
+      SQL must still match both queries, so a changed query needs a new recording.
+      If duckdb and sqlglot are installed, both queries are also run on a synthetic
+      dataset in DuckDB (BigQuery SQL translated by sqlglot).
+    - --bigquery: both queries run in BigQuery now, on the same day's data.
+
+--record-fixtures DIR saves the legacy and consolidated results of a --local or
+--bigquery run as a new fixture pair. The committed pair was recorded with --local.
+
+Usage:
+    python check_conversion_rates_query.py [--fixtures DIR]
+    python check_conversion_rates_query.py --local [--record-fixtures DIR]
+    python check_conversion_rates_query.py --bigquery [--project-id PROJECT] [--dataset DATASET]
+                                           [--record-fixtures DIR]
+"""
+
+import argparse
+import importlib.util
+import math
+import os
+import random
+import re
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from bigquery_fixtures import FixtureRecorder, ReplayBigQueryClient
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+QUERY_NAME = 'conversion_rates'
+KEY_COLUMNS = ['metric_type', 'dimension_value', 'period']
+VALUE_COLUMNS = [
+    'sql_to_sqo_rate',
+    'sqo_to_joined_rate',
+    'sql_to_sqo_denom',
+    'sql_to_sqo_num',
+    'sqo_to_joined_denom',
+    'sqo_to_joined_num',
+]
+DEFAULT_PROJECT_ID = 'savvy-gtm-analytics'
+DEFAULT_DATASET = 'savvy_analytics'
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(SCRIPT_DIR, 'fixtures', QUERY_NAME)
+
+# The local run pins CURRENT_DATE() so the synthetic dataset (and its recording) is reproducible
+LOCAL_AS_OF = date(2025, 11, 15)
+SQO_RECORD_TYPE = '012Dn000000mrO3IAI'
+
+
+def legacy_conversion_rates_query(project_id: str = DEFAULT_PROJECT_ID, dataset: str = DEFAULT_DATASET) -> str:
+    """The conversion_rates query as it was before the single-pass rewrite (one CTE per slice)"""
+    return f"""
+        -- SQO→Joined rates using 90-day lookback (based on Date_Became_SQO__c)
+        -- Matches vw_conversion_rates.sql logic for source attribution
+        WITH SQO_Joined_90_Day AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+        ),
+        SQO_Joined_90_Day_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            COALESCE(g.Channel_Grouping_Name, 'Other') AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+            ON l.ConvertedOpportunityId = o.Id
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Channel_Group_Mapping` g
+            ON COALESCE(o.LeadSource, l.LeadSource) = g.Original_Source_Salesforce
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+          GROUP BY g.Channel_Grouping_Name
+          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
+        ),
+        SQO_Joined_90_Day_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            COALESCE(o.LeadSource, l.LeadSource, 'Unknown') AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+            ON l.ConvertedOpportunityId = o.Id
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+            AND COALESCE(o.LeadSource, l.LeadSource) IS NOT NULL
+          GROUP BY COALESCE(o.LeadSource, l.LeadSource, 'Unknown')
+          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
+        ),
+        Current_Quarter_Overall AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+        ),
+        Last_12_Months_Overall AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+        ),
+        Current_Quarter_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            Channel_Grouping_Name AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+          WHERE Channel_Grouping_Name IS NOT NULL
+          GROUP BY Channel_Grouping_Name
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Last_12_Months_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            Channel_Grouping_Name AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+          WHERE Channel_Grouping_Name IS NOT NULL
+          GROUP BY Channel_Grouping_Name
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Current_Quarter_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            Original_source AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+          WHERE Original_source IS NOT NULL
+          GROUP BY Original_source
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Last_12_Months_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            Original_source AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `{project_id}.{dataset}.vw_conversion_rates`
+          WHERE Original_source IS NOT NULL
+          GROUP BY Original_source
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        -- Combine SQL→SQO (current quarter) with SQO→Joined (90-day lookback)
+        Combined_Overall AS (
+          SELECT 
+            cq.metric_type,
+            cq.dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            cq.sql_to_sqo_denom,
+            cq.sql_to_sqo_num,
+            sqo90.sqo_to_joined_denom,
+            sqo90.sqo_to_joined_num
+          FROM Current_Quarter_Overall cq
+          CROSS JOIN SQO_Joined_90_Day sqo90
+        ),
+        Combined_Channel AS (
+          SELECT 
+            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
+            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
+            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
+          FROM Current_Quarter_Channel cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Channel sqo90
+            ON cq.dimension_value = sqo90.dimension_value
+        ),
+        Combined_Source AS (
+          SELECT 
+            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
+            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
+            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
+          FROM Current_Quarter_Source cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Source sqo90
+            ON cq.dimension_value = sqo90.dimension_value
+        )
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Overall
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Last_12_Months_Overall
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Channel
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Source
+        """
+
+
+def current_conversion_rates_query(project_id: str = DEFAULT_PROJECT_ID, dataset: str = DEFAULT_DATASET,
+                                   bq_client=None) -> Tuple[str, object]:
+    """The report's current conversion_rates query, and the generator's BigQuery client"""
+    from generate_capacity_summary import CapacityReportGenerator
+    # No LLM provider: only the query text (and the BigQuery client, if any) are needed
+    generator = CapacityReportGenerator(project_id=project_id, dataset=dataset,
+                                        llm_provider=None, bq_client=bq_client)
+    return generator._build_queries()[QUERY_NAME], generator.bq_client
+
+
+def _values_equal(expected, actual, tolerance: float) -> bool:
+    """Compare two result values; NULL (None/NaN) only equals NULL"""
+    expected_null = expected is None or (isinstance(expected, float) and math.isnan(expected))
+    actual_null = actual is None or (isinstance(actual, float) and math.isnan(actual))
+    if expected_null or actual_null:
+        return expected_null and actual_null
+    return math.isclose(float(expected), float(actual), rel_tol=tolerance, abs_tol=tolerance)
+
+
+def _value_order(row) -> tuple:
+    return tuple(str(row[column]) for column in VALUE_COLUMNS)
+
+
+def compare_conversion_rates(expected_df: "pd.DataFrame", actual_df: "pd.DataFrame",
+                             tolerance: float = 1e-9) -> List[str]:
+    """
+    Differences between two conversion_rates results (empty list = equivalent)
+
+    Rows are matched on metric_type / dimension_value / period; row order is ignored.
+    """
+    differences = []
+    for label, df in [('legacy', expected_df), ('consolidated', actual_df)]:
+        missing = [column for column in KEY_COLUMNS + VALUE_COLUMNS if column not in df.columns]
+        if missing:
+            differences.append(f"{label} result is missing columns: {', '.join(missing)}")
+    if differences:
+        return differences
+
+    def rows_by_key(df):
+        rows = {}
+        for row in df[KEY_COLUMNS + VALUE_COLUMNS].to_dict('records'):
+            key = tuple(row[column] for column in KEY_COLUMNS)
+            rows.setdefault(key, []).append(row)
+        return rows
+
+    expected_rows = rows_by_key(expected_df)
+    actual_rows = rows_by_key(actual_df)
+
+    for key in sorted(set(expected_rows) - set(actual_rows), key=str):
+        differences.append(f"missing row {key}")
+    for key in sorted(set(actual_rows) - set(expected_rows), key=str):
+        differences.append(f"unexpected row {key}")
+
+    for key in sorted(set(expected_rows) & set(actual_rows), key=str):
+        expected_group, actual_group = expected_rows[key], actual_rows[key]
+        if len(expected_group) != len(actual_group):
+            differences.append(f"row {key}: {len(expected_group)} legacy rows vs "
+                               f"{len(actual_group)} consolidated rows")
+            continue
+        # Duplicate keys (e.g. a mapped channel literally named 'Other') are compared in value order
+        for expected, actual in zip(sorted(expected_group, key=_value_order), sorted(actual_group, key=_value_order)):
+            for column in VALUE_COLUMNS:
+                if not _values_equal(expected[column], actual[column], tolerance):
+                    differences.append(f"row {key}: {column} legacy={expected[column]} "
+                                       f"consolidated={actual[column]}")
+    return differences
+
+
+def _normalize_sql(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def build_local_tables(rng: random.Random) -> Dict[str, "pd.DataFrame"]:
+    """
+    Small synthetic versions of the query's base relations, keyed by table name
+
+    Covers the cases the two queries must agree on: sources without a channel mapping
+    (the 'Other' bucket), a mapped channel literally named 'Other', NULL sources, Lead
+    rows that repeat an opportunity, non-SQL opportunities, and Channel/Source groups
+    on both sides of the >= 5 thresholds.
+    """
+    import pandas as pd
+
+    channels = ['Outbound', 'Marketing', 'Partnerships', 'Events', 'Other']
+    mapped_sources = [f"Source {i:02d}" for i in range(1, 13)]
+    unmapped_sources = ['Unmapped A', 'Unmapped B']
+    channel_group_mapping = pd.DataFrame({
+        'Original_Source_Salesforce': mapped_sources,
+        'Channel_Grouping_Name': [channels[i % len(channels)] for i in range(len(mapped_sources))],
+    })
+
+    # Skewed source mix, so some groups clear the thresholds and others don't
+    sources = mapped_sources + unmapped_sources
+    weights = [12, 10, 8, 6, 5, 4, 3, 2, 2, 1, 1, 1, 3, 1]
+
+    def pick_source(null_share: float):
+        return None if rng.random() < null_share else rng.choices(sources, weights)[0]
+
+    as_of = datetime.combine(LOCAL_AS_OF, datetime.min.time())
+    opportunities, leads = [], []
+    for i in range(400):
+        opp_id = f"006{i:05d}"
+        sqo_at = as_of - timedelta(days=rng.randint(0, 200), hours=rng.randint(0, 23)) if rng.random() < 0.8 else None
+        joined = (sqo_at + timedelta(days=rng.randint(20, 120))).date() if sqo_at and rng.random() < 0.3 else None
+        opportunities.append({
+            'Id': opp_id,
+            'Full_Opportunity_ID__c': opp_id + "AAA",
+            'recordtypeid': SQO_RECORD_TYPE if rng.random() < 0.9 else '012Dn000000mrO4IAI',
+            'SQL__c': rng.choice(['Yes', 'yes', 'Yes', 'No', None]),
+            'Date_Became_SQO__c': sqo_at,
+            'advisor_join_date__c': joined,
+            'LeadSource': pick_source(0.4),
+        })
+        # Most opportunities were converted from one lead, a few from two
+        for _ in range(rng.choices([0, 1, 2], [3, 12, 1])[0]):
+            leads.append({'ConvertedOpportunityId': opp_id, 'LeadSource': pick_source(0.2)})
+
+    first_month = date(LOCAL_AS_OF.year - 2, LOCAL_AS_OF.month, 1)
+    months = []
+    month = first_month
+    while month <= LOCAL_AS_OF:
+        months.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    conversion_rows = []
+    for _ in range(900):
+        source = pick_source(0.1)
+        sql_month = rng.choice(months)
+        sql_denominator = rng.choice([0, 1, 1])
+        sqo_denominator = rng.choice([0, 1])
+        conversion_rows.append({
+            'Original_source': source,
+            'Channel_Grouping_Name': None if rng.random() < 0.1 else rng.choice(channels),
+            'sql_cohort_month': sql_month,
+            'sqo_cohort_month': min(months[-1], (sql_month + timedelta(days=rng.randint(0, 45))).replace(day=1)),
+            'sql_to_sqo_denominator': sql_denominator,
+            'sql_to_sqo_numerator': sql_denominator if rng.random() < 0.6 else 0,
+            'sqo_to_joined_denominator': sqo_denominator,
+            'sqo_to_joined_numerator': sqo_denominator if rng.random() < 0.2 else 0,
+        })
+
+    opportunity = pd.DataFrame(opportunities)
+    opportunity['Date_Became_SQO__c'] = pd.to_datetime(opportunity['Date_Became_SQO__c'])
+    opportunity['advisor_join_date__c'] = pd.to_datetime(opportunity['advisor_join_date__c'])
+    vw_conversion_rates = pd.DataFrame(conversion_rows)
+    for column in ['sql_cohort_month', 'sqo_cohort_month']:
+        vw_conversion_rates[column] = pd.to_datetime(vw_conversion_rates[column])
+    return {
+        'Opportunity': opportunity,
+        'Lead': pd.DataFrame(leads, columns=['ConvertedOpportunityId', 'LeadSource']),
+        'Channel_Group_Mapping': channel_group_mapping,
+        'vw_conversion_rates': vw_conversion_rates,
+    }
+
+
+def _to_duckdb(query: str) -> str:
+    """Translate a BigQuery query for the local run: pinned date, bare table names, DuckDB dialect"""
+    import sqlglot
+    query = query.replace("CURRENT_DATE()", f"DATE '{LOCAL_AS_OF.isoformat()}'")
+    query = re.sub(r"`[^`]*\.(\w+)`", r"\1", query)
+    return sqlglot.transpile(query, read="bigquery", write="duckdb")[0]
+
+
+def run_local(queries: Dict[str, str], seed: int = 7) -> Dict[str, "pd.DataFrame"]:
+    """Run BigQuery queries on the synthetic dataset in an in-memory DuckDB database"""
+    # Both packages are checked up front so a missing sqlglot isn't reported halfway through
+    if importlib.util.find_spec("duckdb") is None or importlib.util.find_spec("sqlglot") is None:
+        raise ImportError("The local check needs duckdb and sqlglot. Run: pip install duckdb sqlglot")
+    import duckdb
+    connection = duckdb.connect()
+    for table_name, df in build_local_tables(random.Random(seed)).items():
+        connection.register(table_name, df)
+    return {name: connection.execute(_to_duckdb(query)).df() for name, query in queries.items()}
+
+
+def _record_pair(record_dir: str, queries: Dict[str, str], results: Dict[str, "pd.DataFrame"]) -> None:
+    for label in ('legacy', 'consolidated'):
+        FixtureRecorder(os.path.join(record_dir, label)).save(queries[label], results[label], name=QUERY_NAME)
+    print(f"Recorded the legacy and consolidated results in {record_dir}")
+
+
+def _report(label: str, legacy_df: "pd.DataFrame", consolidated_df: "pd.DataFrame", tolerance: float) -> bool:
+    """Compare and print the outcome of one check; True if the results match"""
+    print(f"{label}: legacy rows: {len(legacy_df)}, consolidated rows: {len(consolidated_df)}")
+    differences = compare_conversion_rates(legacy_df, consolidated_df, tolerance=tolerance)
+    if differences:
+        print(f"❌ {len(differences)} difference(s):")
+        for difference in differences:
+            print(f"  - {difference}")
+        return False
+    print("✅ Consolidated query matches the legacy query")
+    return True
+
+
+def check_fixture_pair(fixture_dir: str, queries: Dict[str, str], tolerance: float) -> bool:
+    """Compare a recorded fixture pair; its SQL must match the queries being checked"""
+    for label in ('legacy', 'consolidated'):
+        sql_path = os.path.join(fixture_dir, label, f"{QUERY_NAME}.sql")
+        if not os.path.exists(sql_path):
+            print(f"❌ No recorded {label} {QUERY_NAME} query in {fixture_dir}")
+            return False
+        with open(sql_path, encoding='utf-8') as f:
+            if _normalize_sql(f.read()) != _normalize_sql(queries[label]):
+                print(f"❌ {sql_path} was recorded from a different {label} query; "
+                      f"re-record the pair with --local --record-fixtures {fixture_dir}")
+                return False
+    legacy_df = ReplayBigQueryClient(os.path.join(fixture_dir, 'legacy')).query_to_dataframe(
+        queries['legacy'], name=QUERY_NAME)
+    consolidated_df = ReplayBigQueryClient(os.path.join(fixture_dir, 'consolidated')).query_to_dataframe(
+        queries['consolidated'], name=QUERY_NAME)
+    return _report(f"Fixtures ({fixture_dir})", legacy_df, consolidated_df, tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check the single-pass conversion_rates query against the previous query'
+    )
+    parser.add_argument(
+        '--fixtures',
+        type=str,
+        default=FIXTURE_DIR,
+        help='Fixture pair to compare offline (legacy/ and consolidated/ subdirectories; '
+             'default: fixtures/conversion_rates)'
+    )
+    parser.add_argument(
+        '--local',
+        action='store_true',
+        help='Only run both queries on the synthetic dataset in DuckDB (needs duckdb and sqlglot)'
+    )
+    parser.add_argument(
+        '--bigquery',
+        action='store_true',
+        help='Run both queries in BigQuery instead of the offline checks'
+    )
+    parser.add_argument(
+        '--record-fixtures',
+        type=str,
+        default=None,
+        help='Save the legacy and consolidated results of a --local or --bigquery run as a fixture pair'
+    )
+    parser.add_argument(
+        '--project-id',
+        type=str,
+        default=os.getenv('GOOGLE_CLOUD_PROJECT', DEFAULT_PROJECT_ID),
+        help='BigQuery project ID'
+    )
+    parser.add_argument(
+        '--dataset',
+        type=str,
+        default=DEFAULT_DATASET,
+        help='BigQuery dataset name'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=1e-9,
+        help='Relative/absolute tolerance for comparing rates (default: 1e-9)'
+    )
+
+    args = parser.parse_args()
+
+    if args.local and args.bigquery:
+        parser.error("--local and --bigquery are separate checks; pick one")
+    if args.record_fixtures and not (args.local or args.bigquery):
+        parser.error("--record-fixtures needs --local or --bigquery")
+
+    if args.bigquery:
+        consolidated_sql, bq_client = current_conversion_rates_query(args.project_id, args.dataset)
+        queries = {'legacy': legacy_conversion_rates_query(args.project_id, args.dataset),
+                   'consolidated': consolidated_sql}
+        print("Running the legacy and consolidated conversion_rates queries in BigQuery...")
+        results = {label: bq_client.query_to_dataframe(query, name=f"{QUERY_NAME}_{label}")
+                   for label, query in queries.items()}
+        if args.record_fixtures:
+            _record_pair(args.record_fixtures, queries, results)
+        return 0 if _report("BigQuery", results['legacy'], results['consolidated'], args.tolerance) else 1
+
+    # Offline checks use the default project/dataset, which the committed fixtures were recorded with.
+    # The generator only builds query text here, so a replay client stands in for BigQuery.
+    consolidated_sql, _ = current_conversion_rates_query(bq_client=ReplayBigQueryClient(SCRIPT_DIR))
+    queries = {'legacy': legacy_conversion_rates_query(), 'consolidated': consolidated_sql}
+
+    passed = True
+    if not args.local:
+        passed = check_fixture_pair(args.fixtures, queries, args.tolerance)
+
+    try:
+        results = run_local(queries)
+    except ImportError as e:
+        if args.local:
+            print(f"❌ {e}")
+            return 1
+        print(f"Skipping the local DuckDB run: {e}")
+        return 0 if passed else 1
+    if args.record_fixtures:
+        _record_pair(args.record_fixtures, queries, results)
+    passed = _report(f"Local DuckDB run (as of {LOCAL_AS_OF})", results['legacy'], results['consolidated'],
+                     args.tolerance) and passed
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    exit(main())
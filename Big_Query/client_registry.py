@@ -0,0 +1,114 @@
+"""
+Client Registry Module
+Reuses BigQuery and LLM clients across requests handled by a warm Cloud Function instance
+
+Creating a bigquery.Client (credential lookup, token fetch, new HTTP connection pool)
+and an LLM SDK client costs noticeable time on every request. A ClientRegistry kept
+at module level hands out the clients built by the first request to every later
+request on the same instance, keyed by what the client depends on (project and
+credentials file for BigQuery, provider, model and API key for LLMs). Before a client
+is reused its health check runs (e.g. the OAuth token is refreshed if it has expired);
+a client that fails the check, or is older than max_age, is rebuilt.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def fingerprint(secret: Optional[str]) -> Optional[str]:
+    """Short stable fingerprint of a secret, for use in registry keys"""
+    if not secret:
+        return None
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+def credentials_file_key(credentials_path: Optional[str]) -> Tuple:
+    """Registry key part for a credentials file (changes when the file is replaced)"""
+    if credentials_path and os.path.exists(credentials_path):
+        return (os.path.abspath(credentials_path), os.path.getmtime(credentials_path))
+    return (None, None)
+
+
+def google_credentials_healthy(credentials) -> bool:
+    """Whether Google credentials are usable, refreshing an expired token if needed"""
+    if credentials is None or getattr(credentials, "valid", True):
+        return True
+    try:
+        from google.auth.transport.requests import Request
+        credentials.refresh(Request())
+        return credentials.valid
+    except Exception as e:
+        print(f"Warning: Could not refresh Google credentials: {e}")
+        return False
+
+
+def is_auth_error(error: Exception) -> bool:
+    """Whether an error means a client's credentials are no longer accepted"""
+    if type(error).__name__ in ("RefreshError", "Unauthenticated", "AuthenticationError", "PermissionDenied"):
+        return True
+    error_str = str(error).lower()
+    return ("401" in error_str or "invalid_grant" in error_str or "invalid api key" in error_str
+            or "api_key_invalid" in error_str or "unauthenticated" in error_str)
+
+
+class ClientRegistry:
+    """Thread-safe cache of long-lived clients with health checks"""
+
+    def __init__(self, max_age: Optional[float] = None):
+        """
+        Args:
+            max_age: Rebuild clients older than this many seconds (None = only when unhealthy)
+        """
+        self.max_age = max_age
+        self.stats = {'created': 0, 'reused': 0, 'rebuilt': 0}
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any],
+            health_check: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the client registered under key, creating (or rebuilding) it if needed
+
+        Args:
+            key: What the client depends on, e.g. ("bigquery", project_id, credentials)
+            factory: Builds a new client
+            health_check: Returns False if an existing client must not be reused
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Per-key lock: concurrent first requests build one client, other keys aren't blocked
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                client, created_at = entry
+                reason = None
+                if self.max_age is not None and time.time() - created_at > self.max_age:
+                    reason = "max age reached"
+                elif health_check is not None and not health_check(client):
+                    reason = "failed health check"
+                if reason is None:
+                    self.stats['reused'] += 1
+                    return client
+                print(f"Rebuilding {key[0] if isinstance(key, tuple) else key} client ({reason})")
+                self.stats['rebuilt'] += 1
+            else:
+                self.stats['created'] += 1
+
+            client = factory()
+            self._entries[key] = (client, time.time())
+            return client
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one client so the next get() builds a new one"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every client (e.g. after an authentication error)"""
+        with self._lock:
+            self._entries.clear()
@@ -1,12 +1,31 @@
 """
 Google Cloud Function entry point for generating capacity reports
 This can be called from Google Apps Script or directly via HTTP
+
+Async mode ("async": true) returns a job id right away and generates the report in the
+background; poll GET ?job_id=<id> for the status and, once finished, the result. The
+instance must keep running after the response is sent: deploy as a 2nd gen function
+with CPU always allocated, and set REPORT_JOBS_BUCKET (or --max-instances 1) so that
+status requests can find the job (see report_jobs.py).
+
+BigQuery and LLM clients are kept in a module-level registry, so requests served by a
+warm instance reuse the clients (connections, OAuth tokens) built by the first request
+instead of creating them again (see client_registry.py).
 """
 
 import json
 import os
 from datetime import datetime
 from generate_capacity_summary import CapacityReportGenerator
+from client_registry import ClientRegistry, is_auth_error
+from report_jobs import ReportJobs
+
+# Created on the first async request; job records outlive the request that started them
+_report_jobs = None
+
+# Clients shared by every request handled by this instance; rebuilt when their
+# credentials expire, and dropped after an authentication error
+_clients = ClientRegistry()
 
 
 def generate_capacity_report(request):
@@ -18,61 +37,57 @@ def generate_capacity_report(request):
         "llm_provider": "gemini",
         "project_id": "savvy-gtm-analytics",
         "dataset": "savvy_analytics",
-        "email": "recipient@example.com"  # Optional
+        "email": "recipient@example.com",  # Optional
+        "hedge_provider": "openai",  # Optional: also ask this provider if the primary is slow or rate limited
+        "stream": false,  # Optional: return the markdown as a chunked text/markdown response
+        "async": false  # Optional: return a job id immediately and generate in the background
     }
+    
+    Job status: GET ?job_id=<id> returns {"status": "queued" | "running" | "succeeded" | "failed",
+    "stage": ..., and when succeeded the same fields as a synchronous response}
     """
     try:
         # Parse request
         if request.method == 'OPTIONS':
             headers = {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST',
+                'Access-Control-Allow-Methods': 'GET, POST',
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Max-Age': '3600'
             }
             return ('', 204, headers)
         
-        request_json = request.get_json(silent=True) or {}
-        
-        project_id = request_json.get('project_id', os.getenv('GOOGLE_CLOUD_PROJECT', 'savvy-gtm-analytics'))
-        dataset = request_json.get('dataset', 'savvy_analytics')
-        llm_provider = request_json.get('llm_provider', 'gemini')
-        email = request_json.get('email')
+        # Async job status
+        if request.method == 'GET':
+            return _job_status_response(request.args.get('job_id'))
         
-        # Generate report
-        generator = CapacityReportGenerator(
-            project_id=project_id,
-            dataset=dataset,
-            llm_provider=llm_provider
-        )
+        request_json = request.get_json(silent=True) or {}
         
-        # Generate report (in memory, no file)
-        # Pass None to generate_report to return string without saving to file
-        report = generator.generate_report(output_file=None)
+        if request_json.get('async', False):
+            params = {key: value for key, value in request_json.items() if key != 'async'}
+            job = _get_report_jobs().submit(lambda progress: _run_report(params, progress), params=params)
+            return (json.dumps({
+                'success': True,
+                'job_id': job['job_id'],
+                'status': job['status'],
+                'timestamp': datetime.now().isoformat()
+            }), 202, {'Access-Control-Allow-Origin': '*', 'Content-Type': 'application/json'})
         
-        # Optional: Generate PDF via Gamma.app if requested
-        pdf_url = None
-        pdf_path = None
-        if request_json.get('generate_pdf', False):
-            try:
-                from gamma_integration import GammaAppClient
-                gamma_client = GammaAppClient()
-                title = f"Capacity Summary Report - {datetime.now().strftime('%Y-%m-%d')}"
-                pdf_result = gamma_client.create_pdf_from_markdown(report, title=title)
-                if pdf_result:
-                    pdf_url = pdf_result
-            except Exception as e:
-                # Don't fail the whole request if PDF generation fails
-                print(f"Warning: Gamma.app PDF generation failed: {e}")
+        # Optional: stream the report instead of returning JSON. The header is sent as soon
+        # as the queries finish and the LLM analysis follows as it is generated
+        # (PDF generation needs the full markdown, so it is not available in this mode)
+        if request_json.get('stream', False):
+            from flask import Response
+            chunks = _build_generator(request_json).stream_report()
+            filename = f"capacity_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+            headers = {
+                'Access-Control-Allow-Origin': '*',
+                'Content-Disposition': f'attachment; filename="{filename}"'
+            }
+            return Response(_stream_with_error_marker(chunks), status=200, headers=headers,
+                            mimetype='text/markdown')
         
-        # Return response
-        response_data = {
-            'success': True,
-            'markdown': report,
-            'filename': f"capacity_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
-            'timestamp': datetime.now().isoformat(),
-            'pdf_url': pdf_url  # Gamma.app PDF URL if generated
-        }
+        response_data = _run_report(request_json)
         
         headers = {
             'Access-Control-Allow-Origin': '*',
@@ -82,6 +97,7 @@ def generate_capacity_report(request):
         return (json.dumps(response_data), 200, headers)
         
     except Exception as e:
+        _drop_clients_on_auth_error(e)
         error_response = {
             'success': False,
             'error': str(e),
@@ -96,16 +112,139 @@ def generate_capacity_report(request):
         return (json.dumps(error_response), 500, headers)
 
 
+def _get_report_jobs():
+    """Job runner shared by the requests handled by this instance"""
+    global _report_jobs
+    if _report_jobs is None:
+        _report_jobs = ReportJobs()
+    return _report_jobs
+
+
+def _build_generator(request_json, progress_callback=None):
+    """Report generator configured from the request body"""
+    project_id = request_json.get('project_id', os.getenv('GOOGLE_CLOUD_PROJECT', 'savvy-gtm-analytics'))
+    dataset = request_json.get('dataset', 'savvy_analytics')
+    llm_provider = request_json.get('llm_provider', 'gemini')
+    hedge_provider = request_json.get('hedge_provider', os.getenv('LLM_HEDGE_PROVIDER'))
+    
+    return CapacityReportGenerator(
+        project_id=project_id,
+        dataset=dataset,
+        llm_provider=llm_provider,
+        hedge_provider=hedge_provider,
+        progress_callback=progress_callback,
+        client_registry=_clients
+    )
+
+
+def _drop_clients_on_auth_error(error):
+    """Make the next request build new clients if this one failed on rejected credentials"""
+    if is_auth_error(error):
+        print(f"Authentication error, dropping cached clients: {error}")
+        _clients.clear()
+
+
+def _run_report(request_json, progress=None):
+    """
+    Generate the report (and optional PDF) for a request; returns the response fields
+
+    Args:
+        request_json: Request body
+        progress: Called with the name of each stage as it starts (async jobs)
+    """
+    try:
+        generator = _build_generator(request_json, progress_callback=progress)
+        
+        # Generate report (in memory, no file)
+        # Pass None to generate_report to return string without saving to file
+        report = generator.generate_report(output_file=None)
+    except Exception as e:
+        # Async jobs fail outside the request handler, so check here as well
+        _drop_clients_on_auth_error(e)
+        raise
+    
+    # Optional: Generate PDF via Gamma.app if requested
+    pdf_url = None
+    if request_json.get('generate_pdf', False):
+        if progress is not None:
+            progress('pdf')
+        try:
+            from gamma_integration import GammaAppClient
+            gamma_client = GammaAppClient()
+            title = f"Capacity Summary Report - {datetime.now().strftime('%Y-%m-%d')}"
+            pdf_result = gamma_client.create_pdf_from_markdown(report, title=title)
+            if pdf_result:
+                pdf_url = pdf_result
+        except Exception as e:
+            # Don't fail the whole request if PDF generation fails
+            print(f"Warning: Gamma.app PDF generation failed: {e}")
+    
+    return {
+        'success': True,
+        'markdown': report,
+        'filename': f"capacity_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
+        'timestamp': datetime.now().isoformat(),
+        'pdf_url': pdf_url  # Gamma.app PDF URL if generated
+    }
+
+
+def _job_status_response(job_id):
+    """HTTP response for an async job status request"""
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Content-Type': 'application/json'
+    }
+    # With REPORT_JOBS_BUCKET set this also finds jobs started on other instances
+    job = _get_report_jobs().get(job_id) if job_id else None
+    if job is None:
+        return (json.dumps({
+            'success': False,
+            'error': f"Unknown job id: {job_id}" if job_id else "job_id is required",
+            'timestamp': datetime.now().isoformat()
+        }), 404, headers)
+    
+    response_data = {
+        'success': job['status'] != 'failed',
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+    }
+    if job['status'] == 'succeeded':
+        response_data.update(job['result'])
+    elif job['status'] == 'failed':
+        response_data['error'] = job['error']
+    return (json.dumps(response_data), 200, headers)
+
+
+def _stream_with_error_marker(chunks):
+    """
+    Pass report chunks through to a streamed response
+
+    Once streaming has started the status code is already sent, so an error (e.g. the
+    LLM call failing mid-analysis) is reported at the end of the markdown instead.
+    """
+    try:
+        for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        _drop_clients_on_auth_error(e)
+        print(f"Error while streaming report: {e}")
+        yield f"\n\n---\n\n**⚠️ Report generation failed while streaming:** {e}\n"
+
+
 # For local testing
 if __name__ == "__main__":
     from flask import Flask, request as flask_request
     
     app = Flask(__name__)
     
-    @app.route('/', methods=['POST', 'OPTIONS'])
+    @app.route('/', methods=['GET', 'POST', 'OPTIONS'])
     def handler():
         class Request:
             method = flask_request.method
+            args = flask_request.args
             def get_json(self, silent=True):
                 return flask_request.get_json(silent=silent)
         
@@ -0,0 +1,108 @@
+"""
+Conversion Rate Index Module
+Indexed views of the capacity report's conversion rate query results
+
+The prompt builder reads the conversion_rates rows once per metric_type/period pair
+(Overall, Channel and Source, current and last 12 months) and the SGA conversion rate
+rows once per segment and ordering. Scanning the full row lists for every section
+costs O(sections x rows), and the prompt is built more than once per run when it has
+to be fitted to the token budget or split into map-reduce sections. These indexes are
+built once per run in O(rows) and serve every section builder (and the report tables).
+
+Both classes iterate like the row lists they wrap, so code that only needs the rows
+can keep treating them as lists.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+CURRENT_PERIOD = 'Current Quarter / Last 90 Days'
+L12M_PERIOD = 'Last 12 Months'
+
+
+class ConversionRateIndex:
+    """conversion_rates rows indexed by (metric_type, period, dimension_value)"""
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        # (metric_type, period) -> {dimension_value: row}; a repeated dimension keeps its last row
+        self._slices: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        # (metric_type, period) -> first row, for single-row slices such as Overall
+        self._first: Dict[Tuple[str, str], Dict] = {}
+        for row in rows:
+            slice_key = (row.get('metric_type'), row.get('period'))
+            self._slices.setdefault(slice_key, {})[row.get('dimension_value')] = row
+            self._first.setdefault(slice_key, row)
+
+    @classmethod
+    def of(cls, rows: Iterable[Dict]) -> "ConversionRateIndex":
+        """Index for rows, reusing it if rows is already indexed"""
+        return rows if isinstance(rows, cls) else cls(list(rows))
+
+    def get(self, metric_type: str, period: str, dimension_value: str) -> Optional[Dict]:
+        """Row for one metric_type / period / dimension value, or None"""
+        return self._slices.get((metric_type, period), {}).get(dimension_value)
+
+    def first(self, metric_type: str, period: str) -> Optional[Dict]:
+        """First row of a metric_type / period slice (e.g. the Overall row), or None"""
+        return self._first.get((metric_type, period))
+
+    def slice(self, metric_type: str, period: str) -> Dict[str, Dict]:
+        """{dimension_value: row} for one metric_type / period"""
+        return self._slices.get((metric_type, period), {})
+
+    def dimension_values(self, metric_type: str, periods: Iterable[str] = (CURRENT_PERIOD, L12M_PERIOD)) -> List:
+        """Sorted dimension values of a metric_type that have a row in any of the periods"""
+        values = set()
+        for period in periods:
+            values.update(self.slice(metric_type, period))
+        return sorted(values)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+
+class SGAConversionRates:
+    """SGA conversion rate rows indexed by SGA name, with the rate-change ordering computed once"""
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.by_name: Dict[str, Dict] = {row.get('sga_name'): row for row in rows}
+        # Largest absolute SQL→SQO rate change first (stable, so ties keep query order)
+        self.by_rate_change: List[Dict] = sorted(rows, key=lambda x: abs(x.get('sql_to_sqo_rate_change', 0)),
+                                                 reverse=True)
+        self._segments: Dict[Tuple[str, ...], Tuple[List[Dict], List[Dict]]] = {}
+
+    @classmethod
+    def of(cls, rows: Iterable[Dict]) -> "SGAConversionRates":
+        """Index for rows, reusing it if rows is already indexed"""
+        return rows if isinstance(rows, cls) else cls(list(rows))
+
+    def segment(self, sga_names: Iterable[str]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split the SGAs into (named, others) in one pass
+
+        Both lists keep the by_rate_change ordering.
+        """
+        key = tuple(sga_names)
+        if key not in self._segments:
+            names = set(key)
+            named, others = [], []
+            for row in self.by_rate_change:
+                (named if row.get('sga_name') in names else others).append(row)
+            self._segments[key] = (named, others)
+        return self._segments[key]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
@@ -0,0 +1,127 @@
+
+        -- SQO→Joined rates using 90-day lookback (based on Date_Became_SQO__c)
+        -- Matches vw_conversion_rates.sql logic for source attribution
+        WITH SQO_Joined_90_Day AS (
+          SELECT 
+            CASE
+              WHEN GROUPING(channel) = 0 THEN 'Channel'
+              WHEN GROUPING(lead_source) = 0 THEN 'Source'
+              ELSE 'Overall'
+            END AS metric_type,
+            CASE
+              WHEN GROUPING(channel) = 0 THEN COALESCE(channel, 'Other')
+              WHEN GROUPING(lead_source) = 0 THEN lead_source
+              ELSE 'Overall'
+            END AS dimension_value,
+            COUNT(DISTINCT CASE WHEN Date_Became_SQO__c IS NOT NULL AND DATE(Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN Date_Became_SQO__c IS NOT NULL AND DATE(Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND advisor_join_date__c IS NOT NULL THEN Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM (
+            -- The Lead/mapping joins can repeat an opportunity; the DISTINCT counts absorb that
+            SELECT 
+              o.Full_Opportunity_ID__c,
+              o.Date_Became_SQO__c,
+              o.advisor_join_date__c,
+              g.Channel_Grouping_Name AS channel,
+              COALESCE(o.LeadSource, l.LeadSource) AS lead_source
+            FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+            LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+              ON l.ConvertedOpportunityId = o.Id
+            LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Channel_Group_Mapping` g
+              ON COALESCE(o.LeadSource, l.LeadSource) = g.Original_Source_Salesforce
+            WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+              AND LOWER(o.SQL__c) = 'yes'
+          )
+          GROUP BY GROUPING SETS ((), (channel), (lead_source))
+        ),
+        Conversion_Rates AS (
+          SELECT 
+            CASE
+              WHEN GROUPING(Channel_Grouping_Name) = 0 THEN 'Channel'
+              WHEN GROUPING(Original_source) = 0 THEN 'Source'
+              ELSE 'Overall'
+            END AS metric_type,
+            CASE
+              WHEN GROUPING(Channel_Grouping_Name) = 0 THEN Channel_Grouping_Name
+              WHEN GROUPING(Original_source) = 0 THEN Original_source
+              ELSE 'Overall'
+            END AS dimension_value,
+            -- Current Quarter SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS cq_sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS cq_sql_to_sqo_num,
+            -- Last 12 Months SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS l12m_sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS l12m_sql_to_sqo_num,
+            -- Last 12 Months SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS l12m_sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS l12m_sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+          GROUP BY GROUPING SETS ((), (Channel_Grouping_Name), (Original_source))
+        ),
+        -- Channel/Source rows need at least 5 SQLs this quarter (or 5 SQOs in the last 90 days)
+        Current_Quarter_Dimensions AS (
+          SELECT * FROM Conversion_Rates
+          WHERE metric_type != 'Overall'
+            AND dimension_value IS NOT NULL
+            AND cq_sql_to_sqo_denom >= 5
+        ),
+        SQO_Joined_90_Day_Dimensions AS (
+          SELECT * FROM SQO_Joined_90_Day
+          WHERE metric_type != 'Overall'
+            AND dimension_value IS NOT NULL
+            AND sqo_to_joined_denom >= 5
+        ),
+        Combined AS (
+          -- Combine SQL→SQO (current quarter) with SQO→Joined (90-day lookback)
+          SELECT 
+            cr.metric_type,
+            cr.dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            cr.cq_sql_to_sqo_denom AS sql_to_sqo_denom,
+            cr.cq_sql_to_sqo_num AS sql_to_sqo_num,
+            sqo90.sqo_to_joined_denom,
+            sqo90.sqo_to_joined_num
+          FROM Conversion_Rates cr
+          CROSS JOIN SQO_Joined_90_Day sqo90
+          WHERE cr.metric_type = 'Overall'
+            AND sqo90.metric_type = 'Overall'
+          
+          UNION ALL
+          
+          SELECT 
+            metric_type,
+            dimension_value,
+            'Last 12 Months' AS period,
+            l12m_sql_to_sqo_denom AS sql_to_sqo_denom,
+            l12m_sql_to_sqo_num AS sql_to_sqo_num,
+            l12m_sqo_to_joined_denom AS sqo_to_joined_denom,
+            l12m_sqo_to_joined_num AS sqo_to_joined_num
+          FROM Conversion_Rates
+          WHERE metric_type = 'Overall'
+          
+          UNION ALL
+          
+          SELECT 
+            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
+            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            COALESCE(cq.cq_sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.cq_sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
+            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
+          FROM Current_Quarter_Dimensions cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Dimensions sqo90
+            ON cq.metric_type = sqo90.metric_type
+            AND cq.dimension_value = sqo90.dimension_value
+        )
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined
+        
\ No newline at end of file
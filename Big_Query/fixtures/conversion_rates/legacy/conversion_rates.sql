@@ -0,0 +1,230 @@
+
+        -- SQO→Joined rates using 90-day lookback (based on Date_Became_SQO__c)
+        -- Matches vw_conversion_rates.sql logic for source attribution
+        WITH SQO_Joined_90_Day AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+        ),
+        SQO_Joined_90_Day_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            COALESCE(g.Channel_Grouping_Name, 'Other') AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+            ON l.ConvertedOpportunityId = o.Id
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Channel_Group_Mapping` g
+            ON COALESCE(o.LeadSource, l.LeadSource) = g.Original_Source_Salesforce
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+          GROUP BY g.Channel_Grouping_Name
+          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
+        ),
+        SQO_Joined_90_Day_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            COALESCE(o.LeadSource, l.LeadSource, 'Unknown') AS dimension_value,
+            'Last 90 Days' AS period,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+            ON l.ConvertedOpportunityId = o.Id
+          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+            AND LOWER(o.SQL__c) = 'yes'
+            AND COALESCE(o.LeadSource, l.LeadSource) IS NOT NULL
+          GROUP BY COALESCE(o.LeadSource, l.LeadSource, 'Unknown')
+          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
+        ),
+        Current_Quarter_Overall AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+        ),
+        Last_12_Months_Overall AS (
+          SELECT 
+            'Overall' AS metric_type,
+            'Overall' AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+        ),
+        Current_Quarter_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            Channel_Grouping_Name AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+          WHERE Channel_Grouping_Name IS NOT NULL
+          GROUP BY Channel_Grouping_Name
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Last_12_Months_Channel AS (
+          SELECT 
+            'Channel' AS metric_type,
+            Channel_Grouping_Name AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+          WHERE Channel_Grouping_Name IS NOT NULL
+          GROUP BY Channel_Grouping_Name
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Current_Quarter_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            Original_source AS dimension_value,
+            'Current Quarter' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined will come from 90-day lookback CTE
+            NULL AS sqo_to_joined_denom,
+            NULL AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+          WHERE Original_source IS NOT NULL
+          GROUP BY Original_source
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        Last_12_Months_Source AS (
+          SELECT 
+            'Source' AS metric_type,
+            Original_source AS dimension_value,
+            'Last 12 Months' AS period,
+            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
+            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+          FROM `savvy-gtm-analytics.savvy_analytics.vw_conversion_rates`
+          WHERE Original_source IS NOT NULL
+          GROUP BY Original_source
+          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        ),
+        -- Combine SQL→SQO (current quarter) with SQO→Joined (90-day lookback)
+        Combined_Overall AS (
+          SELECT 
+            cq.metric_type,
+            cq.dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            cq.sql_to_sqo_denom,
+            cq.sql_to_sqo_num,
+            sqo90.sqo_to_joined_denom,
+            sqo90.sqo_to_joined_num
+          FROM Current_Quarter_Overall cq
+          CROSS JOIN SQO_Joined_90_Day sqo90
+        ),
+        Combined_Channel AS (
+          SELECT 
+            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
+            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
+            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
+          FROM Current_Quarter_Channel cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Channel sqo90
+            ON cq.dimension_value = sqo90.dimension_value
+        ),
+        Combined_Source AS (
+          SELECT 
+            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
+            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
+            'Current Quarter / Last 90 Days' AS period,
+            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
+            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
+          FROM Current_Quarter_Source cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Source sqo90
+            ON cq.dimension_value = sqo90.dimension_value
+        )
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Overall
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Last_12_Months_Overall
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Channel
+        
+        UNION ALL
+        
+        SELECT 
+          metric_type,
+          dimension_value,
+          period,
+          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
+          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
+          sql_to_sqo_denom,
+          sql_to_sqo_num,
+          sqo_to_joined_denom,
+          sqo_to_joined_num
+        FROM Combined_Source
+        
\ No newline at end of file
@@ -20,180 +20,534 @@ Output:
 import os
 import json
 import argparse
+import importlib.util
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
-from google.cloud import bigquery
-from google.oauth2 import service_account
-import pandas as pd
-
-# Optional: Gamma.app integration
-try:
-    from gamma_integration import GammaAppClient
-    GAMMA_AVAILABLE = True
-except ImportError:
-    GAMMA_AVAILABLE = False
-
-# LLM Provider imports (install only what you need)
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    from anthropic import Anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from query_cache import QueryResultCache
+from run_manifest import RunManifest
+from bigquery_fixtures import FixtureRecorder, ReplayBigQueryClient
+from client_registry import ClientRegistry, credentials_file_key, fingerprint, google_credentials_healthy
+from conversion_rate_index import CURRENT_PERIOD, L12M_PERIOD
+from llm_cache import LLMResponseCache
+from llm_hedging import HedgedRequest
+from llm_providers import load_provider, provider_api_key
+from llm_rate_limiter import get_rate_limiter
+from prompt_budget import PromptBudgeter, REQUIRED, estimate_tokens, prompt_token_limit_for, scale_top_n
+from report_dataset import ReportDataset
+
+# Heavy dependencies are imported on first use to keep module import (and Cloud Function
+# cold starts) fast: google-cloud-bigquery when a BigQueryClient is created, pandas with
+# the first query result, and the LLM SDK of the selected provider only (llm_providers.py)
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow
+    from google.cloud import bigquery
 
 
 class BigQueryClient:
     """Handles BigQuery connections and queries"""
     
-    def __init__(self, project_id: str, credentials_path: Optional[str] = None):
+    def __init__(self, project_id: str, credentials_path: Optional[str] = None,
+                 cache: Optional[QueryResultCache] = None, max_bytes_billed: Optional[int] = None,
+                 recorder: Optional[FixtureRecorder] = None,
+                 client_registry: Optional[ClientRegistry] = None):
+        self.cache = cache
+        # Saves every result as a replayable fixture (see bigquery_fixtures.py)
+        self.recorder = recorder
+        self.max_bytes_billed = max_bytes_billed
+        # Set by the report generator for the duration of a run to collect per-query stats
+        self.manifest: Optional[RunManifest] = None
+        if client_registry is not None:
+            # Warm instances reuse the clients (and their connection pools and tokens) of earlier runs
+            self.client, self.bqstorage_client = client_registry.get(
+                ("bigquery", project_id) + credentials_file_key(credentials_path),
+                lambda: self._create_clients(project_id, credentials_path),
+                health_check=lambda clients: google_credentials_healthy(getattr(clients[0], '_credentials', None))
+            )
+        else:
+            self.client, self.bqstorage_client = self._create_clients(project_id, credentials_path)
+    
+    @staticmethod
+    def _create_clients(project_id: str, credentials_path: Optional[str] = None) -> Tuple:
+        """Create the BigQuery client and the Storage Read API client (or None)"""
+        from google.cloud import bigquery
+        credentials = None
         if credentials_path and os.path.exists(credentials_path):
+            from google.oauth2 import service_account
             credentials = service_account.Credentials.from_service_account_file(
                 credentials_path,
                 scopes=["https://www.googleapis.com/auth/bigquery"]
             )
-            self.client = bigquery.Client(project=project_id, credentials=credentials)
+            client = bigquery.Client(project=project_id, credentials=credentials)
         else:
             # Use default credentials (e.g., from environment or gcloud)
-            self.client = bigquery.Client(project=project_id)
+            client = bigquery.Client(project=project_id)
+        
+        # Optional: BigQuery Storage Read API for columnar result downloads (needs pyarrow)
+        try:
+            from google.cloud import bigquery_storage
+            bqstorage_available = importlib.util.find_spec("pyarrow") is not None
+        except ImportError:
+            bqstorage_available = False
+        
+        # Storage Read API client, reused for every download (None = REST pages only)
+        bqstorage_client = None
+        if bqstorage_available:
+            try:
+                bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+            except Exception as e:
+                print(f"Warning: BigQuery Storage Read API unavailable, using REST downloads: {e}")
+        return client, bqstorage_client
     
-    def query_to_dataframe(self, query: str) -> pd.DataFrame:
+    def _job_config(self) -> "bigquery.QueryJobConfig":
+        """Build the job config for a query, applying the bytes-billed budget if one is set"""
+        from google.cloud import bigquery
+        job_config = bigquery.QueryJobConfig()
+        if self.max_bytes_billed:
+            job_config.maximum_bytes_billed = self.max_bytes_billed
+        return job_config
+    
+    def query_to_dataframe(self, query: str, name: Optional[str] = None) -> "pd.DataFrame":
         """Execute a query and return results as a pandas DataFrame"""
-        query_job = self.client.query(query)
-        return query_job.to_dataframe()
+        start = time.perf_counter()
+        if self.cache is not None:
+            cached_df = self.cache.get(query)
+            if cached_df is not None:
+                self._record_query(name, None, start, cached_df, source="local_cache")
+                if self.recorder is not None:
+                    self.recorder.save(query, cached_df, name=name)
+                return cached_df
+        
+        query_job = self.client.query(query, job_config=self._job_config())
+        df = self._job_to_dataframe(query_job)
+        self._record_query(name, query_job, start, df)
+        if self.cache is not None:
+            self.cache.put(query, df)
+        if self.recorder is not None:
+            self.recorder.save(query, df, name=name)
+        return df
+    
+    def query_to_arrow(self, query: str, name: Optional[str] = None) -> "pyarrow.Table":
+        """
+        Execute a query and return results as a pyarrow Table (no pandas build)
+        
+        For callers that work on Arrow directly. Results aren't read from or written to the
+        local query cache or fixtures, which store DataFrames.
+        """
+        start = time.perf_counter()
+        query_job = self.client.query(query, job_config=self._job_config())
+        table = self._job_to_arrow(query_job)
+        self._record_query(name, query_job, start, table)
+        return table
+    
+    def _record_query(self, name: Optional[str], query_job, start: float, df: "pd.DataFrame",
+                      source: str = "bigquery") -> None:
+        """Add a query's execution stats to the run manifest (if one is attached)"""
+        if self.manifest is not None:
+            self.manifest.record_query(name or "query", query_job, time.perf_counter() - start,
+                                       rows=len(df), source=source)
+    
+    def _job_to_arrow(self, query_job) -> "pyarrow.Table":
+        """
+        Download a query job's results as a pyarrow Table
+        
+        Same download path as _job_to_dataframe (Storage Read API, REST fallback), but the
+        record batches are returned as they arrive, without building a DataFrame.
+        """
+        if self.bqstorage_client is not None:
+            try:
+                return query_job.to_arrow(bqstorage_client=self.bqstorage_client)
+            except Exception as e:
+                print(f"Warning: Storage Read API download failed, falling back to REST: {e}")
+        return query_job.to_arrow(create_bqstorage_client=False)
+    
+    def _job_to_dataframe(self, query_job) -> "pd.DataFrame":
+        """
+        Download a query job's results as a DataFrame
+        
+        Uses the Storage Read API when it is available (one columnar stream instead of
+        paged JSON), and falls back to the REST download if the read session fails.
+        to_dataframe() keeps BigQuery's dtype mapping (nullable Int64, boolean, dbdate).
+        """
+        if self.bqstorage_client is not None:
+            try:
+                return query_job.to_dataframe(bqstorage_client=self.bqstorage_client)
+            except Exception as e:
+                print(f"Warning: Storage Read API download failed, falling back to REST: {e}")
+        return query_job.to_dataframe(create_bqstorage_client=False)
+    
+    def run_queries_concurrently(self, queries: Dict[str, str], max_workers: int = 8) -> Dict[str, "pd.DataFrame"]:
+        """
+        Submit every query job up front, then collect results through a bounded pool
+        
+        Args:
+            queries: Mapping of query name to SQL text
+            max_workers: Maximum number of result downloads running at once
+        
+        Returns:
+            Mapping of query name to result DataFrame (same keys as queries)
+        """
+        start = time.perf_counter()
+        results = {}
+        if self.cache is not None:
+            for name, query in queries.items():
+                cached_df = self.cache.get(query)
+                if cached_df is not None:
+                    results[name] = cached_df
+                    self._record_query(name, None, start, cached_df, source="local_cache")
+            if results:
+                print(f"  {len(results)} of {len(queries)} query results served from cache")
+        
+        # Submitting is non-blocking, so all jobs start running in BigQuery immediately
+        query_jobs = {name: self.client.query(query, job_config=self._job_config()) for name, query in queries.items() if name not in results}
+        
+        def collect(name: str, query_job) -> "pd.DataFrame":
+            df = self._job_to_dataframe(query_job)
+            self._record_query(name, query_job, start, df)
+            return df
+        
+        if query_jobs:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {name: executor.submit(collect, name, job) for name, job in query_jobs.items()}
+                for name, future in futures.items():
+                    results[name] = future.result()
+                    if self.cache is not None:
+                        self.cache.put(queries[name], results[name])
+        
+        if self.recorder is not None:
+            for name, query in queries.items():
+                self.recorder.save(query, results[name], name=name)
+        
+        return {name: results[name] for name in queries}
+    
+    def dry_run_queries(self, queries: Dict[str, str]) -> Dict[str, int]:
+        """Dry-run each query and return the estimated bytes processed, keyed by query name"""
+        from google.cloud import bigquery
+        estimates = {}
+        for name, query in queries.items():
+            job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+            query_job = self.client.query(query, job_config=job_config)
+            estimates[name] = query_job.total_bytes_processed or 0
+        return estimates
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count for display (e.g. 1.5 GB)"""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def write_report_chunks(chunks: Iterable[str], output_file: str) -> int:
+    """Write report chunks to a file as they are produced; returns the number of characters written"""
+    written = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            # Flush so a streamed LLM analysis shows up in the file as it is generated
+            f.flush()
+            written += len(chunk)
+    return written
 
 
 class LLMAnalyzer:
     """Handles LLM-based analysis of the data"""
     
-    def __init__(self, provider: str = "openai", api_key: Optional[str] = None):
+    # Data summary sections in order of importance to the analysis; when the prompt is
+    # over budget, the lowest-priority sections are omitted first
+    PROMPT_SECTION_PRIORITIES = {
+        'firm_summary': REQUIRED,
+        'performance': 9,
+        'coverage': 9,
+        'quarterly_forecast': 8,
+        'what_if': 8,
+        'risk': 7,
+        'required_metrics': 6,
+        'velocity_forecast': 6,
+        'concentration_risk': 5,
+        'deals': 5,
+        'stage_bottlenecks': 4,
+        'conversion_rates': 4,
+        'sga_performance': 3,
+        'conversion_trends': 2,
+    }
+    
+    # Map-reduce mode: data summary sections analyzed together by one focused LLM call each
+    # (every section belongs to exactly one group; firm_summary is also given to the synthesis)
+    MAP_SECTION_GROUPS = {
+        'capacity_and_coverage': ('firm_summary', 'performance', 'coverage', 'risk', 'required_metrics', 'deals'),
+        'conversion_rates': ('conversion_rates', 'conversion_trends'),
+        'sga_performance': ('sga_performance',),
+        'forecast': ('velocity_forecast', 'quarterly_forecast'),
+        'what_if_routing': ('what_if',),
+        'pipeline_risk': ('concentration_risk', 'stage_bottlenecks'),
+    }
+    MAP_MAX_TOKENS = 2000
+    
+    def __init__(self, provider: str = "openai", api_key: Optional[str] = None,
+                 prompt_token_limit: Optional[int] = None,
+                 response_cache: Optional[LLMResponseCache] = None,
+                 hedge_provider: Optional[str] = None, hedge_after: float = 90.0,
+                 client_registry: Optional[ClientRegistry] = None):
         self.provider = provider.lower()
+        self.temperature = 0.3
+        self.max_tokens = 8000
+        # Optional cache of responses keyed on the full request (prompt includes the report data)
+        self.response_cache = response_cache
+        self.prompt_budgeter = PromptBudgeter(
+            prompt_token_limit_for(self.provider, prompt_token_limit),
+            section_priorities=self.PROMPT_SECTION_PRIORITIES
+        )
         
-        # Handle Gemini API key (uses GEMINI_API_KEY or GOOGLE_API_KEY)
-        if self.provider == "gemini":
-            self.api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        # Provider plugin; its SDK is imported here, only for the provider actually used
+        if client_registry is not None:
+            # Keyed by the API key's fingerprint so a rotated key gets a new client
+            self.llm = client_registry.get(
+                ("llm", self.provider, fingerprint(provider_api_key(self.provider, api_key))),
+                lambda: load_provider(self.provider, api_key=api_key)
+            )
         else:
-            self.api_key = api_key or os.getenv(f"{provider.upper()}_API_KEY")
-        
-        if self.provider == "openai":
-            if not OPENAI_AVAILABLE:
-                raise ImportError("openai package not installed. Run: pip install openai")
-            if not self.api_key:
-                raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
-            self.client = openai.OpenAI(api_key=self.api_key)
-            self.model = "gpt-4o"  # or "gpt-4-turbo-preview"
-        
-        elif self.provider == "anthropic":
-            if not ANTHROPIC_AVAILABLE:
-                raise ImportError("anthropic package not installed. Run: pip install anthropic")
-            if not self.api_key:
-                raise ValueError("Anthropic API key not found. Set ANTHROPIC_API_KEY environment variable.")
-            self.client = Anthropic(api_key=self.api_key)
-            self.model = "claude-3-5-sonnet-20241022"  # or "claude-3-opus-20240229"
-        
-        elif self.provider == "gemini":
-            if not GEMINI_AVAILABLE:
-                raise ImportError("google-generativeai package not installed. Run: pip install google-generativeai")
-            if not self.api_key:
-                raise ValueError("Gemini API key not found. Set GEMINI_API_KEY or GOOGLE_API_KEY environment variable.")
-            genai.configure(api_key=self.api_key)
-            self.client = genai.GenerativeModel("gemini-2.5-pro")  # Latest Gemini model
-            self.model = "gemini-2.5-pro"
+            self.llm = load_provider(self.provider, api_key=api_key)
+        self.model = self.llm.model
         
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}. Use 'openai', 'anthropic', or 'gemini'")
+        # RPM/TPM budget shared with every other analyzer using this provider in the process
+        self.rate_limiter = get_rate_limiter(self.provider)
+        
+        # Optional secondary provider: gets the same request if this one is slow or rate limited
+        self.hedge_after = hedge_after
+        self.hedge_analyzer = None
+        if hedge_provider and hedge_provider.lower() != self.provider:
+            try:
+                self.hedge_analyzer = LLMAnalyzer(provider=hedge_provider, prompt_token_limit=prompt_token_limit,
+                                                  client_registry=client_registry)
+            except (ImportError, ValueError) as e:
+                # A missing SDK or key for the secondary shouldn't stop the report; run unhedged
+                print(f"Warning: LLM hedging disabled: {e}")
     
-    def analyze_capacity_data(self, firm_summary: Dict, coverage_summary: Dict, 
-                             sgm_coverage_data: List[Dict], sgm_risk_data: List[Dict], 
-                             deals_data: List[Dict], conversion_rates_data: List[Dict],
-                             conversion_trends_data: List[Dict], sga_conversion_rates_data: List[Dict],
-                             quarterly_forecast_data: List[Dict], forecast_velocity_data: List[Dict],
-                             what_if_analysis_data: List[Dict], concentration_data: List[Dict],
-                             stage_dist_data: List[Dict]) -> str:
+    def analyze_capacity_data(self, dataset: ReportDataset) -> str:
         """Use LLM to analyze capacity and coverage data and generate insights"""
         
-        # Prepare data summary for LLM
-        data_summary = self._prepare_data_summary(firm_summary, coverage_summary, 
-                                                  sgm_coverage_data, sgm_risk_data, deals_data,
-                                                  conversion_rates_data, conversion_trends_data, sga_conversion_rates_data,
-                                                  quarterly_forecast_data, forecast_velocity_data, what_if_analysis_data,
-                                                  concentration_data, stage_dist_data)
-        
         # Create the prompt
-        prompt = self._create_analysis_prompt(data_summary)
-        
-        # Call LLM
-        if self.provider == "openai":
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent analysis
-                max_tokens=8000
-            )
-            analysis = response.choices[0].message.content
-        
-        elif self.provider == "anthropic":
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=8000,
-                temperature=0.3,
-                system=self._get_system_prompt(),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            analysis = response.content[0].text
+        prompt = self._build_analysis_prompt(dataset)
         
-        elif self.provider == "gemini":
-            # Combine system prompt and user prompt for Gemini
-            full_prompt = f"{self._get_system_prompt()}\n\n{prompt}"
-            
-            # Add retry logic with exponential backoff for quota/rate limit errors
-            import time
-            max_retries = 3
-            retry_delay = 2  # Start with 2 seconds
-            
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.generate_content(
-                        full_prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            temperature=0.3,
-                            max_output_tokens=8000,
-                        )
-                    )
-                    analysis = response.text
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    error_str = str(e)
-                    # Check if it's a quota/rate limit error
-                    if "429" in error_str or "Resource has been exhausted" in error_str or "quota" in error_str.lower():
-                        if attempt < max_retries - 1:
-                            wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                            print(f"API quota/rate limit hit. Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries})")
-                            time.sleep(wait_time)
-                            continue
-                        else:
-                            raise Exception(f"API quota exhausted after {max_retries} attempts. The prompt may be too large. Try reducing data volume or using a different LLM provider.")
-                    else:
-                        # Not a quota error, re-raise immediately
-                        raise
+        # Unchanged data and prompts reuse the previous analysis instead of calling the LLM again
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self._response_cache_key(prompt)
+            cached_analysis = self.response_cache.get(cache_key)
+            if cached_analysis is not None:
+                print("LLM analysis served from response cache (report data unchanged)")
+                return cached_analysis
+        
+        # The secondary provider gets a prompt fitted to its own token budget
+        analysis, answered_by, answered_prompt = self._hedged_call_llm(
+            prompt, secondary_prompt=lambda: self.hedge_analyzer._build_analysis_prompt(dataset))
+        
+        if cache_key is not None:
+            self._store_response(answered_by, answered_prompt, analysis)
         
         return analysis
     
+    def _hedged_call_llm(self, prompt: str, max_tokens: Optional[int] = None,
+                         secondary_prompt: Optional[Callable[[], str]] = None) -> Tuple[str, "LLMAnalyzer", str]:
+        """
+        _call_llm, raced against the hedge provider when one is configured
+
+        Args:
+            secondary_prompt: Builds the prompt for the hedge provider (default: the same prompt)
+
+        Returns:
+            (response text, analyzer whose provider wrote it, prompt that provider was sent)
+        """
+        if self.hedge_analyzer is None:
+            return self._call_llm(prompt, max_tokens=max_tokens), self, prompt
+        hedge = self.hedge_analyzer
+        hedge_prompt = self._hedge_prompt(prompt, secondary_prompt)
+        # No retries on the primary: a quota error fails over to the hedge provider instead
+        request = HedgedRequest(
+            (self.provider, lambda: [self._call_llm(prompt, max_tokens=max_tokens, max_retries=1)]),
+            (hedge.provider, lambda: [hedge._call_llm(hedge_prompt(), max_tokens=max_tokens)]),
+            hedge_after=self.hedge_after
+        )
+        response = request.result()
+        if request.winner == hedge.provider:
+            return response, hedge, hedge_prompt()
+        return response, self, prompt
+    
+    @staticmethod
+    def _hedge_prompt(prompt: str, secondary_prompt: Optional[Callable[[], str]]) -> Callable[[], str]:
+        """The hedge provider's prompt, built at most once (only if the hedge is started)"""
+        built = []
+        def build() -> str:
+            if not built:
+                built.append(secondary_prompt() if secondary_prompt else prompt)
+            return built[0]
+        return build
+    
+    def _call_llm(self, prompt: str, max_tokens: Optional[int] = None, max_retries: int = 4) -> str:
+        """Send one prompt (with the system prompt) to the configured provider and return the response text"""
+        system_prompt = self._get_system_prompt()
+        # Queued behind other calls to the same provider until it fits the RPM/TPM budget;
+        # rate limit errors are retried with Retry-After / jittered back-off
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        return self.rate_limiter.call(
+            lambda: self.llm.complete(system_prompt, prompt, self.temperature, max_tokens or self.max_tokens),
+            prompt_tokens, max_retries=max_retries)
+    
+    def analyze_capacity_data_map_reduce(self, dataset: ReportDataset, max_workers: int = 6) -> str:
+        """
+        Map-reduce version of analyze_capacity_data
+
+        Map: each group of data summary sections (MAP_SECTION_GROUPS) is analyzed by its own
+        LLM call, concurrently, with a small prompt containing only that group's data.
+        Reduce: one synthesis call merges the section findings into the standard report
+        structure from _create_analysis_prompt. Every call is much smaller than the single
+        full prompt, so no data has to be trimmed to fit the prompt budget, and the slowest
+        step is one short section call plus the synthesis instead of one very long generation.
+        """
+        sections = dict(self._iter_data_summary_sections(dataset))
+        
+        group_prompts = {}
+        for group, section_names in self.MAP_SECTION_GROUPS.items():
+            group_data = "".join(sections[name] for name in section_names if name in sections)
+            if group_data.strip():
+                group_prompts[group] = self._create_section_analysis_prompt(group, group_data)
+        
+        print(f"Map-reduce analysis: {len(group_prompts)} section calls "
+              f"(largest prompt ~{max(estimate_tokens(p) for p in group_prompts.values()):,} tokens)")
+        
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                group: executor.submit(self._cached_call_llm, prompt, self.MAP_MAX_TOKENS)
+                for group, prompt in group_prompts.items()
+            }
+            section_findings = {group: future.result() for group, future in futures.items()}
+        print(f"  Section analyses completed in {time.time() - start:.1f}s")
+        
+        # Synthesis: the firm summary plus every section's findings, asked for the usual report structure
+        findings = "".join(
+            f"\n## Findings: {group.replace('_', ' ').title()}\n\n{text.strip()}\n"
+            for group, text in section_findings.items()
+        )
+        data_summary = (f"{sections.get('firm_summary', '')}\n"
+                        f"# Section Analyses\n"
+                        f"The findings below were produced from the full data for each section. "
+                        f"Use them as the basis for the report; keep their numbers and SGM names.\n"
+                        f"{findings}")
+        
+        start = time.time()
+        analysis = self._cached_call_llm(self._create_analysis_prompt(data_summary))
+        print(f"  Synthesis completed in {time.time() - start:.1f}s")
+        return analysis
+    
+    def stream_capacity_data_analysis(self, dataset: ReportDataset) -> Iterator[str]:
+        """
+        Streaming version of analyze_capacity_data: yields the analysis text as it is generated
+
+        The prompt is built (and the response cache checked) when iteration starts. Quota
+        errors are retried only until the first chunk arrives; after that an error is raised
+        to the consumer, since part of the analysis has already been written out.
+        """
+        prompt = self._build_analysis_prompt(dataset)
+        
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self._response_cache_key(prompt)
+            cached_analysis = self.response_cache.get(cache_key)
+            if cached_analysis is not None:
+                print("LLM analysis served from response cache (report data unchanged)")
+                yield cached_analysis
+                return
+        
+        chunks = []
+        answered = []
+        for chunk in self._hedged_stream_llm_response(
+                prompt, secondary_prompt=lambda: self.hedge_analyzer._build_analysis_prompt(dataset),
+                on_answered=lambda analyzer, sent_prompt: answered.append((analyzer, sent_prompt))):
+            chunks.append(chunk)
+            yield chunk
+        
+        if cache_key is not None and answered:
+            self._store_response(*answered[0], "".join(chunks))
+    
+    def _hedged_stream_llm_response(self, prompt: str,
+                                    secondary_prompt: Optional[Callable[[], str]] = None,
+                                    on_answered: Optional[Callable[["LLMAnalyzer", str], None]] = None) -> Iterator[str]:
+        """
+        _stream_llm_response, raced against the hedge provider up to the first chunk
+
+        Args:
+            secondary_prompt: Builds the prompt for the hedge provider (default: the same prompt)
+            on_answered: Called after the last chunk with the analyzer whose provider wrote the
+                response and the prompt that provider was sent
+        """
+        if self.hedge_analyzer is None:
+            yield from self._stream_llm_response(prompt)
+            answered_by, answered_prompt = self, prompt
+        else:
+            hedge = self.hedge_analyzer
+            hedge_prompt = self._hedge_prompt(prompt, secondary_prompt)
+            request = HedgedRequest(
+                (self.provider, lambda: self._stream_llm_response(prompt, max_retries=1)),
+                (hedge.provider, lambda: hedge._stream_llm_response(hedge_prompt())),
+                hedge_after=self.hedge_after
+            )
+            yield from request
+            answered_by, answered_prompt = ((hedge, hedge_prompt()) if request.winner == hedge.provider
+                                            else (self, prompt))
+        if on_answered is not None:
+            on_answered(answered_by, answered_prompt)
+    
+    def _stream_llm_response(self, prompt: str, max_retries: int = 4) -> Iterator[str]:
+        """Yield response text chunks from the configured provider as they arrive"""
+        system_prompt = self._get_system_prompt()
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        # Rate limit errors are retried only until the first chunk has been yielded
+        yield from self.rate_limiter.stream(
+            lambda: self.llm.stream(system_prompt, prompt, self.temperature, self.max_tokens),
+            prompt_tokens, max_retries=max_retries)
+    
+    def _build_analysis_prompt(self, dataset: ReportDataset) -> str:
+        """Build the analysis prompt, with the data summary sized to the provider's prompt token budget"""
+        reserved_tokens = estimate_tokens(self._get_system_prompt()) + estimate_tokens(self._create_analysis_prompt(""))
+        data_summary = self.prompt_budgeter.fit(
+            lambda list_scale: self._iter_data_summary_sections(dataset, list_scale=list_scale),
+            reserved_tokens=reserved_tokens
+        )
+        return self._create_analysis_prompt(data_summary)
+    
+    def _response_cache_key(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """Response cache key for a prompt sent with this analyzer's provider settings"""
+        return LLMResponseCache.make_key(self.provider, self.model, self._get_system_prompt(),
+                                         prompt, self.temperature, max_tokens or self.max_tokens)
+    
+    def _store_response(self, answered_by: "LLMAnalyzer", prompt: str, response: str,
+                        max_tokens: Optional[int] = None) -> None:
+        """
+        Cache a response under the provider, model and prompt that produced it
+
+        When the hedge provider wins the race, its response is keyed on the hedge's own
+        provider/model and prompt, so later primary-only runs never get it as the primary's.
+        """
+        self.response_cache.put(answered_by._response_cache_key(prompt, max_tokens), response,
+                                provider=answered_by.provider, model=answered_by.model)
+    
+    def _cached_call_llm(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """_hedged_call_llm, served from / stored in the response cache when one is configured"""
+        if self.response_cache is None:
+            return self._hedged_call_llm(prompt, max_tokens=max_tokens)[0]
+        cache_key = self._response_cache_key(prompt, max_tokens)
+        response = self.response_cache.get(cache_key)
+        if response is None:
+            response, answered_by, answered_prompt = self._hedged_call_llm(prompt, max_tokens=max_tokens)
+            self._store_response(answered_by, answered_prompt, response, max_tokens)
+        return response
+    
     def _get_system_prompt(self) -> str:
         """System prompt that defines the LLM's role and expertise"""
         return """You are an expert Revenue Operations Partner analyzing pipeline health for sales leadership. 
@@ -341,15 +695,28 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 
 """
     
-    def _prepare_data_summary(self, firm_summary: Dict, coverage_summary: Dict,
-                             sgm_coverage_data: List[Dict], sgm_risk_data: List[Dict], 
-                             deals_data: List[Dict], conversion_rates_data: List[Dict],
-                             conversion_trends_data: List[Dict], sga_conversion_rates_data: List[Dict],
-                             quarterly_forecast_data: List[Dict], forecast_velocity_data: List[Dict],
-                             what_if_analysis_data: List[Dict], concentration_data: List[Dict],
-                             stage_dist_data: List[Dict]) -> str:
+    def _prepare_data_summary(self, dataset: ReportDataset) -> str:
         """Format data for LLM consumption"""
-        
+        return "".join(text for _, text in self._iter_data_summary_sections(dataset))
+
+    def _iter_data_summary_sections(self, dataset: ReportDataset,
+                                    list_scale: float = 1.0) -> Iterator[Tuple[str, str]]:
+        """
+        Format data for LLM consumption, one prompt section at a time
+
+        Yields:
+            (section_name, section_text) tuples in prompt order. Each section is built
+            and released before the next one starts, so the full prompt is only ever
+            materialized once (by the caller's join).
+        """
+        firm_summary = dataset.firm_summary
+        coverage_summary = dataset.coverage_summary
+        sgm_coverage_data = dataset.sgm_coverage_data
+        sgm_risk_data = dataset.sgm_risk_data
+        deals_data = dataset.deals_data
+        conversion_trends_data = dataset.conversion_trends_data
+        stage_dist_data = dataset.stage_dist_data
+
         # Calculate firm-wide metrics
         total_sgms = firm_summary.get('total_sgms', 0)
         total_target = firm_summary.get('total_target', 0)
@@ -392,6 +759,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Pipeline Hygiene:** Total: ${total_pipeline:.1f}M | Stale: ${total_stale_pipeline:.1f}M ({stale_pct:.1f}%)
 """
         
+        yield "firm_summary", summary_text
+        
         # Calculate SGM current quarter performance vs target ($36.75M)
         quarterly_target = 36.75
         sgm_performance = []
@@ -422,7 +791,7 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         
         if met_target:
             performance_text += f"### SGMs Who Have Met/Exceeded Target ({len(met_target)} SGMs)\n"
-            for sgm in met_target[:20]:  # Top 20 performers
+            for sgm in met_target[:scale_top_n(20, list_scale)]:  # Top 20 performers
                 over_under = sgm['over_under']
                 if over_under > 0:
                     performance_text += f"- **{sgm['sgm_name']}:** ${sgm['current_qtr_actuals']:.2f}M ({sgm['target_met_pct']:.1f}% of target) - **Exceeded by ${over_under:.2f}M** 🎯\n"
@@ -434,13 +803,15 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         
         if close_to_target:
             performance_text += f"\n### SGMs Close to Target ({len(close_to_target)} SGMs - 85%+ but not yet met)\n"
-            for sgm in close_to_target[:10]:  # Top 10 close to target
+            for sgm in close_to_target[:scale_top_n(10, list_scale)]:  # Top 10 close to target
                 gap = quarterly_target - sgm['current_qtr_actuals']
                 performance_text += f"- **{sgm['sgm_name']}:** ${sgm['current_qtr_actuals']:.2f}M ({sgm['target_met_pct']:.1f}% of target) - **${gap:.2f}M away from target**\n"
         
+        yield "performance", performance_text
+        
         # Format SGM coverage data (sorted by coverage ratio) - Limit to top 15 to reduce prompt size
         coverage_text = "\n## SGM Coverage Analysis (Top 15 by Risk)\n"
-        for sgm in sgm_coverage_data[:15]:  # Top 15 SGMs by risk
+        for sgm in sgm_coverage_data[:scale_top_n(15, list_scale)]:  # Top 15 SGMs by risk
             sgm_name = sgm.get('sgm_name', 'Unknown')
             
             # INJECT PERSONA CONTEXT
@@ -466,9 +837,11 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Current Quarter Actuals:** ${sgm.get('current_quarter_actual_joined_aum_millions', 0):.2f}M
 """
         
+        yield "coverage", coverage_text
+        
         # Format SGM risk data (for detailed analysis) - Limit to top 10 to reduce prompt size
         risk_text = "\n## SGM Detailed Risk Assessment (Top 10)\n"
-        for sgm in sgm_risk_data[:10]:
+        for sgm in sgm_risk_data[:scale_top_n(10, list_scale)]:
             stale_pct = sgm.get('stale_pct', 0)
             risk_text += f"""
 ### {sgm.get('sgm_name', 'Unknown')}
@@ -479,6 +852,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Quarter Actuals:** ${sgm.get('qtr_actuals_m', 0):.1f}M
 """
         
+        yield "risk", risk_text
+        
         # Format Required SQOs & Joined Analysis with Volatility Context (Condensed)
         required_metrics_text = "\n## Required SQOs & Joined Per Quarter Analysis\n"
         required_metrics_text += "**Methodology:** Required Joined = CEILING($36.75M / Avg Margin AUM). Required SQOs = CEILING(Joined / SQO→Joined Rate).\n"
@@ -487,12 +862,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         required_metrics_text += "**Note:** Enterprise deals (≥$30M) excluded. Bre McDaniel uses enterprise metrics. QTD SQOs used for interpretation.\n\n"
         required_metrics_text += "### SGM-Level Required Metrics vs Current Pipeline (Top 15)\n\n"
         
-        # Sort by required_sqos_per_quarter (highest first) for the table - Limit to top 15
-        sorted_required = sorted([s for s in sgm_risk_data if s.get('required_sqos_per_quarter') is not None], 
-                                key=lambda x: x.get('required_sqos_per_quarter', 0), 
-                                reverse=True)
-        
-        for sgm in sorted_required[:15]:  # Top 15 by required SQOs
+        # Sorted by required_sqos_per_quarter (highest first) once per run - Limit to top 15
+        for sgm in dataset.sgms_by_required_sqos[:scale_top_n(15, list_scale)]:  # Top 15 by required SQOs
             sgm_name = sgm.get('sgm_name', 'Unknown')
             required_sqos = sgm.get('required_sqos_per_quarter', 'N/A')
             required_joined = sgm.get('required_joined_per_quarter', 'N/A')
@@ -592,9 +963,11 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Interpretation (Based on QTD SQOs):** {interpretation}
 """
         
+        yield "required_metrics", required_metrics_text
+        
         # Format top deals - Limit to top 15 to reduce prompt size
         deals_text = "\n## Top Deals Requiring Attention (Stale or High Value - Top 15)\n"
-        for deal in deals_data[:15]:
+        for deal in deals_data[:scale_top_n(15, list_scale)]:
             deals_text += f"""
 - **{deal.get('opportunity_name', 'Unknown')}** ({deal.get('sgm_name', 'Unknown')})
   - Stage: {deal.get('StageName', 'Unknown')}
@@ -603,17 +976,20 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
   - Stale (>120 days): {deal.get('is_stale', 'No')}
 """
         
+        yield "deals", deals_text
+        
         # Format conversion rates (Current Quarter vs Last 12 Months)
         conversion_text = "\n## Conversion Rate Analysis (Current Quarter vs Last 12 Months)\n"
         conversion_text += "\n**NOTE:** SQO→Joined rates use a 90-day lookback period (instead of current quarter) because the average time from SQO to Joined is 77 days. This ensures we're measuring SQOs that have had sufficient time to convert, providing a more accurate benchmark.\n"
         
+        # Every slice below is a lookup in the index built once per run (O(rows) in total)
+        conversion_rates = dataset.conversion_rates
+        
         # Overall rates
-        overall_current = [r for r in conversion_rates_data if r.get('metric_type') == 'Overall' and r.get('period') == 'Current Quarter / Last 90 Days']
-        overall_l12m = [r for r in conversion_rates_data if r.get('metric_type') == 'Overall' and r.get('period') == 'Last 12 Months']
+        cq = conversion_rates.first('Overall', CURRENT_PERIOD)
+        l12m = conversion_rates.first('Overall', L12M_PERIOD)
         
-        if overall_current and overall_l12m:
-            cq = overall_current[0]
-            l12m = overall_l12m[0]
+        if cq and l12m:
             conversion_text += f"""
 ### Overall Conversion Rates
 - **SQL→SQO Rate:**
@@ -628,13 +1004,12 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 """
         
         # By Channel
-        channel_current = {r.get('dimension_value'): r for r in conversion_rates_data if r.get('metric_type') == 'Channel' and r.get('period') == 'Current Quarter / Last 90 Days'}
-        channel_l12m = {r.get('dimension_value'): r for r in conversion_rates_data if r.get('metric_type') == 'Channel' and r.get('period') == 'Last 12 Months'}
+        channel_current = conversion_rates.slice('Channel', CURRENT_PERIOD)
+        channel_l12m = conversion_rates.slice('Channel', L12M_PERIOD)
         
         if channel_current or channel_l12m:
             conversion_text += "\n### Conversion Rates by Channel\n"
-            all_channels = set(list(channel_current.keys()) + list(channel_l12m.keys()))
-            for channel in sorted(all_channels)[:10]:  # Top 10 channels
+            for channel in conversion_rates.dimension_values('Channel')[:scale_top_n(10, list_scale)]:  # Top 10 channels
                 cq = channel_current.get(channel, {})
                 l12m = channel_l12m.get(channel, {})
                 if cq or l12m:
@@ -645,13 +1020,12 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 """
         
         # By Source (top sources)
-        source_current = {r.get('dimension_value'): r for r in conversion_rates_data if r.get('metric_type') == 'Source' and r.get('period') == 'Current Quarter / Last 90 Days'}
-        source_l12m = {r.get('dimension_value'): r for r in conversion_rates_data if r.get('metric_type') == 'Source' and r.get('period') == 'Last 12 Months'}
+        source_current = conversion_rates.slice('Source', CURRENT_PERIOD)
+        source_l12m = conversion_rates.slice('Source', L12M_PERIOD)
         
         if source_current or source_l12m:
             conversion_text += "\n### Conversion Rates by Source (Top Sources)\n"
-            all_sources = set(list(source_current.keys()) + list(source_l12m.keys()))
-            for source in sorted(all_sources)[:10]:  # Top 10 sources
+            for source in conversion_rates.dimension_values('Source')[:scale_top_n(10, list_scale)]:  # Top 10 sources
                 cq = source_current.get(source, {})
                 l12m = source_l12m.get(source, {})
                 if cq or l12m:
@@ -661,11 +1035,13 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
   - SQO→Joined: Last 90 Days {cq.get('sqo_to_joined_rate', 0)*100:.1f}% vs L12M {l12m.get('sqo_to_joined_rate', 0)*100:.1f}% (Change: {(cq.get('sqo_to_joined_rate', 0) - l12m.get('sqo_to_joined_rate', 0))*100:+.1f}pp)
 """
         
+        yield "conversion_rates", conversion_text
+        
         # Conversion rate trends (biggest changes)
         trends_text = "\n## Conversion Rate Trends (Biggest Changes)\n"
         trends_text += "Channels/Sources with significant rate changes that may explain capacity issues:\n"
         trends_text += "**NOTE:** SQO→Joined rates use 90-day lookback (instead of current quarter) to account for 77-day average cycle time.\n"
-        for trend in conversion_trends_data[:15]:  # Top 15 trends
+        for trend in conversion_trends_data[:scale_top_n(15, list_scale)]:  # Top 15 trends
             channel = trend.get('channel', 'Overall')
             source = trend.get('source', 'Overall')
             sql_change = trend.get('sql_to_sqo_rate_change', 0) * 100
@@ -678,6 +1054,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
   - Volume: {trend.get('current_qtr_sql_volume', 0):.0f} SQLs this quarter (L12M avg: {trend.get('avg_l12m_sql_volume_per_quarter', 0):.0f} per quarter)
 """
         
+        yield "conversion_trends", trends_text
+        
         # SGA-level conversion rate analysis
         sga_text = "\n## SGA Performance Analysis (Current Quarter vs Last 12 Months)\n"
         sga_text += "Key conversion rates for each SGA to identify top performers and coaching opportunities:\n"
@@ -688,16 +1066,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         
         # Segment SGAs into Inbound vs Outbound
         inbound_sgas = ['Lauren George', 'Jacqueline Tully']
-        inbound_sga_data = [s for s in sga_conversion_rates_data if s.get('sga_name') in inbound_sgas]
-        outbound_sga_data = [s for s in sga_conversion_rates_data if s.get('sga_name') not in inbound_sgas]
-        
-        # Sort SGAs by SQL→SQO rate change within each group
-        sorted_inbound = sorted(inbound_sga_data, 
-                               key=lambda x: abs(x.get('sql_to_sqo_rate_change', 0)), 
-                               reverse=True)
-        sorted_outbound = sorted(outbound_sga_data, 
-                                key=lambda x: abs(x.get('sql_to_sqo_rate_change', 0)), 
-                                reverse=True)
+        # Both groups come sorted by SQL→SQO rate change (split and sorted once per run)
+        sorted_inbound, sorted_outbound = dataset.sga_conversion_rates.segment(inbound_sgas)
         
         # Top performers within each group
         inbound_top_performers = sorted(
@@ -709,7 +1079,7 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
             [s for s in sorted_outbound if s.get('sql_to_sqo_rate_change', 0) > 0.05 or s.get('current_qtr_sqo_volume', 0) >= 5],
             key=lambda x: (x.get('current_qtr_sqo_volume', 0), x.get('sql_to_sqo_rate_change', 0)),
             reverse=True
-        )[:10]
+        )[:scale_top_n(10, list_scale)]
         
         # Underperformers within each group
         inbound_underperformers = sorted(
@@ -719,7 +1089,7 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         outbound_underperformers = sorted(
             [s for s in sorted_outbound if s.get('sql_to_sqo_rate_change', 0) < -0.05 and s.get('current_qtr_sqo_volume', 0) < 5],
             key=lambda x: (x.get('sql_to_sqo_rate_change', 0), -x.get('current_qtr_sqo_volume', 0))
-        )[:10]
+        )[:scale_top_n(10, list_scale)]
         
         # Volume leaders within each group
         inbound_volume_leaders = sorted(
@@ -731,7 +1101,7 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
             sorted_outbound,
             key=lambda x: x.get('current_qtr_sqo_volume', 0),
             reverse=True
-        )[:10]
+        )[:scale_top_n(10, list_scale)]
         
         # Volume leaders section - Inbound SGAs
         if inbound_volume_leaders:
@@ -1040,7 +1410,7 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 """
         
         # All SGAs summary (for context) - narrative format, segmented by Inbound vs Outbound
-        if inbound_sga_data:
+        if sorted_inbound:
             sga_text += "\n### All Inbound SGAs Summary (Lauren George, Jacqueline Tully)\n"
             for sga in sorted_inbound:
                 sga_name = sga.get('sga_name', 'Unknown')
@@ -1069,9 +1439,9 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - {sql_sqo_narrative}. Volume: {sga.get('current_qtr_sql_volume', 0):.0f} SQLs → {sqo_volume:.0f} SQOs this quarter
 """
         
-        if outbound_sga_data:
+        if sorted_outbound:
             sga_text += "\n### All Outbound SGAs Summary (Sorted by SQL→SQO Rate Change)\n"
-            for sga in sorted_outbound[:20]:  # Top 20 outbound SGAs by rate change
+            for sga in sorted_outbound[:scale_top_n(20, list_scale)]:  # Top 20 outbound SGAs by rate change
                 sga_name = sga.get('sga_name', 'Unknown')
                 cq_sql_sqo = sga.get('current_qtr_sql_to_sqo_rate', 0) * 100
                 l12m_sql_sqo = sga.get('l12m_sql_to_sqo_rate', 0) * 100
@@ -1098,16 +1468,19 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - {sql_sqo_narrative}. Volume: {sga.get('current_qtr_sql_volume', 0):.0f} SQLs → {sqo_volume:.0f} SQOs this quarter
 """
         
+        yield "sga_performance", sga_text
+        
         # Format velocity forecast data
         velocity_text = "\n## Velocity-Based Forecast Analysis (70-Day Cycle Time)\n"
         velocity_text += "**Methodology:** We use a physics-based forecast (SQO Date + 70 days median cycle time) rather than relying on manual CloseDate entries, which are often inaccurate.\n\n"
         
-        # Calculate firm-wide totals
-        total_current_qtr_velocity = sum(s.get('current_qtr_velocity_forecast', 0) for s in forecast_velocity_data)
-        total_overdue_slip = sum(s.get('overdue_slip_forecast', 0) for s in forecast_velocity_data)
-        total_next_qtr_velocity = sum(s.get('next_qtr_velocity_forecast', 0) for s in forecast_velocity_data)
-        total_overdue_deals = sum(s.get('overdue_deal_count', 0) for s in forecast_velocity_data)
-        total_next_qtr_deals = sum(s.get('next_qtr_deal_count', 0) for s in forecast_velocity_data)
+        # Firm-wide totals (summed once per run)
+        velocity_totals = dataset.velocity_totals
+        total_current_qtr_velocity = velocity_totals['current_qtr_velocity_forecast']
+        total_overdue_slip = velocity_totals['overdue_slip_forecast']
+        total_next_qtr_velocity = velocity_totals['next_qtr_velocity_forecast']
+        total_overdue_deals = velocity_totals['overdue_deal_count']
+        total_next_qtr_deals = velocity_totals['next_qtr_deal_count']
         
         velocity_text += f"""
 ### Firm-Wide Velocity Forecast Summary
@@ -1120,12 +1493,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 ### SGM-Level Velocity Forecast (Top 20 by Current Quarter Forecast)
 """
         
-        # Sort by current quarter velocity forecast
-        sorted_velocity = sorted(forecast_velocity_data, 
-                                key=lambda x: x.get('current_qtr_velocity_forecast', 0), 
-                                reverse=True)
-        
-        for sgm in sorted_velocity[:20]:
+        # Sorted by current quarter velocity forecast
+        for sgm in dataset.velocity_by_current_qtr[:scale_top_n(20, list_scale)]:
             sgm_name = sgm.get('sgm_name', 'Unknown')
             current_qtr = sgm.get('current_qtr_velocity_forecast', 0)
             overdue = sgm.get('overdue_slip_forecast', 0)
@@ -1141,6 +1510,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Total Pipeline Value:** ${sgm.get('total_pipeline_value', 0):.2f}M
 """
         
+        yield "velocity_forecast", velocity_text
+        
         # Format quarterly forecast data (from vw_sgm_capacity_coverage_with_forecast)
         quarterly_target = 36.75
         forecast_text = "\n## Quarterly Forecast Analysis (Current & Next Quarter)\n"
@@ -1151,11 +1522,12 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         forecast_text += "- **Expected Next Quarter:** Pipeline forecast for deals projected to close next quarter\n"
         forecast_text += "- **Target:** $36.75M per SGM per quarter\n\n"
         
-        # Calculate firm-wide totals
-        total_actuals = sum(s.get('current_quarter_actuals', 0) for s in quarterly_forecast_data)
-        total_expected_eoq = sum(s.get('expected_end_of_quarter', 0) for s in quarterly_forecast_data)
-        total_expected_next = sum(s.get('expected_next_quarter', 0) for s in quarterly_forecast_data)
-        total_target_all = len(quarterly_forecast_data) * quarterly_target
+        # Firm-wide totals (summed once per run)
+        forecast_totals = dataset.forecast_totals
+        total_actuals = forecast_totals['current_quarter_actuals']
+        total_expected_eoq = forecast_totals['expected_end_of_quarter']
+        total_expected_next = forecast_totals['expected_next_quarter']
+        total_target_all = len(dataset.quarterly_forecast_data) * quarterly_target
         
         forecast_text += f"""
 ### Firm-Wide Quarterly Forecast Summary
@@ -1169,12 +1541,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 ### SGM-Level Quarterly Forecast (Top 20 by Current Quarter Actuals)
 """
         
-        # Sort by current quarter actuals
-        sorted_forecast = sorted(quarterly_forecast_data, 
-                                key=lambda x: x.get('current_quarter_actuals', 0), 
-                                reverse=True)
-        
-        for sgm in sorted_forecast[:20]:
+        # Sorted by current quarter actuals
+        for sgm in dataset.forecast_by_actuals[:scale_top_n(20, list_scale)]:
             sgm_name = sgm.get('sgm_name', 'Unknown')
             actuals = sgm.get('current_quarter_actuals', 0)
             expected_eoq = sgm.get('expected_end_of_quarter', 0)
@@ -1204,6 +1572,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Coverage Status:** {coverage_status}
 """
         
+        yield "quarterly_forecast", forecast_text
+        
         # Format what-if analysis data
         what_if_text = "\n## What-If Analysis: SQO & SQL Routing Recommendations\n"
         what_if_text += "**Purpose:** Identify SGMs forecasted to miss targets and calculate how many SQOs/SQLs they need to get back on track.\n\n"
@@ -1213,22 +1583,12 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         what_if_text += "- Considers deal-size dependent velocity and close dates from forecast model\n"
         what_if_text += "- Accounts for SGM's SQL→SQO conversion rate to calculate SQL routing needs\n\n"
         
-        # Sort by priority (current quarter gap first, then next quarter gap)
-        sorted_what_if = sorted(what_if_analysis_data, 
-                               key=lambda x: (
-                                   x.get('current_qtr_gap_millions', 0) > 0,  # Current quarter gaps first
-                                   -x.get('current_qtr_gap_millions', 0),  # Largest gaps first
-                                   x.get('next_qtr_gap_millions', 0) > 0,  # Then next quarter gaps
-                                   -x.get('next_qtr_gap_millions', 0)
-                               ),
-                               reverse=True)
-        
-        # Current quarter gaps
-        current_qtr_gaps = [s for s in sorted_what_if if s.get('current_qtr_gap_millions', 0) > 0]
+        # Current quarter gaps (in priority order: current quarter gap first, then next quarter gap)
+        current_qtr_gaps = dataset.what_if_current_qtr_gaps
         if current_qtr_gaps:
             what_if_text += "### Current Quarter: SGMs Forecasted to Miss Target\n"
             what_if_text += "These SGMs need additional SQOs this quarter to hit their $36.75M target:\n\n"
-            for sgm in current_qtr_gaps[:20]:  # Top 20
+            for sgm in current_qtr_gaps[:scale_top_n(20, list_scale)]:  # Top 20
                 sgm_name = sgm.get('sgm_name', 'Unknown')
                 current_qtr_gap = sgm.get('current_qtr_gap_millions', 0)
                 expected_eoq = sgm.get('expected_end_of_quarter', 0)
@@ -1256,12 +1616,12 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Routing Priority:** {'🔴 HIGH' if current_qtr_gap > 10 else '🟡 MEDIUM'} (${current_qtr_gap:.2f}M gap)
 """
         
-        # Next quarter gaps
-        next_qtr_gaps = [s for s in sorted_what_if if s.get('next_qtr_gap_millions', 0) > 0 and s.get('current_qtr_gap_millions', 0) <= 0]
+        # Next quarter gaps (SGMs without a current quarter gap)
+        next_qtr_gaps = dataset.what_if_next_qtr_gaps
         if next_qtr_gaps:
             what_if_text += "\n### Next Quarter: SGMs Forecasted to Miss Target\n"
             what_if_text += "These SGMs need additional SQOs this quarter to build pipeline for next quarter:\n\n"
-            for sgm in next_qtr_gaps[:20]:  # Top 20
+            for sgm in next_qtr_gaps[:scale_top_n(20, list_scale)]:  # Top 20
                 sgm_name = sgm.get('sgm_name', 'Unknown')
                 next_qtr_gap = sgm.get('next_qtr_gap_millions', 0)
                 expected_next = sgm.get('expected_next_quarter', 0)
@@ -1291,10 +1651,10 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 """
         
         # Summary of routing recommendations
-        total_sqos_needed_current = sum(s.get('sqos_needed_current_qtr', 0) for s in current_qtr_gaps)
-        total_sqls_needed_current = sum(s.get('sqls_needed_current_qtr', 0) for s in current_qtr_gaps)
-        total_sqos_needed_next = sum(s.get('sqos_needed_next_qtr', 0) for s in next_qtr_gaps)
-        total_sqls_needed_next = sum(s.get('sqls_needed_next_qtr', 0) for s in next_qtr_gaps)
+        total_sqos_needed_current = dataset.what_if_current_gap_totals['sqos_needed_current_qtr']
+        total_sqls_needed_current = dataset.what_if_current_gap_totals['sqls_needed_current_qtr']
+        total_sqos_needed_next = dataset.what_if_next_gap_totals['sqos_needed_next_qtr']
+        total_sqls_needed_next = dataset.what_if_next_gap_totals['sqls_needed_next_qtr']
         
         what_if_text += f"""
 ### Summary: Total Routing Needs
@@ -1315,16 +1675,14 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 4. **Timing:** Current quarter SQOs need to be received ASAP to have time to close. Next quarter SQOs can be spread throughout the current quarter.
 """
         
+        yield "what_if", what_if_text
+        
         # Format Concentration Risk
         risk_context_text = "\n## Pipeline Concentration Risk (Whale Dependency)\n"
         risk_context_text += "**High Risk = Top deal represents >50% of total pipeline. Binary Risk: If that one deal fails, the SGM misses target.**\n\n"
         
-        # Sort by concentration percentage (highest first)
-        sorted_concentration = sorted(concentration_data, 
-                                     key=lambda x: x.get('top_deal_concentration_pct', 0), 
-                                     reverse=True)
-        
-        for row in sorted_concentration:
+        # Sorted by concentration percentage (highest first)
+        for row in dataset.concentration_by_pct:
             pct = row.get('top_deal_concentration_pct', 0) * 100
             if pct > 40:  # Only flag significant concentration
                 sgm_name = row.get('sgm_name', 'Unknown')
@@ -1347,6 +1705,8 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
 - **Interpretation:** If this deal fails, the SGM loses {pct:.1f}% of their pipeline value. This is a binary risk scenario.
 """
         
+        yield "concentration_risk", risk_context_text
+        
         # Format Stage Bottlenecks
         stage_text = "\n## Stage Distribution Bottlenecks (Pipeline Immaturity Analysis)\n"
         stage_text += "**High Risk = >60% of pipeline value stuck in early stages (Discovery/Qualifying). These deals are unlikely to close in the current quarter.**\n\n"
@@ -1414,7 +1774,19 @@ Generate a report using this structure. Be direct. Use bullet points. Use tables
         if not sorted_bloat:
             stage_text += "*No SGMs found with significant early stage bloat (>60% in Discovery/Qualifying).*\n"
         
-        return summary_text + performance_text + coverage_text + risk_text + required_metrics_text + deals_text + conversion_text + trends_text + sga_text + velocity_text + forecast_text + what_if_text + risk_context_text + stage_text
+        yield "stage_bottlenecks", stage_text
+    
+    def _create_section_analysis_prompt(self, group: str, group_data: str) -> str:
+        """Focused prompt for one section group in map-reduce mode"""
+        return f"""Analyze only the following part of the sales capacity and coverage data ({group.replace('_', ' ')}), using the definitions and context provided to you. Your findings will be merged with analyses of the other sections into a single executive report, so do not write an introduction or summary of the whole report.
+
+{group_data}
+
+Return concise findings in markdown (at most ~400 words):
+- The 3-6 most important facts, with the exact numbers and SGM/SGA names they apply to
+- Risks or anomalies that leadership should know about (e.g. concentration risk, stage bloat, stale pipeline, coverage gaps)
+- Specific, actionable recommendations supported by this data
+"""
     
     def _create_analysis_prompt(self, data_summary: str) -> str:
         """Create the analysis prompt for the LLM"""
@@ -1655,17 +2027,195 @@ class CapacityReportGenerator:
     """Main class that orchestrates report generation"""
     
     def __init__(self, project_id: str, dataset: str = "savvy_analytics", 
-                 credentials_path: Optional[str] = None, llm_provider: str = "openai"):
+                 credentials_path: Optional[str] = None, llm_provider: str = "openai",
+                 max_concurrent_queries: int = 8, cache_dir: Optional[str] = None,
+                 cache_max_staleness: int = 43200, cache_max_size_mb: int = 500,
+                 max_bytes_billed: Optional[int] = None, record_fixtures_dir: Optional[str] = None,
+                 bq_client: Optional[BigQueryClient] = None, prompt_token_limit: Optional[int] = None,
+                 llm_cache_path: Optional[str] = None, llm_cache_max_age: int = 604800,
+                 llm_mode: str = "single", hedge_provider: Optional[str] = None,
+                 hedge_after: float = 90.0, progress_callback: Optional[Callable[[str], None]] = None,
+                 client_registry: Optional[ClientRegistry] = None):
         self.project_id = project_id
         self.dataset = dataset
-        self.bq_client = BigQueryClient(project_id, credentials_path)
-        self.llm_analyzer = LLMAnalyzer(provider=llm_provider)
+        self.max_concurrent_queries = max_concurrent_queries
+        # "single": one LLM call over the full data summary (streamable)
+        # "map-reduce": concurrent per-section calls merged by a synthesis call
+        if llm_mode not in ("single", "map-reduce"):
+            raise ValueError(f"Unsupported LLM mode: {llm_mode}. Use 'single' or 'map-reduce'")
+        self.llm_mode = llm_mode
+        cache = None
+        if cache_dir:
+            cache = QueryResultCache(cache_dir, project_id, dataset,
+                                     max_staleness=cache_max_staleness,
+                                     max_size_mb=cache_max_size_mb)
+        recorder = FixtureRecorder(record_fixtures_dir) if record_fixtures_dir else None
+        # bq_client lets callers inject a different client, e.g. ReplayBigQueryClient for offline runs
+        self.bq_client = bq_client or BigQueryClient(project_id, credentials_path, cache=cache,
+                                                     max_bytes_billed=max_bytes_billed,
+                                                     recorder=recorder, client_registry=client_registry)
+        # Execution statistics of the most recent generate_report() call
+        self.manifest: Optional[RunManifest] = None
+        # Called with the name of each report stage as it starts (e.g. for job status polling)
+        self.progress_callback = progress_callback
+        # No provider means BigQuery-only use (e.g. dry runs), so no LLM client is set up
+        response_cache = LLMResponseCache(llm_cache_path, max_age=llm_cache_max_age) if llm_cache_path else None
+        self.llm_analyzer = LLMAnalyzer(provider=llm_provider, prompt_token_limit=prompt_token_limit,
+                                        response_cache=response_cache, hedge_provider=hedge_provider,
+                                        hedge_after=hedge_after,
+                                        client_registry=client_registry) if llm_provider else None
     
     def generate_report(self, output_file: Optional[str] = None) -> str:
         """Generate the complete capacity and coverage summary report"""
-        
+
+        report_inputs = self._collect_report_inputs()
+
+        # Generate full report
+        with self.manifest.stage("formatting"):
+            report = self._format_report(**report_inputs)
+
+        # Save to file (if output_file is provided and not None)
+        if output_file is not None:
+            with self.manifest.stage("write"):
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(report)
+            print(f"Report saved to: {output_file}")
+
+            manifest_path = RunManifest.path_for_report(output_file)
+            self.manifest.write(manifest_path)
+            print(f"Run manifest saved to: {manifest_path}")
+        elif output_file is None:
+            # No file output requested (e.g., Cloud Function usage)
+            # Report is returned as string
+            print("Report generated (returned as string, not saved to file)")
+
+        return report
+
+    def stream_report(self) -> Iterator[str]:
+        """
+        Generate the report as a stream of text chunks
+
+        Queries run before this method returns (so query failures surface here, not
+        halfway through a response). The report is then rendered lazily as the returned
+        iterator is consumed, e.g. by an HTTP response: the header goes out right away
+        and the LLM analysis follows token by token as the provider generates it.
+        """
+        report_inputs = self._collect_report_inputs(stream_llm=True)
+        return self._iter_report_chunks(**report_inputs)
+
+    def write_report(self, output_file: str) -> str:
+        """Generate the report and stream it to output_file (LLM analysis is written as it is generated)"""
+
+        report_inputs = self._collect_report_inputs(stream_llm=True)
+
+        # Formatting (and the streamed LLM call) happen while writing, so "write" includes them
+        with self.manifest.stage("write"):
+            written = write_report_chunks(self._iter_report_chunks(**report_inputs), output_file)
+        print(f"Report saved to: {output_file} ({format_bytes(written)})")
+
+        manifest_path = RunManifest.path_for_report(output_file)
+        self.manifest.write(manifest_path)
+        print(f"Run manifest saved to: {manifest_path}")
+
+        return output_file
+
+    def _timed_stream(self, chunks: Iterable[str], stage: str) -> Iterator[str]:
+        """Pass chunks through, recording the time spent producing them as a manifest stage"""
+        with self.manifest.stage(stage):
+            yield from chunks
+    
+    def _collect_report_inputs(self, stream_llm: bool = False) -> Dict:
+        """
+        Run the report queries and LLM analysis; returns the keyword arguments for _format_report
+
+        With stream_llm=True, 'llm_analysis' is an iterator of text chunks that calls the
+        LLM lazily, so the analysis can be written out as it is generated.
+        """
+
         print("Querying BigQuery views...")
         
+        # Per-run execution statistics (written next to the report as JSON)
+        self.manifest = RunManifest("capacity_summary", on_stage=self.progress_callback)
+        self.bq_client.manifest = self.manifest
+        
+        queries = self._build_queries()
+        
+        # Execute queries (all jobs are submitted first, results collected concurrently)
+        print(f"Running 13 queries (up to {self.max_concurrent_queries} result downloads at a time)...")
+        with self.manifest.stage("queries"):
+            results = self.bq_client.run_queries_concurrently(queries, max_workers=self.max_concurrent_queries)
+        
+        firm_summary_df = results['firm_summary']
+        coverage_summary_df = results['coverage_summary']
+        sgm_coverage_df = results['sgm_coverage']
+        sgm_risk_df = results['sgm_risk']
+        deals_df = results['deals']
+        concentration_df = results['concentration']
+        stage_dist_df = results['stage_dist']
+        conversion_rates_df = results['conversion_rates']
+        conversion_trends_df = results['conversion_trends']
+        sga_conversion_rates_df = results['sga_conversion_rates']
+        quarterly_forecast_df = results['quarterly_forecast']
+        forecast_velocity_df = results['forecast_velocity']
+        what_if_analysis_df = results['what_if_analysis']
+        
+        # Convert to dictionaries; sort orders, table slices and totals are computed once
+        # here and shared by every prompt build and the report tables
+        dataset = ReportDataset(
+            firm_summary=firm_summary_df.iloc[0].to_dict() if len(firm_summary_df) > 0 else {},
+            coverage_summary=coverage_summary_df.iloc[0].to_dict() if len(coverage_summary_df) > 0 else {},
+            sgm_coverage_data=sgm_coverage_df.to_dict('records'),
+            sgm_risk_data=sgm_risk_df.to_dict('records'),
+            deals_data=deals_df.to_dict('records'),
+            conversion_rates_data=conversion_rates_df.to_dict('records'),
+            conversion_trends_data=conversion_trends_df.to_dict('records'),
+            sga_conversion_rates_data=sga_conversion_rates_df.to_dict('records'),
+            quarterly_forecast_data=quarterly_forecast_df.to_dict('records'),
+            forecast_velocity_data=forecast_velocity_df.to_dict('records'),
+            what_if_analysis_data=what_if_analysis_df.to_dict('records'),
+            concentration_data=concentration_df.to_dict('records'),
+            stage_dist_data=stage_dist_df.to_dict('records'),
+        )
+        
+        print(f"Retrieved data: {len(firm_summary_df)} firm summary rows, {len(coverage_summary_df)} coverage summary rows, {len(sgm_coverage_df)} SGM coverage rows, {len(sgm_risk_df)} SGM risk rows, {len(deals_df)} deal rows, {len(concentration_df)} concentration risk rows, {len(stage_dist_df)} stage distribution rows, {len(conversion_rates_df)} conversion rate rows, {len(conversion_trends_df)} trend rows, {len(sga_conversion_rates_df)} SGA conversion rate rows, {len(quarterly_forecast_df)} quarterly forecast rows, {len(forecast_velocity_df)} velocity forecast rows, {len(what_if_analysis_df)} what-if analysis rows")
+        print("Analyzing data with LLM (using capacity & coverage framework with conversion rate analysis, velocity forecasting, what-if routing recommendations, concentration risk, and stage bottlenecks)...")
+        
+        # Generate LLM analysis
+        if self.llm_mode == "map-reduce":
+            # The synthesis call only starts once every section call has finished, so there
+            # is nothing to stream early; the finished analysis is passed through as one string
+            with self.manifest.stage("llm_analysis"):
+                llm_analysis = self.llm_analyzer.analyze_capacity_data_map_reduce(dataset)
+        elif stream_llm:
+            # Nothing is sent to the LLM until the report stream reaches the analysis section
+            llm_analysis = self._timed_stream(self.llm_analyzer.stream_capacity_data_analysis(dataset),
+                                              "llm_analysis")
+        else:
+            with self.manifest.stage("llm_analysis"):
+                llm_analysis = self.llm_analyzer.analyze_capacity_data(dataset)
+        
+        return {
+            'dataset': dataset,
+            'llm_analysis': llm_analysis,
+        }
+    
+    def estimate_query_costs(self) -> Dict[str, int]:
+        """Dry-run every report query and print the estimated bytes processed"""
+        print("Dry run: estimating bytes processed for each query (nothing is executed)...")
+        estimates = self.bq_client.dry_run_queries(self._build_queries())
+        
+        print(f"\n{'Query':<30} {'Bytes Processed':>18}")
+        print("-" * 49)
+        for name, num_bytes in sorted(estimates.items(), key=lambda x: x[1], reverse=True):
+            print(f"{name:<30} {format_bytes(num_bytes):>18}")
+        print("-" * 49)
+        print(f"{'TOTAL':<30} {format_bytes(sum(estimates.values())):>18}")
+        
+        return estimates
+    
+    def _build_queries(self) -> Dict[str, str]:
+        """Build the SQL for every report query, keyed by query name"""
+        
         # Query 1: Firm-level summary from vw_sgm_capacity_model_refined
         firm_summary_query = f"""
         SELECT 
@@ -1825,181 +2375,123 @@ class CapacityReportGenerator:
         # - Join Opportunity to Lead to get Lead source (matching vw_conversion_rates FULL OUTER JOIN)
         # - Use COALESCE(o.LeadSource, l.LeadSource) for Original_source (matching vw_conversion_rates)
         # - Join Channel_Group_Mapping using that COALESCE value
+        # Each base relation is read once: GROUPING SETS produce the Overall, Channel and Source
+        # rows in one aggregation, and conditional aggregates produce both periods from the same
+        # rows (check_conversion_rates_query.py compares this against the previous per-slice query)
         conversion_rates_query = f"""
         -- SQO→Joined rates using 90-day lookback (based on Date_Became_SQO__c)
         -- Matches vw_conversion_rates.sql logic for source attribution
         WITH SQO_Joined_90_Day AS (
           SELECT 
-            'Overall' AS metric_type,
-            'Overall' AS dimension_value,
-            'Last 90 Days' AS period,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
-          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
-          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
-            AND LOWER(o.SQL__c) = 'yes'
-        ),
-        SQO_Joined_90_Day_Channel AS (
-          SELECT 
-            'Channel' AS metric_type,
-            COALESCE(g.Channel_Grouping_Name, 'Other') AS dimension_value,
-            'Last 90 Days' AS period,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
-          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
-          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
-            ON l.ConvertedOpportunityId = o.Id
-          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Channel_Group_Mapping` g
-            ON COALESCE(o.LeadSource, l.LeadSource) = g.Original_Source_Salesforce
-          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
-            AND LOWER(o.SQL__c) = 'yes'
-          GROUP BY g.Channel_Grouping_Name
-          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
-        ),
-        SQO_Joined_90_Day_Source AS (
-          SELECT 
-            'Source' AS metric_type,
-            COALESCE(o.LeadSource, l.LeadSource, 'Unknown') AS dimension_value,
-            'Last 90 Days' AS period,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
-            COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND o.advisor_join_date__c IS NOT NULL THEN o.Full_Opportunity_ID__c END) AS sqo_to_joined_num
-          FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
-          LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
-            ON l.ConvertedOpportunityId = o.Id
-          WHERE o.recordtypeid = '012Dn000000mrO3IAI'
-            AND LOWER(o.SQL__c) = 'yes'
-            AND COALESCE(o.LeadSource, l.LeadSource) IS NOT NULL
-          GROUP BY COALESCE(o.LeadSource, l.LeadSource, 'Unknown')
-          HAVING COUNT(DISTINCT CASE WHEN o.Date_Became_SQO__c IS NOT NULL AND DATE(o.Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN o.Full_Opportunity_ID__c END) >= 5
-        ),
-        Current_Quarter_Overall AS (
-          SELECT 
-            'Overall' AS metric_type,
-            'Overall' AS dimension_value,
-            'Current Quarter' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined will come from 90-day lookback CTE
-            NULL AS sqo_to_joined_denom,
-            NULL AS sqo_to_joined_num
-          FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-        ),
-        Last_12_Months_Overall AS (
-          SELECT 
-            'Overall' AS metric_type,
-            'Overall' AS dimension_value,
-            'Last 12 Months' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
-          FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-        ),
-        Current_Quarter_Channel AS (
-          SELECT 
-            'Channel' AS metric_type,
-            Channel_Grouping_Name AS dimension_value,
-            'Current Quarter' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined will come from 90-day lookback CTE
-            NULL AS sqo_to_joined_denom,
-            NULL AS sqo_to_joined_num
-          FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-          WHERE Channel_Grouping_Name IS NOT NULL
-          GROUP BY Channel_Grouping_Name
-          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+            CASE
+              WHEN GROUPING(channel) = 0 THEN 'Channel'
+              WHEN GROUPING(lead_source) = 0 THEN 'Source'
+              ELSE 'Overall'
+            END AS metric_type,
+            CASE
+              WHEN GROUPING(channel) = 0 THEN COALESCE(channel, 'Other')
+              WHEN GROUPING(lead_source) = 0 THEN lead_source
+              ELSE 'Overall'
+            END AS dimension_value,
+            COUNT(DISTINCT CASE WHEN Date_Became_SQO__c IS NOT NULL AND DATE(Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) THEN Full_Opportunity_ID__c END) AS sqo_to_joined_denom,
+            COUNT(DISTINCT CASE WHEN Date_Became_SQO__c IS NOT NULL AND DATE(Date_Became_SQO__c) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY) AND advisor_join_date__c IS NOT NULL THEN Full_Opportunity_ID__c END) AS sqo_to_joined_num
+          FROM (
+            -- The Lead/mapping joins can repeat an opportunity; the DISTINCT counts absorb that
+            SELECT 
+              o.Full_Opportunity_ID__c,
+              o.Date_Became_SQO__c,
+              o.advisor_join_date__c,
+              g.Channel_Grouping_Name AS channel,
+              COALESCE(o.LeadSource, l.LeadSource) AS lead_source
+            FROM `savvy-gtm-analytics.SavvyGTMData.Opportunity` o
+            LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Lead` l
+              ON l.ConvertedOpportunityId = o.Id
+            LEFT JOIN `savvy-gtm-analytics.SavvyGTMData.Channel_Group_Mapping` g
+              ON COALESCE(o.LeadSource, l.LeadSource) = g.Original_Source_Salesforce
+            WHERE o.recordtypeid = '012Dn000000mrO3IAI'
+              AND LOWER(o.SQL__c) = 'yes'
+          )
+          GROUP BY GROUPING SETS ((), (channel), (lead_source))
         ),
-        Last_12_Months_Channel AS (
+        Conversion_Rates AS (
           SELECT 
-            'Channel' AS metric_type,
-            Channel_Grouping_Name AS dimension_value,
-            'Last 12 Months' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
+            CASE
+              WHEN GROUPING(Channel_Grouping_Name) = 0 THEN 'Channel'
+              WHEN GROUPING(Original_source) = 0 THEN 'Source'
+              ELSE 'Overall'
+            END AS metric_type,
+            CASE
+              WHEN GROUPING(Channel_Grouping_Name) = 0 THEN Channel_Grouping_Name
+              WHEN GROUPING(Original_source) = 0 THEN Original_source
+              ELSE 'Overall'
+            END AS dimension_value,
+            -- Current Quarter SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS cq_sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS cq_sql_to_sqo_num,
+            -- Last 12 Months SQL→SQO: Filter by sql_cohort_month (when they became SQL)
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS l12m_sql_to_sqo_denom,
+            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS l12m_sql_to_sqo_num,
+            -- Last 12 Months SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS l12m_sqo_to_joined_denom,
+            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS l12m_sqo_to_joined_num
           FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-          WHERE Channel_Grouping_Name IS NOT NULL
-          GROUP BY Channel_Grouping_Name
-          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+          GROUP BY GROUPING SETS ((), (Channel_Grouping_Name), (Original_source))
         ),
-        Current_Quarter_Source AS (
-          SELECT 
-            'Source' AS metric_type,
-            Original_source AS dimension_value,
-            'Current Quarter' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined will come from 90-day lookback CTE
-            NULL AS sqo_to_joined_denom,
-            NULL AS sqo_to_joined_num
-          FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-          WHERE Original_source IS NOT NULL
-          GROUP BY Original_source
-          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(CURRENT_DATE(), QUARTER) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        -- Channel/Source rows need at least 5 SQLs this quarter (or 5 SQOs in the last 90 days)
+        Current_Quarter_Dimensions AS (
+          SELECT * FROM Conversion_Rates
+          WHERE metric_type != 'Overall'
+            AND dimension_value IS NOT NULL
+            AND cq_sql_to_sqo_denom >= 5
         ),
-        Last_12_Months_Source AS (
-          SELECT 
-            'Source' AS metric_type,
-            Original_source AS dimension_value,
-            'Last 12 Months' AS period,
-            -- SQL→SQO: Filter by sql_cohort_month (when they became SQL)
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) AS sql_to_sqo_denom,
-            SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_numerator ELSE 0 END) AS sql_to_sqo_num,
-            -- SQO→Joined: Filter by sqo_cohort_month (when they became SQO)
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_denominator ELSE 0 END) AS sqo_to_joined_denom,
-            SUM(CASE WHEN sqo_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sqo_to_joined_numerator ELSE 0 END) AS sqo_to_joined_num
-          FROM `{self.project_id}.{self.dataset}.vw_conversion_rates`
-          WHERE Original_source IS NOT NULL
-          GROUP BY Original_source
-          HAVING SUM(CASE WHEN sql_cohort_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 12 MONTH), MONTH) THEN sql_to_sqo_denominator ELSE 0 END) >= 5
+        SQO_Joined_90_Day_Dimensions AS (
+          SELECT * FROM SQO_Joined_90_Day
+          WHERE metric_type != 'Overall'
+            AND dimension_value IS NOT NULL
+            AND sqo_to_joined_denom >= 5
         ),
-        -- Combine SQL→SQO (current quarter) with SQO→Joined (90-day lookback)
-        Combined_Overall AS (
+        Combined AS (
+          -- Combine SQL→SQO (current quarter) with SQO→Joined (90-day lookback)
           SELECT 
-            cq.metric_type,
-            cq.dimension_value,
+            cr.metric_type,
+            cr.dimension_value,
             'Current Quarter / Last 90 Days' AS period,
-            cq.sql_to_sqo_denom,
-            cq.sql_to_sqo_num,
+            cr.cq_sql_to_sqo_denom AS sql_to_sqo_denom,
+            cr.cq_sql_to_sqo_num AS sql_to_sqo_num,
             sqo90.sqo_to_joined_denom,
             sqo90.sqo_to_joined_num
-          FROM Current_Quarter_Overall cq
+          FROM Conversion_Rates cr
           CROSS JOIN SQO_Joined_90_Day sqo90
-        ),
-        Combined_Channel AS (
+          WHERE cr.metric_type = 'Overall'
+            AND sqo90.metric_type = 'Overall'
+          
+          UNION ALL
+          
           SELECT 
-            COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
-            COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
-            'Current Quarter / Last 90 Days' AS period,
-            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
-            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
-            COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
-            COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
-          FROM Current_Quarter_Channel cq
-          FULL OUTER JOIN SQO_Joined_90_Day_Channel sqo90
-            ON cq.dimension_value = sqo90.dimension_value
-        ),
-        Combined_Source AS (
+            metric_type,
+            dimension_value,
+            'Last 12 Months' AS period,
+            l12m_sql_to_sqo_denom AS sql_to_sqo_denom,
+            l12m_sql_to_sqo_num AS sql_to_sqo_num,
+            l12m_sqo_to_joined_denom AS sqo_to_joined_denom,
+            l12m_sqo_to_joined_num AS sqo_to_joined_num
+          FROM Conversion_Rates
+          WHERE metric_type = 'Overall'
+          
+          UNION ALL
+          
           SELECT 
             COALESCE(cq.metric_type, sqo90.metric_type) AS metric_type,
             COALESCE(cq.dimension_value, sqo90.dimension_value) AS dimension_value,
             'Current Quarter / Last 90 Days' AS period,
-            COALESCE(cq.sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
-            COALESCE(cq.sql_to_sqo_num, 0) AS sql_to_sqo_num,
+            COALESCE(cq.cq_sql_to_sqo_denom, 0) AS sql_to_sqo_denom,
+            COALESCE(cq.cq_sql_to_sqo_num, 0) AS sql_to_sqo_num,
             COALESCE(sqo90.sqo_to_joined_denom, 0) AS sqo_to_joined_denom,
             COALESCE(sqo90.sqo_to_joined_num, 0) AS sqo_to_joined_num
-          FROM Current_Quarter_Source cq
-          FULL OUTER JOIN SQO_Joined_90_Day_Source sqo90
-            ON cq.dimension_value = sqo90.dimension_value
+          FROM Current_Quarter_Dimensions cq
+          FULL OUTER JOIN SQO_Joined_90_Day_Dimensions sqo90
+            ON cq.metric_type = sqo90.metric_type
+            AND cq.dimension_value = sqo90.dimension_value
         )
         SELECT 
           metric_type,
@@ -2011,49 +2503,7 @@ class CapacityReportGenerator:
           sql_to_sqo_num,
           sqo_to_joined_denom,
           sqo_to_joined_num
-        FROM Combined_Overall
-        
-        UNION ALL
-        
-        SELECT 
-          metric_type,
-          dimension_value,
-          period,
-          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
-          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
-          sql_to_sqo_denom,
-          sql_to_sqo_num,
-          sqo_to_joined_denom,
-          sqo_to_joined_num
-        FROM Last_12_Months_Overall
-        
-        UNION ALL
-        
-        SELECT 
-          metric_type,
-          dimension_value,
-          period,
-          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
-          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
-          sql_to_sqo_denom,
-          sql_to_sqo_num,
-          sqo_to_joined_denom,
-          sqo_to_joined_num
-        FROM Combined_Channel
-        
-        UNION ALL
-        
-        SELECT 
-          metric_type,
-          dimension_value,
-          period,
-          SAFE_DIVIDE(sql_to_sqo_num, sql_to_sqo_denom) AS sql_to_sqo_rate,
-          SAFE_DIVIDE(sqo_to_joined_num, sqo_to_joined_denom) AS sqo_to_joined_rate,
-          sql_to_sqo_denom,
-          sql_to_sqo_num,
-          sqo_to_joined_denom,
-          sqo_to_joined_num
-        FROM Combined_Source
+        FROM Combined
         """
         
         # Query 7: SGA-level conversion rates (Current Quarter vs Last 12 Months)
@@ -2586,77 +3036,53 @@ class CapacityReportGenerator:
         ORDER BY current_qtr_velocity_forecast DESC
         """
         
-        # Execute queries
-        firm_summary_df = self.bq_client.query_to_dataframe(firm_summary_query)
-        coverage_summary_df = self.bq_client.query_to_dataframe(coverage_summary_query)
-        sgm_coverage_df = self.bq_client.query_to_dataframe(sgm_coverage_query)
-        sgm_risk_df = self.bq_client.query_to_dataframe(sgm_risk_query)
-        deals_df = self.bq_client.query_to_dataframe(deals_query)
-        concentration_df = self.bq_client.query_to_dataframe(concentration_query)
-        stage_dist_df = self.bq_client.query_to_dataframe(stage_dist_query)
-        conversion_rates_df = self.bq_client.query_to_dataframe(conversion_rates_query)
-        conversion_trends_df = self.bq_client.query_to_dataframe(conversion_trends_query)
-        sga_conversion_rates_df = self.bq_client.query_to_dataframe(sga_conversion_rates_query)
-        quarterly_forecast_df = self.bq_client.query_to_dataframe(quarterly_forecast_query)
-        forecast_velocity_df = self.bq_client.query_to_dataframe(forecast_velocity_query)
-        what_if_analysis_df = self.bq_client.query_to_dataframe(what_if_analysis_query)
-        
-        # Convert to dictionaries
-        firm_summary = firm_summary_df.iloc[0].to_dict() if len(firm_summary_df) > 0 else {}
-        coverage_summary = coverage_summary_df.iloc[0].to_dict() if len(coverage_summary_df) > 0 else {}
-        sgm_coverage_data = sgm_coverage_df.to_dict('records')
-        sgm_risk_data = sgm_risk_df.to_dict('records')
-        deals_data = deals_df.to_dict('records')
-        concentration_data = concentration_df.to_dict('records')
-        stage_dist_data = stage_dist_df.to_dict('records')
-        conversion_rates_data = conversion_rates_df.to_dict('records')
-        conversion_trends_data = conversion_trends_df.to_dict('records')
-        sga_conversion_rates_data = sga_conversion_rates_df.to_dict('records')
-        quarterly_forecast_data = quarterly_forecast_df.to_dict('records')
-        forecast_velocity_data = forecast_velocity_df.to_dict('records')
-        what_if_analysis_data = what_if_analysis_df.to_dict('records')
-        
-        print(f"Retrieved data: {len(firm_summary_df)} firm summary rows, {len(coverage_summary_df)} coverage summary rows, {len(sgm_coverage_df)} SGM coverage rows, {len(sgm_risk_df)} SGM risk rows, {len(deals_df)} deal rows, {len(concentration_df)} concentration risk rows, {len(stage_dist_df)} stage distribution rows, {len(conversion_rates_df)} conversion rate rows, {len(conversion_trends_df)} trend rows, {len(sga_conversion_rates_df)} SGA conversion rate rows, {len(quarterly_forecast_df)} quarterly forecast rows, {len(forecast_velocity_df)} velocity forecast rows, {len(what_if_analysis_df)} what-if analysis rows")
-        print("Analyzing data with LLM (using capacity & coverage framework with conversion rate analysis, velocity forecasting, what-if routing recommendations, concentration risk, and stage bottlenecks)...")
-        
-        # Generate LLM analysis
-        llm_analysis = self.llm_analyzer.analyze_capacity_data(
-            firm_summary, coverage_summary, sgm_coverage_data, sgm_risk_data, deals_data,
-            conversion_rates_data, conversion_trends_data, sga_conversion_rates_data, 
-            quarterly_forecast_data, forecast_velocity_data, what_if_analysis_data,
-            concentration_data, stage_dist_data
-        )
-        
-        # Generate full report
-        report = self._format_report(firm_summary, coverage_summary, sgm_coverage_data, 
-                                    sgm_risk_data, deals_data, conversion_rates_data, 
-                                    conversion_trends_data, sga_conversion_rates_data, 
-                                    quarterly_forecast_data, forecast_velocity_data, 
-                                    what_if_analysis_data, llm_analysis)
-        
-        # Save to file (if output_file is provided and not None)
-        if output_file is not None:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"Report saved to: {output_file}")
-        elif output_file is None:
-            # No file output requested (e.g., Cloud Function usage)
-            # Report is returned as string
-            print("Report generated (returned as string, not saved to file)")
-        
-        return report
+        return {
+            'firm_summary': firm_summary_query,
+            'coverage_summary': coverage_summary_query,
+            'sgm_coverage': sgm_coverage_query,
+            'sgm_risk': sgm_risk_query,
+            'deals': deals_query,
+            'concentration': concentration_query,
+            'stage_dist': stage_dist_query,
+            'conversion_rates': conversion_rates_query,
+            'conversion_trends': conversion_trends_query,
+            'sga_conversion_rates': sga_conversion_rates_query,
+            'quarterly_forecast': quarterly_forecast_query,
+            'forecast_velocity': forecast_velocity_query,
+            'what_if_analysis': what_if_analysis_query,
+        }
     
-    def _format_report(self, firm_summary: Dict, coverage_summary: Dict,
-                      sgm_coverage_data: List[Dict], sgm_risk_data: List[Dict], 
-                      deals_data: List[Dict], conversion_rates_data: List[Dict],
-                      conversion_trends_data: List[Dict], sga_conversion_rates_data: List[Dict],
-                      quarterly_forecast_data: List[Dict], forecast_velocity_data: List[Dict],
-                      what_if_analysis_data: List[Dict], llm_analysis: str) -> str:
+    def _format_report(self, dataset: ReportDataset, llm_analysis: str) -> str:
         """Format the complete report with LLM analysis and raw data"""
-        
+        return "".join(self._iter_report_chunks(dataset, llm_analysis))
+
+    def _iter_report_chunks(self, dataset: ReportDataset,
+                           llm_analysis: Union[str, Iterable[str]]) -> Iterator[str]:
+        """
+        Render the complete report as a stream of text chunks
+
+        Each report section is its own generator, so the report can be written straight
+        to a file, an HTTP response or an email body without building one large string.
+        """
+        yield from self._render_report_header()
+        if isinstance(llm_analysis, str):
+            yield llm_analysis
+        else:
+            yield from llm_analysis
+        yield from self._render_appendix_summary(dataset.firm_summary, dataset.coverage_summary)
+        yield from self._render_sgm_coverage_table(dataset.sgm_coverage_data)
+        yield from self._render_sgm_risk_table(dataset.sgm_risk_data)
+        yield from self._render_required_sqos_table(dataset.required_sqos_table)
+        yield from self._render_deals_table(dataset.deals_table)
+        yield from self._render_sga_table(dataset.sga_table)
+        yield from self._render_what_if_table(dataset.what_if_table, dataset.what_if_totals)
+        yield from self._render_report_footer()
+
+    def _render_report_header(self) -> Iterator[str]:
+        """Title, key definitions and forecast methodology"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        report = f"""# Capacity & Coverage Summary Report
+        yield f"""# Capacity & Coverage Summary Report
 Generated: {timestamp}
 
 ---
@@ -2758,7 +3184,11 @@ This report uses a multi-layered forecasting framework based on the V2 Capacity
 
 ---
 
-{llm_analysis}
+"""
+
+    def _render_appendix_summary(self, firm_summary: Dict, coverage_summary: Dict) -> Iterator[str]:
+        """Appendix header with firm-level metrics and coverage summary"""
+        yield f"""
 
 ---
 
@@ -2784,7 +3214,11 @@ This report uses a multi-layered forecasting framework based on the V2 Capacity
 - **At Risk SGMs:** {coverage_summary.get('at_risk_count', 'N/A')}
 - **Under-Capacity SGMs:** {coverage_summary.get('under_capacity_count', 'N/A')}
 
-### SGM Coverage Analysis (Top 15 by Risk)
+"""
+
+    def _render_sgm_coverage_table(self, sgm_coverage_data: List[Dict]) -> Iterator[str]:
+        """SGM coverage table (top 15 by risk)"""
+        yield f"""### SGM Coverage Analysis (Top 15 by Risk)
 
 | SGM | Coverage Status | Coverage Ratio | Capacity (M) | Capacity Gap (M) | Active SQOs | Stale SQOs | Qtr Actuals (M) |
 |-----|----------------|----------------|--------------|------------------|-------------|------------|-----------------|
@@ -2792,9 +3226,11 @@ This report uses a multi-layered forecasting framework based on the V2 Capacity
         
         # Add top 15 SGMs to table
         for sgm in sgm_coverage_data[:15]:
-            report += f"| {sgm.get('sgm_name', 'N/A')} | {sgm.get('coverage_status', 'N/A')} | {sgm.get('coverage_ratio_estimate', 0):.2f} | ${sgm.get('capacity_estimate', 0):.2f} | ${sgm.get('capacity_gap_millions_estimate', 0):.2f} | {sgm.get('active_sqo_count', 'N/A')} | {sgm.get('stale_sqo_count', 'N/A')} | ${sgm.get('current_quarter_actual_joined_aum_millions', 0):.2f} |\n"
-        
-        report += f"""
+            yield f"| {sgm.get('sgm_name', 'N/A')} | {sgm.get('coverage_status', 'N/A')} | {sgm.get('coverage_ratio_estimate', 0):.2f} | ${sgm.get('capacity_estimate', 0):.2f} | ${sgm.get('capacity_gap_millions_estimate', 0):.2f} | {sgm.get('active_sqo_count', 'N/A')} | {sgm.get('stale_sqo_count', 'N/A')} | ${sgm.get('current_quarter_actual_joined_aum_millions', 0):.2f} |\n"
+
+    def _render_sgm_risk_table(self, sgm_risk_data: List[Dict]) -> Iterator[str]:
+        """SGM risk assessment table (top 10 by risk)"""
+        yield f"""
 
 ### SGM Risk Assessment (Top 10 by Risk)
 
@@ -2804,10 +3240,11 @@ This report uses a multi-layered forecasting framework based on the V2 Capacity
         
         # Add top 10 SGMs to table
         for sgm in sgm_risk_data[:10]:
-            report += f"| {sgm.get('sgm_name', 'N/A')} | {sgm.get('quarterly_target_status', 'N/A')} | {sgm.get('sqo_gap_count', 'N/A')} | ${sgm.get('pipeline_estimate_m', 0):.1f} | ${sgm.get('weighted_pipeline_m', 0):.1f} | {sgm.get('stale_pct', 0):.1f}% | ${sgm.get('qtr_actuals_m', 0):.1f} |\n"
-        
-        # Add Required SQOs & Joined Per Quarter Analysis with Volatility Context
-        report += f"""
+            yield f"| {sgm.get('sgm_name', 'N/A')} | {sgm.get('quarterly_target_status', 'N/A')} | {sgm.get('sqo_gap_count', 'N/A')} | ${sgm.get('pipeline_estimate_m', 0):.1f} | ${sgm.get('weighted_pipeline_m', 0):.1f} | {sgm.get('stale_pct', 0):.1f}% | ${sgm.get('qtr_actuals_m', 0):.1f} |\n"
+
+    def _render_required_sqos_table(self, required_sqos_table: List[Dict]) -> Iterator[str]:
+        """Required SQOs & Joined per quarter table with volatility context"""
+        yield f"""
 
 ### Required SQOs & Joined Per Quarter Analysis (With Volatility Context)
 
@@ -2853,13 +3290,8 @@ The interpretation in the table below is based on dynamically calculated thresho
 |-----|----------------|----------------|----------|---------|-------------------|----------------------|----------------|
 """
         
-        # Sort by required_sqos_per_quarter (highest first) for the table
-        sorted_required = sorted([s for s in sgm_risk_data if s.get('required_sqos_per_quarter') is not None], 
-                                key=lambda x: x.get('required_sqos_per_quarter', 0), 
-                                reverse=True)
-        
-        # Add SGMs to table
-        for sgm in sorted_required[:20]:  # Top 20 by required SQOs
+        # Add SGMs to table (top 20 by required SQOs, see ReportDataset)
+        for sgm in required_sqos_table:
             sgm_name = sgm.get('sgm_name', 'N/A')
             required_sqos = sgm.get('required_sqos_per_quarter', 'N/A')
             required_joined = sgm.get('required_joined_per_quarter', 'N/A')
@@ -2915,9 +3347,11 @@ The interpretation in the table below is based on dynamically calculated thresho
             else:
                 interpretation = "N/A"
             
-            report += f"| {sgm_name} | {required_joined} | {required_sqos} | {qtd_sqos} | {qtd_gap} | {qtd_pct_str} | {current_pipeline_sqos} | {interpretation} |\n"
-        
-        report += f"""
+            yield f"| {sgm_name} | {required_joined} | {required_sqos} | {qtd_sqos} | {qtd_gap} | {qtd_pct_str} | {current_pipeline_sqos} | {interpretation} |\n"
+
+    def _render_deals_table(self, deals_table: List[Dict]) -> Iterator[str]:
+        """Top deals requiring attention"""
+        yield f"""
 
 ### Top Deals Requiring Attention (Stale or High Value)
 
@@ -2926,10 +3360,12 @@ The interpretation in the table below is based on dynamically calculated thresho
 """
         
         # Add top deals to table
-        for deal in deals_data[:15]:
-            report += f"| {deal.get('opportunity_name', 'N/A')} | {deal.get('sgm_name', 'N/A')} | {deal.get('StageName', 'N/A')} | ${deal.get('estimated_margin_aum_m', 0):.1f} | {deal.get('days_open_since_sqo', 'N/A')} | {deal.get('is_stale', 'No')} |\n"
-        
-        report += f"""
+        for deal in deals_table:
+            yield f"| {deal.get('opportunity_name', 'N/A')} | {deal.get('sgm_name', 'N/A')} | {deal.get('StageName', 'N/A')} | ${deal.get('estimated_margin_aum_m', 0):.1f} | {deal.get('days_open_since_sqo', 'N/A')} | {deal.get('is_stale', 'No')} |\n"
+
+    def _render_sga_table(self, sga_table: List[Dict]) -> Iterator[str]:
+        """SGA performance table (top 15 by SQL→SQO rate change)"""
+        yield f"""
 
 ### SGA Performance Summary (Top 15 by SQL→SQO Rate Change)
 
@@ -2937,17 +3373,13 @@ The interpretation in the table below is based on dynamically calculated thresho
 |-----|---------------------|---------------|---------------|----------------|------------|------------|
 """
 
-        # Sort SGAs by SQL→SQO rate change for the table
-        sorted_sgas_table = sorted(sga_conversion_rates_data, 
-                                  key=lambda x: abs(x.get('sql_to_sqo_rate_change', 0)), 
-                                  reverse=True)
-        
-        # Add top 15 SGAs to table
-        for sga in sorted_sgas_table[:15]:
-            report += f"| {sga.get('sga_name', 'N/A')} | {sga.get('current_qtr_contacted_to_mql_rate', 0)*100:.1f}% | {sga.get('current_qtr_mql_to_sql_rate', 0)*100:.1f}% | {sga.get('current_qtr_sql_to_sqo_rate', 0)*100:.1f}% | {sga.get('sql_to_sqo_rate_change', 0)*100:+.1f}pp | {sga.get('current_qtr_sql_volume', 0):.0f} | {sga.get('current_qtr_sqo_volume', 0):.0f} |\n"
-        
-        # Add What-If Analysis table
-        report += f"""
+        # Add top 15 SGAs (sorted by SQL→SQO rate change) to table
+        for sga in sga_table:
+            yield f"| {sga.get('sga_name', 'N/A')} | {sga.get('current_qtr_contacted_to_mql_rate', 0)*100:.1f}% | {sga.get('current_qtr_mql_to_sql_rate', 0)*100:.1f}% | {sga.get('current_qtr_sql_to_sqo_rate', 0)*100:.1f}% | {sga.get('sql_to_sqo_rate_change', 0)*100:+.1f}pp | {sga.get('current_qtr_sql_volume', 0):.0f} | {sga.get('current_qtr_sqo_volume', 0):.0f} |\n"
+
+    def _render_what_if_table(self, what_if_table: List[Dict], what_if_totals: Dict) -> Iterator[str]:
+        """What-if routing table with totals and methodology notes"""
+        yield f"""
 
 ### What-If Analysis: SQO & SQL Routing Recommendations
 
@@ -2957,18 +3389,8 @@ The interpretation in the table below is based on dynamically calculated thresho
 |-----|---------------------|------------------|------------------|------------------|------------------|------------------|----------|
 """
         
-        # Sort what-if data by priority
-        sorted_what_if_table = sorted(what_if_analysis_data, 
-                                     key=lambda x: (
-                                         x.get('current_qtr_gap_millions', 0) > 0,  # Current quarter gaps first
-                                         -x.get('current_qtr_gap_millions', 0),  # Largest gaps first
-                                         x.get('next_qtr_gap_millions', 0) > 0,  # Then next quarter gaps
-                                         -x.get('next_qtr_gap_millions', 0)
-                                     ),
-                                     reverse=True)
-        
-        # Add what-if data to table
-        for sgm in sorted_what_if_table[:30]:  # Top 30 SGMs with gaps
+        # Add what-if data to table (top 30 SGMs by gap priority)
+        for sgm in what_if_table:
             sgm_name = sgm.get('sgm_name', 'N/A')
             current_qtr_gap = sgm.get('current_qtr_gap_millions', 0)
             sqos_needed_cq = sgm.get('sqos_needed_current_qtr', 0)
@@ -2989,15 +3411,15 @@ The interpretation in the table below is based on dynamically calculated thresho
             else:
                 priority = "N/A"
             
-            report += f"| {sgm_name} | ${current_qtr_gap:.2f} | {sqos_needed_cq:.0f} | {sqls_needed_cq:.0f} | ${next_qtr_gap:.2f} | {sqos_needed_nq:.0f} | {sqls_needed_nq:.0f} | {priority} |\n"
+            yield f"| {sgm_name} | ${current_qtr_gap:.2f} | {sqos_needed_cq:.0f} | {sqls_needed_cq:.0f} | ${next_qtr_gap:.2f} | {sqos_needed_nq:.0f} | {sqls_needed_nq:.0f} | {priority} |\n"
         
-        # Calculate totals
-        total_sqos_needed_current = sum(s.get('sqos_needed_current_qtr', 0) for s in sorted_what_if_table)
-        total_sqls_needed_current = sum(s.get('sqls_needed_current_qtr', 0) for s in sorted_what_if_table)
-        total_sqos_needed_next = sum(s.get('sqos_needed_next_qtr', 0) for s in sorted_what_if_table)
-        total_sqls_needed_next = sum(s.get('sqls_needed_next_qtr', 0) for s in sorted_what_if_table)
+        # Totals over every SGM, not just the rows shown
+        total_sqos_needed_current = what_if_totals['sqos_needed_current_qtr']
+        total_sqls_needed_current = what_if_totals['sqls_needed_current_qtr']
+        total_sqos_needed_next = what_if_totals['sqos_needed_next_qtr']
+        total_sqls_needed_next = what_if_totals['sqls_needed_next_qtr']
         
-        report += f"""
+        yield f"""
 | **TOTAL** | - | **{total_sqos_needed_current:.0f}** | **{total_sqls_needed_current:.0f}** | - | **{total_sqos_needed_next:.0f}** | **{total_sqls_needed_next:.0f}** | - |
 | **GRAND TOTAL** | - | **{total_sqos_needed_current + total_sqos_needed_next:.0f} SQOs** | **{total_sqls_needed_current + total_sqls_needed_next:.0f} SQLs** | - | - | - | - |
 
@@ -3014,16 +3436,16 @@ The interpretation in the table below is based on dynamically calculated thresho
 
 **Note:** Uses enterprise metrics (365_average_margin_aum, 365_sqo_to_joined_conversion) for Bre McDaniel, standard metrics for all other SGMs.
 """
-        
-        report += f"""
+
+    def _render_report_footer(self) -> Iterator[str]:
+        """Report footer with data sources"""
+        yield f"""
 
 ---
 
 *Report generated using LLM analysis of BigQuery capacity and coverage views.*
 *Data sources: `{self.project_id}.{self.dataset}.vw_sgm_capacity_model_refined`, `vw_sgm_capacity_coverage`, `vw_sgm_open_sqos_detail`, `vw_conversion_rates`, `vw_sga_funnel`, and `vw_sgm_capacity_coverage_with_forecast`*
 """
-        
-        return report
 
 
 def main():
@@ -3097,6 +3519,98 @@ def main():
         default=os.getenv("SMTP_PASSWORD"),
         help="SMTP password (or set SMTP_PASSWORD env var)"
     )
+    parser.add_argument(
+        "--max-concurrent-queries",
+        type=int,
+        default=8,
+        help="Maximum number of BigQuery results downloaded concurrently (default: 8)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=os.getenv("QUERY_CACHE_DIR", ".query_cache"),
+        help="Directory for cached query results (default: .query_cache or QUERY_CACHE_DIR env var)"
+    )
+    parser.add_argument(
+        "--max-staleness",
+        type=int,
+        default=43200,
+        help="Maximum age in seconds of a cached query result (default: 43200 = 12 hours)"
+    )
+    parser.add_argument(
+        "--cache-max-size-mb",
+        type=int,
+        default=500,
+        help="Maximum query cache size in MB before least recently used results are evicted (default: 500)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run queries against BigQuery (don't read or write the query result cache)"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the LLM (don't reuse cached analyses for unchanged report data)"
+    )
+    parser.add_argument(
+        "--llm-cache-max-age",
+        type=int,
+        default=604800,
+        help="Maximum age in seconds of a cached LLM analysis (default: 604800 = 7 days)"
+    )
+    parser.add_argument(
+        "--record-fixtures",
+        type=str,
+        default=None,
+        help="Save every query result to this directory as replayable fixtures"
+    )
+    parser.add_argument(
+        "--replay-fixtures",
+        type=str,
+        default=None,
+        help="Serve query results from fixtures recorded with --record-fixtures (no BigQuery access)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate bytes processed for every report query and exit (no queries run, no LLM call)"
+    )
+    parser.add_argument(
+        "--max-bytes-billed",
+        type=int,
+        default=int(os.getenv("MAX_BYTES_BILLED", "0")) or None,
+        help="Fail any query that would bill more than this many bytes (or set MAX_BYTES_BILLED env var)"
+    )
+    parser.add_argument(
+        "--prompt-token-limit",
+        type=int,
+        default=None,
+        help="Prompt size budget in tokens; top-N lists shrink and low-priority sections are omitted to fit "
+             "(default: per-provider limit, or set LLM_PROMPT_TOKEN_LIMIT env var)"
+    )
+    parser.add_argument(
+        "--llm-mode",
+        type=str,
+        choices=["single", "map-reduce"],
+        default="single",
+        help="single: one LLM call over all data; map-reduce: one concurrent call per section "
+             "group plus a synthesis call (smaller prompts, no section trimming)"
+    )
+    parser.add_argument(
+        "--hedge-provider",
+        type=str,
+        choices=["openai", "anthropic", "gemini"],
+        default=os.getenv("LLM_HEDGE_PROVIDER") or None,
+        help="Secondary LLM provider that is sent the same request if the primary is slow or rate limited; "
+             "the first to answer is used (or set LLM_HEDGE_PROVIDER env var)"
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=90.0,
+        help="Seconds to wait for the primary LLM provider to start answering before hedging (default: 90)"
+    )
     
     args = parser.parse_args()
     
@@ -3105,17 +3619,46 @@ def main():
             project_id=args.project_id,
             dataset=args.dataset,
             credentials_path=args.credentials,
-            llm_provider=args.llm_provider
+            llm_provider=None if args.dry_run else args.llm_provider,
+            max_concurrent_queries=args.max_concurrent_queries,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            llm_cache_path=None if (args.no_cache or args.no_llm_cache) else os.path.join(args.cache_dir, "llm_responses.sqlite"),
+            llm_cache_max_age=args.llm_cache_max_age,
+            cache_max_staleness=args.max_staleness,
+            cache_max_size_mb=args.cache_max_size_mb,
+            max_bytes_billed=args.max_bytes_billed,
+            record_fixtures_dir=args.record_fixtures,
+            bq_client=ReplayBigQueryClient(args.replay_fixtures) if args.replay_fixtures else None,
+            prompt_token_limit=args.prompt_token_limit,
+            llm_mode=args.llm_mode,
+            hedge_provider=args.hedge_provider,
+            hedge_after=args.hedge_after
         )
         
-        report = generator.generate_report(output_file=args.output)
+        if args.dry_run:
+            generator.estimate_query_costs()
+            return 0
         
+        if args.output and not (args.gamma or args.email):
+            # Nothing else needs the report text, so stream it straight to the file
+            generator.write_report(args.output)
+            report = None
+        else:
+            report = generator.generate_report(output_file=args.output)
+
         print("\n" + "="*80)
         print("Report generated successfully!")
         print("="*80)
         
-        # Optional: Generate PDF via Gamma.app
-        if args.gamma and GAMMA_AVAILABLE:
+        # Optional: Generate PDF via Gamma.app (imported only when requested)
+        gamma_available = False
+        if args.gamma:
+            try:
+                from gamma_integration import GammaAppClient
+                gamma_available = True
+            except ImportError:
+                pass
+        if args.gamma and gamma_available:
             print("\n" + "="*80)
             print("Generating PDF via Gamma.app...")
             print("="*80)
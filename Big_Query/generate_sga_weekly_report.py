@@ -18,38 +18,56 @@ Output:
 """
 
 import os
+import re
 import json
 import argparse
+import importlib.util
+import time
+import threading
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from google.cloud import bigquery
 from google.oauth2 import service_account
 import pandas as pd
-
-# LLM Provider imports (install only what you need)
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    from anthropic import Anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
+from query_cache import QueryResultCache
+from run_manifest import RunManifest
+from bigquery_fixtures import FixtureRecorder, ReplayBigQueryClient
+from llm_cache import LLMResponseCache
+from llm_hedging import HedgedRequest
+from llm_providers import load_provider
+from llm_rate_limiter import get_rate_limiter
+from prompt_budget import estimate_tokens
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# Run tables (see BigQueryClient.run_context) expire after this long if not dropped
+RUN_TABLE_EXPIRATION_HOURS = 6
+
+# Optional: BigQuery Storage Read API for columnar result downloads (needs pyarrow)
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
+    from google.cloud import bigquery_storage
+    BQ_STORAGE_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
 except ImportError:
-    GEMINI_AVAILABLE = False
+    BQ_STORAGE_AVAILABLE = False
 
 
 class BigQueryClient:
     """Handles BigQuery connections and queries"""
     
-    def __init__(self, project_id: str, credentials_path: Optional[str] = None):
+    def __init__(self, project_id: str, credentials_path: Optional[str] = None,
+                 cache: Optional[QueryResultCache] = None, max_bytes_billed: Optional[int] = None,
+                 recorder: Optional[FixtureRecorder] = None):
+        self.cache = cache
+        # Saves every result as a replayable fixture (see bigquery_fixtures.py)
+        self.recorder = recorder
+        self.max_bytes_billed = max_bytes_billed
+        # Set by the report generator for the duration of a run to collect per-query stats
+        self.manifest: Optional[RunManifest] = None
+        credentials = None
         if credentials_path and os.path.exists(credentials_path):
             credentials = service_account.Credentials.from_service_account_file(
                 credentials_path,
@@ -59,52 +77,255 @@ class BigQueryClient:
         else:
             # Use default credentials (e.g., from environment or gcloud)
             self.client = bigquery.Client(project=project_id)
+        
+        # Storage Read API client, reused for every download (None = REST pages only)
+        self.bqstorage_client = None
+        if BQ_STORAGE_AVAILABLE:
+            try:
+                self.bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+            except Exception as e:
+                print(f"Warning: BigQuery Storage Read API unavailable, using REST downloads: {e}")
+        
+        # Set while a run context is open: run table name -> fully qualified table. The
+        # tables are only created on the first query that actually has to run (not cached)
+        self.run_tables: Dict[str, str] = {}
+        self._run_table_setup = None
+        self._run_tables_created = False
+        self._run_tables_lock = threading.Lock()
+        # What queries read in place of each run table name: the created table, or the
+        # table's SELECT as a subquery if the tables couldn't be created
+        self._run_table_sources: Dict[str, str] = {}
+    
+    def _job_config(self) -> bigquery.QueryJobConfig:
+        """Build the job config for a query (bytes-billed budget, if any)"""
+        job_config = bigquery.QueryJobConfig()
+        if self.max_bytes_billed:
+            job_config.maximum_bytes_billed = self.max_bytes_billed
+        return job_config
+    
+    def _resolve_run_tables(self, query: str) -> str:
+        """Replace run table names in a query with the run's fully qualified tables"""
+        for table_name, source in self._run_table_sources.items():
+            query = re.sub(rf"\b{table_name}\b", lambda _: source, query)
+        return query
     
-    def query_to_dataframe(self, query: str) -> pd.DataFrame:
+    def _ensure_run_tables(self) -> None:
+        """Create the run context's tables on first use"""
+        with self._run_tables_lock:
+            if not self._run_table_setup or self._run_tables_created:
+                return
+            statements = [
+                f"CREATE TABLE `{self.run_tables[table_name]}` "
+                f"OPTIONS (expiration_timestamp = TIMESTAMP_ADD(CURRENT_TIMESTAMP(), "
+                f"INTERVAL {RUN_TABLE_EXPIRATION_HOURS} HOUR)) AS {self._resolve_run_tables(select_sql)}"
+                for table_name, select_sql in self._run_table_setup.items()
+            ]
+            start = time.perf_counter()
+            try:
+                setup_job = self.client.query(";\n".join(statements), job_config=self._job_config())
+                setup_job.result()
+            except Exception as e:
+                # E.g. no CREATE permission on the scratch dataset: the report only needs
+                # read access, so run every query against the base tables/views instead
+                print(f"Warning: Could not create run tables, querying the base views directly: {e}")
+                # Built in creation order, so a table's SELECT can inline the tables before it
+                self._run_table_sources = {}
+                for table_name, select_sql in self._run_table_setup.items():
+                    self._run_table_sources[table_name] = f"({self._resolve_run_tables(select_sql)})"
+                self._run_table_setup = None
+                return
+            if self.manifest is not None:
+                self.manifest.record_query("run_tables_setup", setup_job, time.perf_counter() - start)
+            self._run_tables_created = True
+    
+    @contextmanager
+    def run_context(self, tables: Dict[str, str], dataset: str):
+        """
+        Materialize shared intermediate tables for the duration of a report run
+        
+        Args:
+            tables: Run table name -> SELECT statement, in creation order (a statement
+                    may read the tables before it). Queries issued inside the context
+                    refer to the tables by these names.
+            dataset: Dataset the tables are created in (needs write access; if creating
+                     them fails, the queries read each table's SELECT as a subquery)
+        
+        The tables are regular tables with a unique per-run name and an expiration, not
+        session temp tables: BigQuery runs the queries of one session one at a time,
+        which would serialize run_queries_concurrently. They are dropped on exit, and
+        expire on their own if the drop doesn't happen.
+        """
+        run_id = uuid.uuid4().hex[:12]
+        self.run_tables = {
+            table_name: f"{self.client.project}.{dataset}._sga_report_{run_id}_{table_name.lower()}"
+            for table_name in tables
+        }
+        self._run_table_sources = {table_name: f"`{table_ref}`" for table_name, table_ref in self.run_tables.items()}
+        self._run_table_setup = tables
+        self._run_tables_created = False
+        try:
+            yield self
+        finally:
+            if self._run_tables_created:
+                drop_statements = [f"DROP TABLE IF EXISTS `{table_ref}`" for table_ref in self.run_tables.values()]
+                try:
+                    self.client.query(";\n".join(drop_statements)).result()
+                except Exception as e:
+                    # The tables expire on their own; don't fail the report over cleanup
+                    print(f"Warning: Could not drop run tables: {e}")
+            self.run_tables = {}
+            self._run_table_sources = {}
+            self._run_table_setup = None
+            self._run_tables_created = False
+    
+    def query_to_dataframe(self, query: str, name: Optional[str] = None) -> pd.DataFrame:
         """Execute a query and return results as a pandas DataFrame"""
-        query_job = self.client.query(query)
-        return query_job.to_dataframe()
+        start = time.perf_counter()
+        if self.cache is not None:
+            cached_df = self.cache.get(query)
+            if cached_df is not None:
+                self._record_query(name, None, start, cached_df, source="local_cache")
+                if self.recorder is not None:
+                    self.recorder.save(query, cached_df, name=name)
+                return cached_df
+        
+        # Cache keys and fixtures use the run table names, which are the same every run
+        self._ensure_run_tables()
+        query_job = self.client.query(self._resolve_run_tables(query), job_config=self._job_config())
+        df = self._job_to_dataframe(query_job)
+        self._record_query(name, query_job, start, df)
+        if self.cache is not None:
+            self.cache.put(query, df)
+        if self.recorder is not None:
+            self.recorder.save(query, df, name=name)
+        return df
+    
+    def query_to_arrow(self, query: str, name: Optional[str] = None) -> "pyarrow.Table":
+        """
+        Execute a query and return results as a pyarrow Table (no pandas build)
+        
+        For callers that work on Arrow directly. Results aren't read from or written to the
+        local query cache or fixtures, which store DataFrames.
+        """
+        start = time.perf_counter()
+        self._ensure_run_tables()
+        query_job = self.client.query(self._resolve_run_tables(query), job_config=self._job_config())
+        table = self._job_to_arrow(query_job)
+        self._record_query(name, query_job, start, table)
+        return table
+    
+    def _record_query(self, name: Optional[str], query_job, start: float, df: pd.DataFrame,
+                      source: str = "bigquery") -> None:
+        """Add a query's execution stats to the run manifest (if one is attached)"""
+        if self.manifest is not None:
+            self.manifest.record_query(name or "query", query_job, time.perf_counter() - start,
+                                       rows=len(df), source=source)
+    
+    def _job_to_arrow(self, query_job) -> "pyarrow.Table":
+        """
+        Download a query job's results as a pyarrow Table
+        
+        Same download path as _job_to_dataframe (Storage Read API, REST fallback), but the
+        record batches are returned as they arrive, without building a DataFrame.
+        """
+        if self.bqstorage_client is not None:
+            try:
+                return query_job.to_arrow(bqstorage_client=self.bqstorage_client)
+            except Exception as e:
+                print(f"Warning: Storage Read API download failed, falling back to REST: {e}")
+        return query_job.to_arrow(create_bqstorage_client=False)
+    
+    def _job_to_dataframe(self, query_job) -> pd.DataFrame:
+        """
+        Download a query job's results as a DataFrame
+        
+        Uses the Storage Read API when it is available (one columnar stream instead of
+        paged JSON), and falls back to the REST download if the read session fails.
+        to_dataframe() keeps BigQuery's dtype mapping (nullable Int64, boolean, dbdate).
+        """
+        if self.bqstorage_client is not None:
+            try:
+                return query_job.to_dataframe(bqstorage_client=self.bqstorage_client)
+            except Exception as e:
+                print(f"Warning: Storage Read API download failed, falling back to REST: {e}")
+        return query_job.to_dataframe(create_bqstorage_client=False)
+    
+    def run_queries_concurrently(self, queries: Dict[str, str], max_workers: int = 4,
+                                 labels: Optional[Dict[str, str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run independent queries in parallel with a bounded number in flight
+        
+        Args:
+            queries: Mapping of query name to SQL text
+            max_workers: Maximum number of queries running at once
+            labels: Optional progress labels per query name (e.g. "Query A: QTD Leaderboard")
+        
+        Returns:
+            Mapping of query name to result DataFrame (same keys as queries)
+        """
+        labels = labels or {}
+        
+        def run(name: str) -> pd.DataFrame:
+            print(f"  {labels.get(name, name)}...")
+            return self.query_to_dataframe(queries[name], name=name)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(run, name): name for name in queries}
+            for future in as_completed(futures):
+                name = futures[future]
+                results[name] = future.result()
+                print(f"  {labels.get(name, name)} done ({len(results[name])} rows)")
+        
+        return {name: results[name] for name in queries}
+    
+    def dry_run_queries(self, queries: Dict[str, str]) -> Dict[str, int]:
+        """Dry-run each query and return the estimated bytes processed, keyed by query name"""
+        estimates = {}
+        for name, query in queries.items():
+            job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+            query_job = self.client.query(query, job_config=job_config)
+            estimates[name] = query_job.total_bytes_processed or 0
+        return estimates
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count for display (e.g. 1.5 GB)"""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
 
 
 class LLMAnalyzer:
     """Handles LLM-based analysis of the data"""
     
-    def __init__(self, provider: str = "openai", api_key: Optional[str] = None):
+    def __init__(self, provider: str = "openai", api_key: Optional[str] = None,
+                 response_cache: Optional[LLMResponseCache] = None,
+                 hedge_provider: Optional[str] = None, hedge_after: float = 90.0):
         self.provider = provider.lower()
-        
-        # Handle Gemini API key (uses GEMINI_API_KEY or GOOGLE_API_KEY)
-        if self.provider == "gemini":
-            self.api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        else:
-            self.api_key = api_key or os.getenv(f"{provider.upper()}_API_KEY")
-        
-        if self.provider == "openai":
-            if not OPENAI_AVAILABLE:
-                raise ImportError("openai package not installed. Run: pip install openai")
-            if not self.api_key:
-                raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
-            self.client = openai.OpenAI(api_key=self.api_key)
-            self.model = "gpt-4o"
-        
-        elif self.provider == "anthropic":
-            if not ANTHROPIC_AVAILABLE:
-                raise ImportError("anthropic package not installed. Run: pip install anthropic")
-            if not self.api_key:
-                raise ValueError("Anthropic API key not found. Set ANTHROPIC_API_KEY environment variable.")
-            self.client = Anthropic(api_key=self.api_key)
-            self.model = "claude-3-5-sonnet-20241022"
-        
-        elif self.provider == "gemini":
-            if not GEMINI_AVAILABLE:
-                raise ImportError("google-generativeai package not installed. Run: pip install google-generativeai")
-            if not self.api_key:
-                raise ValueError("Gemini API key not found. Set GEMINI_API_KEY or GOOGLE_API_KEY environment variable.")
-            genai.configure(api_key=self.api_key)
-            self.client = genai.GenerativeModel("gemini-2.5-pro")
-            self.model = "gemini-2.5-pro"
-        
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}. Use 'openai', 'anthropic', or 'gemini'")
+        self.temperature = 0.3
+        self.max_tokens = 8000
+        # Optional cache of responses keyed on the full request (prompt includes the report data)
+        self.response_cache = response_cache
+        
+        # Provider plugin; its SDK is imported here, only for the provider actually used
+        self.llm = load_provider(self.provider, api_key=api_key)
+        self.model = self.llm.model
+        
+        # RPM/TPM budget shared with every other analyzer using this provider in the process
+        self.rate_limiter = get_rate_limiter(self.provider)
+        
+        # Optional secondary provider: gets the same request if this one is slow or rate limited
+        self.hedge_after = hedge_after
+        self.hedge_analyzer = None
+        if hedge_provider and hedge_provider.lower() != self.provider:
+            try:
+                self.hedge_analyzer = LLMAnalyzer(provider=hedge_provider)
+            except (ImportError, ValueError) as e:
+                # A missing SDK or key for the secondary shouldn't stop the report; run unhedged
+                print(f"Warning: LLM hedging disabled: {e}")
     
     def analyze_sga_data(self, qtd_leaderboard: List[Dict], activity_data: List[Dict],
                         conversion_trends: List[Dict], lost_reasons: List[Dict],
@@ -128,66 +349,54 @@ class LLMAnalyzer:
         # Create the prompt
         prompt = self._create_analysis_prompt(data_summary)
         
-        # Call LLM
-        if self.provider == "openai":
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=8000
-            )
-            analysis = response.choices[0].message.content
-        
-        elif self.provider == "anthropic":
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=8000,
-                temperature=0.3,
-                system=self._get_system_prompt(),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            analysis = response.content[0].text
+        # Unchanged data and prompts reuse the previous analysis instead of calling the LLM again
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self._response_cache_key(prompt)
+            cached_analysis = self.response_cache.get(cache_key)
+            if cached_analysis is not None:
+                print("LLM analysis served from response cache (report data unchanged)")
+                return cached_analysis
         
-        elif self.provider == "gemini":
-            # Combine system prompt and user prompt for Gemini
-            full_prompt = f"{self._get_system_prompt()}\n\n{prompt}"
-            
-            # Add retry logic with exponential backoff for quota/rate limit errors
-            import time
-            max_retries = 3
-            retry_delay = 2
-            
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.generate_content(
-                        full_prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            temperature=0.3,
-                            max_output_tokens=8000,
-                        )
-                    )
-                    analysis = response.text
-                    break
-                except Exception as e:
-                    error_str = str(e)
-                    if "429" in error_str or "Resource has been exhausted" in error_str or "quota" in error_str.lower():
-                        if attempt < max_retries - 1:
-                            wait_time = retry_delay * (2 ** attempt)
-                            print(f"API quota/rate limit hit. Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries})")
-                            time.sleep(wait_time)
-                            continue
-                        else:
-                            raise Exception(f"API quota exhausted after {max_retries} attempts. The prompt may be too large. Try reducing data volume or using a different LLM provider.")
-                    else:
-                        raise
+        analysis, answered_by = self._hedged_call_llm(prompt)
+        
+        if cache_key is not None:
+            # Keyed on the provider that wrote the analysis: a winning hedge response must not be
+            # served to later primary-only runs as the primary's
+            self.response_cache.put(answered_by._response_cache_key(prompt), analysis,
+                                    provider=answered_by.provider, model=answered_by.model)
         
         return analysis
     
+    def _response_cache_key(self, prompt: str) -> str:
+        """Response cache key for a prompt sent with this analyzer's provider settings"""
+        return LLMResponseCache.make_key(self.provider, self.model, self._get_system_prompt(),
+                                         prompt, self.temperature, self.max_tokens)
+    
+    def _hedged_call_llm(self, prompt: str) -> Tuple[str, "LLMAnalyzer"]:
+        """_call_llm, raced against the hedge provider when one is configured; also returns the analyzer that answered"""
+        if self.hedge_analyzer is None:
+            return self._call_llm(prompt), self
+        hedge = self.hedge_analyzer
+        # No retries on the primary: a quota error fails over to the hedge provider instead
+        request = HedgedRequest(
+            (self.provider, lambda: [self._call_llm(prompt, max_retries=1)]),
+            (hedge.provider, lambda: [hedge._call_llm(prompt)]),
+            hedge_after=self.hedge_after
+        )
+        analysis = request.result()
+        return analysis, (hedge if request.winner == hedge.provider else self)
+    
+    def _call_llm(self, prompt: str, max_retries: int = 4) -> str:
+        """Send one prompt (with the system prompt) to the configured provider and return the response text"""
+        system_prompt = self._get_system_prompt()
+        # Queued behind other calls to the same provider until it fits the RPM/TPM budget;
+        # rate limit errors are retried with Retry-After / jittered back-off
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        return self.rate_limiter.call(
+            lambda: self.llm.complete(system_prompt, prompt, self.temperature, self.max_tokens),
+            prompt_tokens, max_retries=max_retries)
+    
     def _get_system_prompt(self) -> str:
         """System prompt that defines the LLM's role as a Sales Performance Coach"""
         return """You are an expert Sales Performance Coach analyzing weekly SGA (Sales Growth Associate) performance data.
@@ -700,13 +909,52 @@ Be specific, data-driven, and actionable. Use the exact numbers provided. When l
 class SGAWeeklyReportGenerator:
     """Main class that orchestrates SGA weekly report generation"""
     
+    # Progress labels for each report query
+    QUERY_LABELS = {
+        'query_a': "Query A: QTD Leaderboard & Last 7 Days Production",
+        'query_b': "Query B: Activity Summary (Trailing & Upcoming 7 Days)",
+        'query_b_calls': "Query B1-B4: Initial & Qualification Calls Detail (Last 7 / Next 7 Days)",
+        'query_c': "Query C: Conversion Rate Trends",
+        'query_d': "Query D: Lost Reason Analysis",
+        'query_e': "Query E: Channel & Source Intelligence",
+        'query_f': "Query F: Contacting Activity Analysis",
+        'query_g': "Query G: Team Aggregate Conversion Rates",
+        'query_h': "Query H: Disposition Analysis",
+    }
+    
     def __init__(self, project_id: str, dataset: str = "savvy_analytics",
                  credentials_path: Optional[str] = None, llm_provider: str = "gemini",
-                 llm_api_key: Optional[str] = None):
+                 llm_api_key: Optional[str] = None, max_concurrent_queries: int = 4,
+                 cache_dir: Optional[str] = None, cache_max_staleness: int = 43200,
+                 cache_max_size_mb: int = 500, max_bytes_billed: Optional[int] = None,
+                 record_fixtures_dir: Optional[str] = None,
+                 bq_client: Optional[BigQueryClient] = None,
+                 llm_cache_path: Optional[str] = None, llm_cache_max_age: int = 604800,
+                 hedge_provider: Optional[str] = None, hedge_after: float = 90.0,
+                 scratch_dataset: Optional[str] = None):
         self.project_id = project_id
         self.dataset = dataset
-        self.bq_client = BigQueryClient(project_id, credentials_path)
-        self.llm_analyzer = LLMAnalyzer(provider=llm_provider, api_key=llm_api_key)
+        # Dataset for the per-run intermediate tables. None: no tables are created and the
+        # queries read the base views directly, so the report only needs read access
+        self.scratch_dataset = scratch_dataset
+        self.max_concurrent_queries = max_concurrent_queries
+        cache = None
+        if cache_dir:
+            cache = QueryResultCache(cache_dir, project_id, dataset,
+                                     max_staleness=cache_max_staleness,
+                                     max_size_mb=cache_max_size_mb)
+        recorder = FixtureRecorder(record_fixtures_dir) if record_fixtures_dir else None
+        # bq_client lets callers inject a different client, e.g. ReplayBigQueryClient for offline runs
+        self.bq_client = bq_client or BigQueryClient(project_id, credentials_path, cache=cache,
+                                                     max_bytes_billed=max_bytes_billed,
+                                                     recorder=recorder)
+        # Execution statistics of the most recent generate_report() call
+        self.manifest: Optional[RunManifest] = None
+        # No provider means BigQuery-only use (e.g. dry runs), so no LLM client is set up
+        response_cache = LLMResponseCache(llm_cache_path, max_age=llm_cache_max_age) if llm_cache_path else None
+        self.llm_analyzer = LLMAnalyzer(provider=llm_provider, api_key=llm_api_key,
+                                        response_cache=response_cache, hedge_provider=hedge_provider,
+                                        hedge_after=hedge_after) if llm_provider else None
     
     def generate_report(self, output_file: Optional[str] = None) -> str:
         """Generate the complete SGA weekly performance report"""
@@ -721,6 +969,130 @@ class SGAWeeklyReportGenerator:
         current_quarter_start = current_date.replace(month=current_quarter * 3 + 1, day=1)
         current_year = current_date.year
         
+        # Per-run execution statistics (written next to the report as JSON)
+        self.manifest = RunManifest("sga_weekly_report")
+        self.bq_client.manifest = self.manifest
+        
+        use_run_tables = self.scratch_dataset is not None
+        queries = self._build_queries(current_date, use_run_tables=use_run_tables)
+        
+        # Execute queries (independent of each other, so dispatch them in parallel)
+        # With a scratch dataset, Active SGAs and their funnel slice are materialized once
+        # per run as expiring tables, so the view's upstream joins don't run for every section
+        run_context = (self.bq_client.run_context(self._run_tables(), dataset=self.scratch_dataset)
+                       if use_run_tables else nullcontext())
+        with self.manifest.stage("queries"):
+            with run_context:
+                results = self.bq_client.run_queries_concurrently(
+                    queries, max_workers=self.max_concurrent_queries, labels=self.QUERY_LABELS
+                )
+        
+        qtd_leaderboard = results['query_a'].to_dict('records')
+        activity_data = results['query_b'].to_dict('records')
+        initial_calls_last7, initial_calls_next7, qual_calls_last7, qual_calls_next7 = \
+            self._split_call_details(results['query_b_calls'].to_dict('records'))
+        conversion_trends = results['query_c'].to_dict('records')
+        lost_reasons = results['query_d'].to_dict('records')
+        channel_source_data = results['query_e'].to_dict('records')
+        contacting_activity = results['query_f'].to_dict('records')
+        team_rates_df = results['query_g']
+        team_conversion_rates = team_rates_df.iloc[0].to_dict() if len(team_rates_df) > 0 else {}
+        
+        disposition_analysis = self._unpack_dispositions(results['query_h'])
+        
+        print("Analyzing data with LLM...")
+        
+        # Generate report using LLM
+        with self.manifest.stage("llm_analysis"):
+            report = self.llm_analyzer.analyze_sga_data(
+                qtd_leaderboard=qtd_leaderboard,
+                activity_data=activity_data,
+                conversion_trends=conversion_trends,
+                lost_reasons=lost_reasons,
+                channel_source_data=channel_source_data,
+                initial_calls_last7=initial_calls_last7,
+                initial_calls_next7=initial_calls_next7,
+                qual_calls_last7=qual_calls_last7,
+                qual_calls_next7=qual_calls_next7,
+                contacting_activity=contacting_activity,
+                team_conversion_rates=team_conversion_rates,
+                disposition_analysis=disposition_analysis,
+                current_date=str(current_date),
+                current_quarter_start=str(current_quarter_start),
+                current_year=current_year
+            )
+        
+        # Add header
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        header = f"""# SGA Weekly Performance Report
+
+**Generated:** {timestamp}
+**Quarterly Goals:** SGA-specific (9-12 SQOs per quarter, default: 9)
+**Report Period:** QTD (Quarter to Date) + Last 7 Days Analysis
+
+---
+
+"""
+        
+        full_report = header + report
+        
+        # Save to file
+        if output_file is None:
+            timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = f"sga_weekly_report_{timestamp_file}.md"
+        
+        with self.manifest.stage("write"):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(full_report)
+        
+        print(f"\nReport saved to: {output_file}")
+        
+        manifest_path = RunManifest.path_for_report(output_file)
+        self.manifest.write(manifest_path)
+        print(f"Run manifest saved to: {manifest_path}")
+        
+        return full_report
+    
+    def estimate_query_costs(self) -> Dict[str, int]:
+        """Dry-run every report query and print the estimated bytes processed"""
+        print("Dry run: estimating bytes processed for each query (nothing is executed)...")
+        # Dry runs can't see run tables, so estimate against the base tables/views.
+        # This is an upper bound: a real run scans the funnel view once into a run table.
+        queries = self._build_queries(datetime.now().date(), use_run_tables=False)
+        estimates = self.bq_client.dry_run_queries(queries)
+        
+        print(f"\n{'Query':<75} {'Bytes Processed':>18}")
+        print("-" * 94)
+        for name, num_bytes in sorted(estimates.items(), key=lambda x: x[1], reverse=True):
+            print(f"{self.QUERY_LABELS.get(name, name):<75} {format_bytes(num_bytes):>18}")
+        print("-" * 94)
+        print(f"{'TOTAL':<75} {format_bytes(sum(estimates.values())):>18}")
+        
+        return estimates
+    
+    def _build_queries(self, current_date, use_run_tables: bool = True) -> Dict[str, str]:
+        """
+        Build the SQL for every report query, keyed by query name
+        
+        With use_run_tables the queries read the run context's tables (see _run_tables);
+        otherwise they read SavvyGTMData.User and vw_funnel_lead_to_joined_v2 directly,
+        e.g. for dry runs outside a run context.
+        
+        The Active SGA roster has one row per active User record. Queries that only
+        group by SGA name read DISTINCT sga_name from it (as they always have), so two
+        User records with the same name can't double their sums.
+        """
+        if use_run_tables:
+            active_sgas_table = "Run_Active_SGAs"
+            funnel_table = "Run_Funnel"
+        else:
+            active_sgas_table = f"({self._active_sgas_sql()})"
+            funnel_table = f"`{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2`"
+        
+        # Calculate current quarter start
+        current_quarter = (current_date.month - 1) // 3
+        current_quarter_start = current_date.replace(month=current_quarter * 3 + 1, day=1)
+        
         # SGA-specific quarterly goals (Q4 2025)
         sga_goals = {
             'Craig Suchodolski': 12,
@@ -746,17 +1118,9 @@ class SGAWeeklyReportGenerator:
         upcoming_7_days_end = current_date + timedelta(days=7)  # 7 days total
         
         # Query A: QTD Leaderboard & Last 7 Days Production
-        print("  Query A: QTD Leaderboard & Last 7 Days Production...")
         query_a = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name,
-            u.Id AS sga_user_id,
-            u.CreatedDate AS sga_created_date
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT * FROM {active_sgas_table}
         ),
         SQO_Records AS (
           SELECT 
@@ -766,7 +1130,7 @@ class SGAWeeklyReportGenerator:
             DATE(f.Date_Became_SQO__c) AS sqo_date,
             f.Date_Became_SQO__c AS sqo_timestamp,
             ROW_NUMBER() OVER (PARTITION BY f.Full_Opportunity_ID__c, f.SGA_Owner_Name__c ORDER BY f.Date_Became_SQO__c DESC) AS rn
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          FROM {funnel_table} f
           INNER JOIN Active_SGAs a
             ON f.SGA_Owner_Name__c = a.sga_name
           WHERE f.Date_Became_SQO__c IS NOT NULL
@@ -858,19 +1222,10 @@ class SGAWeeklyReportGenerator:
         ORDER BY q.sga_type, q.qtd_sqos DESC, q.last_7_days_sqos DESC, q.sga_name
         """
         
-        qtd_leaderboard_df = self.bq_client.query_to_dataframe(query_a)
-        qtd_leaderboard = qtd_leaderboard_df.to_dict('records')
-        
         # Query B: Activity Summary (Trailing & Upcoming 7 Days)
-        print("  Query B: Activity Summary (Trailing & Upcoming 7 Days)...")
         query_b = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name FROM {active_sgas_table}
         )
         SELECT
           a.sga_name,
@@ -895,138 +1250,67 @@ class SGAWeeklyReportGenerator:
             THEN f.Full_Opportunity_ID__c 
           END) AS upcoming_qual_calls
         FROM Active_SGAs a
-        LEFT JOIN `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+        LEFT JOIN {funnel_table} f
           ON f.SGA_Owner_Name__c = a.sga_name
         GROUP BY a.sga_name
         ORDER BY a.sga_name
         """
         
-        activity_df = self.bq_client.query_to_dataframe(query_b)
-        activity_data = activity_df.to_dict('records')
-        
-        # Query B1: Initial Calls Detail (Last 7 Days)
-        print("  Query B1: Initial Calls Detail (Last 7 Days)...")
-        query_b1 = f"""
+        # Query B1-B4: Initial & Qualification Calls Detail (Last 7 / Next 7 Days)
+        # One pass over the funnel: each row is unnested into an initial-call and a
+        # qualification-call entry, tagged by call type and window, and split client-side
+        query_b_calls = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
-        )
-        SELECT
-          f.SGA_Owner_Name__c AS sga_name,
-          f.Prospect_Name AS advisor_name,
-          FORMAT_DATE('%Y-%m-%d', DATE(f.Initial_Call_Scheduled_Date__c)) AS call_date
-        FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-        INNER JOIN Active_SGAs a
-          ON f.SGA_Owner_Name__c = a.sga_name
-        WHERE f.is_initial_call = 1
-          AND DATE(f.Initial_Call_Scheduled_Date__c) >= DATE('{last_7_days_start}')
-          AND DATE(f.Initial_Call_Scheduled_Date__c) <= DATE('{last_7_days_end}')
-        ORDER BY f.SGA_Owner_Name__c, f.Initial_Call_Scheduled_Date__c
-        """
-        
-        initial_calls_last7_df = self.bq_client.query_to_dataframe(query_b1)
-        initial_calls_last7 = initial_calls_last7_df.to_dict('records')
-        
-        # Query B2: Initial Calls Detail (Next 7 Days)
-        print("  Query B2: Initial Calls Detail (Next 7 Days)...")
-        query_b2 = f"""
-        WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
-        )
-        SELECT
-          f.SGA_Owner_Name__c AS sga_name,
-          f.Prospect_Name AS prospect_name,
-          FORMAT_DATE('%Y-%m-%d', DATE(f.Initial_Call_Scheduled_Date__c)) AS call_date
-        FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-        INNER JOIN Active_SGAs a
-          ON f.SGA_Owner_Name__c = a.sga_name
-        WHERE f.is_initial_call = 1
-          AND f.Initial_Call_Scheduled_Date__c IS NOT NULL
-          AND DATE(f.Initial_Call_Scheduled_Date__c) >= DATE('{upcoming_7_days_start}')
-          AND DATE(f.Initial_Call_Scheduled_Date__c) <= DATE('{upcoming_7_days_end}')
-        ORDER BY f.SGA_Owner_Name__c, f.Initial_Call_Scheduled_Date__c
-        """
-        
-        initial_calls_next7_df = self.bq_client.query_to_dataframe(query_b2)
-        initial_calls_next7 = initial_calls_next7_df.to_dict('records')
-        
-        # Query B3: Qualification Calls Detail (Last 7 Days)
-        print("  Query B3: Qualification Calls Detail (Last 7 Days)...")
-        query_b3 = f"""
-        WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
-        )
-        SELECT
-          f.SGA_Owner_Name__c AS sga_name,
-          f.Opp_Name AS advisor_name,
-          FORMAT_DATE('%Y-%m-%d', DATE(f.Qualification_Call_Date__c)) AS call_date,
-          f.sgm_name AS sgm_name
-        FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-        INNER JOIN Active_SGAs a
-          ON f.SGA_Owner_Name__c = a.sga_name
-        WHERE f.is_Qual_call = 1
-          AND DATE(f.Qualification_Call_Date__c) >= DATE('{last_7_days_start}')
-          AND DATE(f.Qualification_Call_Date__c) <= DATE('{last_7_days_end}')
-        ORDER BY f.SGA_Owner_Name__c, f.Qualification_Call_Date__c
-        """
-        
-        qual_calls_last7_df = self.bq_client.query_to_dataframe(query_b3)
-        qual_calls_last7 = qual_calls_last7_df.to_dict('records')
-        
-        # Query B4: Qualification Calls Detail (Next 7 Days)
-        print("  Query B4: Qualification Calls Detail (Next 7 Days)...")
-        query_b4 = f"""
-        WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name FROM {active_sgas_table}
+        ),
+        Call_Entries AS (
+          SELECT
+            f.SGA_Owner_Name__c AS sga_name,
+            c.call_type,
+            c.person_name,
+            c.call_dt,
+            c.sgm_name
+          FROM {funnel_table} f
+          INNER JOIN Active_SGAs a
+            ON f.SGA_Owner_Name__c = a.sga_name
+          CROSS JOIN UNNEST([
+            STRUCT(
+              'initial' AS call_type,
+              f.is_initial_call = 1 AS is_call,
+              f.Prospect_Name AS person_name,
+              DATE(f.Initial_Call_Scheduled_Date__c) AS call_dt,
+              CAST(NULL AS STRING) AS sgm_name
+            ),
+            STRUCT(
+              'qual' AS call_type,
+              f.is_Qual_call = 1 AS is_call,
+              f.Opp_Name AS person_name,
+              DATE(f.Qualification_Call_Date__c) AS call_dt,
+              f.sgm_name AS sgm_name
+            )
+          ]) c
+          WHERE c.is_call
+            AND c.call_dt >= DATE('{last_7_days_start}')
+            AND c.call_dt <= DATE('{upcoming_7_days_end}')
         )
         SELECT
-          f.SGA_Owner_Name__c AS sga_name,
-          f.Opp_Name AS advisor_name,
-          FORMAT_DATE('%Y-%m-%d', DATE(f.Qualification_Call_Date__c)) AS call_date,
-          f.sgm_name AS sgm_name
-        FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-        INNER JOIN Active_SGAs a
-          ON f.SGA_Owner_Name__c = a.sga_name
-        WHERE f.is_Qual_call = 1
-          AND f.Qualification_Call_Date__c IS NOT NULL
-          AND DATE(f.Qualification_Call_Date__c) >= DATE('{upcoming_7_days_start}')
-          AND DATE(f.Qualification_Call_Date__c) <= DATE('{upcoming_7_days_end}')
-        ORDER BY f.SGA_Owner_Name__c, f.Qualification_Call_Date__c
+          sga_name,
+          call_type,
+          CASE 
+            WHEN call_dt <= DATE('{last_7_days_end}') THEN 'last7'
+            ELSE 'next7'
+          END AS call_window,
+          person_name,
+          FORMAT_DATE('%Y-%m-%d', call_dt) AS call_date,
+          sgm_name
+        FROM Call_Entries
+        ORDER BY sga_name, call_dt
         """
         
-        qual_calls_next7_df = self.bq_client.query_to_dataframe(query_b4)
-        qual_calls_next7 = qual_calls_next7_df.to_dict('records')
-        
         # Query C: Conversion Rate Trends
-        print("  Query C: Conversion Rate Trends...")
         query_c = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name,
-            u.CreatedDate AS sga_created_date
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name, sga_created_date FROM {active_sgas_table}
         ),
         Conversion_Rates_90d AS (
           SELECT
@@ -1117,26 +1401,17 @@ class SGAWeeklyReportGenerator:
         ORDER BY c90.sga_name
         """
         
-        conversion_trends_df = self.bq_client.query_to_dataframe(query_c)
-        conversion_trends = conversion_trends_df.to_dict('records')
-        
         # Query D: Lost Reason Analysis
-        print("  Query D: Lost Reason Analysis...")
         query_d = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name FROM {active_sgas_table}
         ),
         Lost_Reasons AS (
           SELECT
             f.Disposition__c AS disposition,
             f.SGA_Owner_Name__c AS sga_name,
             COUNT(DISTINCT f.Full_prospect_id__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          FROM {funnel_table} f
           INNER JOIN Active_SGAs a
             ON f.SGA_Owner_Name__c = a.sga_name
           WHERE f.Disposition__c IS NOT NULL
@@ -1158,19 +1433,10 @@ class SGAWeeklyReportGenerator:
         LIMIT 20
         """
         
-        lost_reasons_df = self.bq_client.query_to_dataframe(query_d)
-        lost_reasons = lost_reasons_df.to_dict('records')
-        
         # Query E: Channel & Source Intelligence
-        print("  Query E: Channel & Source Intelligence...")
         query_e = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name FROM {active_sgas_table}
         ),
         Channel_Source_90d AS (
           SELECT
@@ -1181,7 +1447,7 @@ class SGAWeeklyReportGenerator:
               THEN f.Full_Opportunity_ID__c END) AS sqo_count_90d,
             COUNT(DISTINCT CASE WHEN f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
               THEN f.Full_prospect_id__c END) AS total_count_90d
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          FROM {funnel_table} f
           INNER JOIN Active_SGAs a
             ON f.SGA_Owner_Name__c = a.sga_name
           WHERE f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
@@ -1196,7 +1462,7 @@ class SGAWeeklyReportGenerator:
               THEN f.Full_Opportunity_ID__c END) AS sqo_count_365d,
             COUNT(DISTINCT CASE WHEN f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 365 DAY))
               THEN f.Full_prospect_id__c END) AS total_count_365d
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          FROM {funnel_table} f
           INNER JOIN Active_SGAs a
             ON f.SGA_Owner_Name__c = a.sga_name
           WHERE f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 365 DAY))
@@ -1217,20 +1483,10 @@ class SGAWeeklyReportGenerator:
         LIMIT 30
         """
         
-        channel_source_df = self.bq_client.query_to_dataframe(query_e)
-        channel_source_data = channel_source_df.to_dict('records')
-        
         # Query F: Contacting Activity (Last 90 Days Average vs Last 7 Days)
-        print("  Query F: Contacting Activity Analysis...")
         query_f = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name,
-            u.CreatedDate AS sga_created_date
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name, sga_created_date FROM {active_sgas_table}
         ),
         Contacting_Events_90d AS (
           SELECT
@@ -1254,7 +1510,7 @@ class SGAWeeklyReportGenerator:
               ) / 7.0
             ) AS weeks_in_period
           FROM Active_SGAs a
-          LEFT JOIN `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          LEFT JOIN {funnel_table} f
             ON f.SGA_Owner_Name__c = a.sga_name
           GROUP BY a.sga_name, a.sga_created_date
         ),
@@ -1268,7 +1524,7 @@ class SGAWeeklyReportGenerator:
               THEN f.Full_prospect_id__c 
             END) AS contacted_last_7d
           FROM Active_SGAs a
-          LEFT JOIN `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+          LEFT JOIN {funnel_table} f
             ON f.SGA_Owner_Name__c = a.sga_name
           GROUP BY a.sga_name
         )
@@ -1289,19 +1545,10 @@ class SGAWeeklyReportGenerator:
         ORDER BY c90.sga_name
         """
         
-        contacting_activity_df = self.bq_client.query_to_dataframe(query_f)
-        contacting_activity = contacting_activity_df.to_dict('records')
-        
         # Query G: Team Aggregate Conversion Rates (Last 90 Days)
-        print("  Query G: Team Aggregate Conversion Rates...")
         query_g = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+          SELECT DISTINCT sga_name FROM {active_sgas_table}
         ),
         Team_Conversion_Rates AS (
           SELECT
@@ -1333,286 +1580,182 @@ class SGAWeeklyReportGenerator:
         SELECT * FROM Team_Conversion_Rates
         """
         
-        team_rates_df = self.bq_client.query_to_dataframe(query_g)
-        team_conversion_rates = team_rates_df.iloc[0].to_dict() if len(team_rates_df) > 0 else {}
-        
         # Query H: Disposition Analysis (Closed Lost MQLs & SQLs)
-        print("  Query H: Disposition Analysis...")
+        # One pass over the funnel slice: each row is flagged with its loss type and windows,
+        # and GROUPING SETS count per SGA and for the team at once. Results are tagged with
+        # scope / funnel_stage / time_window and fanned back out by _unpack_dispositions
         query_h = f"""
         WITH Active_SGAs AS (
-          SELECT DISTINCT
-            u.Name AS sga_name,
-            u.CreatedDate AS sga_created_date
-          FROM `{self.project_id}.SavvyGTMData.User` u
-          WHERE u.IsSGA__c = TRUE 
-            AND u.IsActive = TRUE
-            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
-        ),
-        -- Closed Lost MQLs: is_mql = 1 AND is_sql = 0 AND disposition__c IS NOT NULL
-        MQL_Dispositions_90d AS (
-          SELECT
-            f.SGA_Owner_Name__c AS sga_name,
-            f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_prospect_id__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-          INNER JOIN Active_SGAs a
-            ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_mql = 1
-            AND f.is_sql = 0
-            AND f.Disposition__c IS NOT NULL
-            AND f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
-          GROUP BY f.SGA_Owner_Name__c, f.Disposition__c
-        ),
-        MQL_Dispositions_Lifetime AS (
-          SELECT
-            f.SGA_Owner_Name__c AS sga_name,
-            f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_prospect_id__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-          INNER JOIN Active_SGAs a
-            ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_mql = 1
-            AND f.is_sql = 0
-            AND f.Disposition__c IS NOT NULL
-            AND f.FilterDate >= TIMESTAMP(DATE_ADD(DATE(a.sga_created_date), INTERVAL 30 DAY))
-          GROUP BY f.SGA_Owner_Name__c, f.Disposition__c
+          SELECT DISTINCT sga_name, sga_created_date FROM {active_sgas_table}
         ),
-        MQL_Dispositions_Team AS (
-          SELECT
-            f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_prospect_id__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-          INNER JOIN Active_SGAs a
-            ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_mql = 1
-            AND f.is_sql = 0
-            AND f.Disposition__c IS NOT NULL
-            AND f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
-          GROUP BY f.Disposition__c
-        ),
-        -- Closed Lost SQLs: is_sql = 1 AND is_sqo = 0 AND disposition__c IS NOT NULL AND StageName = 'Closed Lost'
-        SQL_Dispositions_90d AS (
+        Disposition_Rows AS (
           SELECT
             f.SGA_Owner_Name__c AS sga_name,
             f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_Opportunity_ID__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-          INNER JOIN Active_SGAs a
-            ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_sql = 1
-            AND (f.is_sqo = 0 OR f.Date_Became_SQO__c IS NULL)
-            AND f.Disposition__c IS NOT NULL
-            AND f.StageName = 'Closed Lost'
-            AND f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
-          GROUP BY f.SGA_Owner_Name__c, f.Disposition__c
-        ),
-        SQL_Dispositions_Lifetime AS (
-          SELECT
-            f.SGA_Owner_Name__c AS sga_name,
-            f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_Opportunity_ID__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
-          INNER JOIN Active_SGAs a
-            ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_sql = 1
-            AND (f.is_sqo = 0 OR f.Date_Became_SQO__c IS NULL)
-            AND f.Disposition__c IS NOT NULL
-            AND f.StageName = 'Closed Lost'
-            AND f.FilterDate >= TIMESTAMP(DATE_ADD(DATE(a.sga_created_date), INTERVAL 30 DAY))
-          GROUP BY f.SGA_Owner_Name__c, f.Disposition__c
-        ),
-        SQL_Dispositions_Team AS (
-          SELECT
-            f.Disposition__c AS disposition,
-            COUNT(DISTINCT f.Full_Opportunity_ID__c) AS count
-          FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+            f.Full_prospect_id__c,
+            f.Full_Opportunity_ID__c,
+            -- Closed Lost MQLs: is_mql = 1 AND is_sql = 0 AND disposition__c IS NOT NULL
+            (f.is_mql = 1 AND f.is_sql = 0) AS is_mql_loss,
+            -- Closed Lost SQLs: is_sql = 1 AND is_sqo = 0 AND disposition__c IS NOT NULL AND StageName = 'Closed Lost'
+            (f.is_sql = 1 AND (f.is_sqo = 0 OR f.Date_Became_SQO__c IS NULL) AND f.StageName = 'Closed Lost') AS is_sql_loss,
+            f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY)) AS in_90d,
+            f.FilterDate >= TIMESTAMP(DATE_ADD(DATE(a.sga_created_date), INTERVAL 30 DAY)) AS in_lifetime
+          FROM {funnel_table} f
           INNER JOIN Active_SGAs a
             ON f.SGA_Owner_Name__c = a.sga_name
-          WHERE f.is_sql = 1
-            AND (f.is_sqo = 0 OR f.Date_Became_SQO__c IS NULL)
-            AND f.Disposition__c IS NOT NULL
-            AND f.StageName = 'Closed Lost'
-            AND f.FilterDate >= TIMESTAMP(DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY))
-          GROUP BY f.Disposition__c
-        ),
-        Team_MQL_Dispositions AS (
-          SELECT ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS mql_disps_team
-          FROM MQL_Dispositions_Team
-        ),
-        Team_SQL_Dispositions AS (
-          SELECT ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS sql_disps_team
-          FROM SQL_Dispositions_Team
-        ),
-        SGA_MQL_90d_Agg AS (
-          SELECT
-            sga_name,
-            ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS mql_disps_90d
-          FROM MQL_Dispositions_90d
-          GROUP BY sga_name
-        ),
-        SGA_MQL_Lifetime_Agg AS (
-          SELECT
-            sga_name,
-            ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS mql_disps_lifetime
-          FROM MQL_Dispositions_Lifetime
-          GROUP BY sga_name
-        ),
-        SGA_SQL_90d_Agg AS (
-          SELECT
-            sga_name,
-            ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS sql_disps_90d
-          FROM SQL_Dispositions_90d
-          GROUP BY sga_name
+          WHERE f.Disposition__c IS NOT NULL
         ),
-        SGA_SQL_Lifetime_Agg AS (
+        Disposition_Counts AS (
           SELECT
+            IF(GROUPING(sga_name) = 0, 'sga', 'team') AS scope,
             sga_name,
-            ARRAY_AGG(STRUCT(disposition, count) ORDER BY count DESC) AS sql_disps_lifetime
-          FROM SQL_Dispositions_Lifetime
-          GROUP BY sga_name
+            disposition,
+            COUNT(DISTINCT IF(is_mql_loss AND in_90d, Full_prospect_id__c, NULL)) AS mql_90d,
+            COUNT(DISTINCT IF(is_mql_loss AND in_lifetime, Full_prospect_id__c, NULL)) AS mql_lifetime,
+            COUNT(DISTINCT IF(is_sql_loss AND in_90d, Full_Opportunity_ID__c, NULL)) AS sql_90d,
+            COUNT(DISTINCT IF(is_sql_loss AND in_lifetime, Full_Opportunity_ID__c, NULL)) AS sql_lifetime
+          FROM Disposition_Rows
+          GROUP BY GROUPING SETS ((sga_name, disposition), (disposition))
         )
         SELECT
+          c.scope,
+          c.sga_name,
+          b.funnel_stage,
+          b.time_window,
+          c.disposition,
+          b.count
+        FROM Disposition_Counts c,
+        UNNEST([
+          STRUCT('mql' AS funnel_stage, '90d' AS time_window, c.mql_90d AS count),
+          ('mql', 'lifetime', c.mql_lifetime),
+          ('sql', '90d', c.sql_90d),
+          ('sql', 'lifetime', c.sql_lifetime)
+        ]) b
+        WHERE b.count > 0
+          -- Team comparisons are over the last 90 days only
+          AND NOT (c.scope = 'team' AND b.time_window = 'lifetime')
+        
+        UNION ALL
+        
+        -- Every active SGA gets an entry, including those without any dispositions
+        SELECT
+          'roster' AS scope,
           a.sga_name,
-          COALESCE(m90.mql_disps_90d, []) AS mql_disps_90d,
-          COALESCE(ml.mql_disps_lifetime, []) AS mql_disps_lifetime,
-          COALESCE(s90.sql_disps_90d, []) AS sql_disps_90d,
-          COALESCE(sl.sql_disps_lifetime, []) AS sql_disps_lifetime,
-          t_mql.mql_disps_team,
-          t_sql.sql_disps_team
+          CAST(NULL AS STRING) AS funnel_stage,
+          CAST(NULL AS STRING) AS time_window,
+          CAST(NULL AS STRING) AS disposition,
+          -- 0 rather than NULL keeps count a non-null INT64 column, which downloads as int64, not float64
+          0 AS count
         FROM Active_SGAs a
-        LEFT JOIN SGA_MQL_90d_Agg m90 ON a.sga_name = m90.sga_name
-        LEFT JOIN SGA_MQL_Lifetime_Agg ml ON a.sga_name = ml.sga_name
-        LEFT JOIN SGA_SQL_90d_Agg s90 ON a.sga_name = s90.sga_name
-        LEFT JOIN SGA_SQL_Lifetime_Agg sl ON a.sga_name = sl.sga_name
-        CROSS JOIN Team_MQL_Dispositions t_mql
-        CROSS JOIN Team_SQL_Dispositions t_sql
-        ORDER BY a.sga_name
+        
+        ORDER BY sga_name, funnel_stage, time_window, count DESC
         """
         
-        disposition_df = self.bq_client.query_to_dataframe(query_h)
-        # Convert the arrays to dictionaries for easier processing
+        return {
+            'query_a': query_a,
+            'query_b': query_b,
+            'query_b_calls': query_b_calls,
+            'query_c': query_c,
+            'query_d': query_d,
+            'query_e': query_e,
+            'query_f': query_f,
+            'query_g': query_g,
+            'query_h': query_h,
+        }
+    
+    def _unpack_dispositions(self, disposition_df: pd.DataFrame) -> List[Dict]:
+        """Fan Query H's tagged disposition counts back out into per-SGA disposition dictionaries"""
+        if disposition_df.empty:
+            return []
+        
+        is_roster = disposition_df['scope'] == 'roster'
+        sga_names = disposition_df.loc[is_roster, 'sga_name'].tolist()
+        
+        # Column-wise: one map key per row (e.g. "mql_dispositions_90d", "sql_dispositions_team")
+        # and plain Python lists, so the only per-row work left is a single dict insert
+        counts = disposition_df.loc[~is_roster]
+        is_team = counts['scope'] == 'team'
+        map_keys = counts['funnel_stage'] + '_dispositions_' + counts['time_window'].where(~is_team, 'team')
+        owners = counts['sga_name'].where(~is_team, '')
+        disposition_maps = {}
+        # Rows arrive ordered by count (descending) within each map, which the dicts keep.
+        # int() so the prompt shows "12", not "12.0", even if a cached result widened the column to float
+        for owner, map_key, disposition, count in zip(owners.tolist(), map_keys.tolist(),
+                                                      counts['disposition'].tolist(),
+                                                      counts['count'].tolist()):
+            disposition_maps.setdefault((owner, map_key), {})[disposition] = int(count)
+        
+        map_names = ['mql_dispositions_90d', 'mql_dispositions_lifetime', 'mql_dispositions_team',
+                     'sql_dispositions_90d', 'sql_dispositions_lifetime', 'sql_dispositions_team']
         disposition_analysis = []
-        for row in disposition_df.to_dict('records'):
-            sga_name = row.get('sga_name', 'Unknown')
-            
-            # Convert MQL dispositions arrays to dictionaries
-            mql_disps_90d = {}
-            if row.get('mql_disps_90d') is not None:
-                if hasattr(row['mql_disps_90d'], 'tolist'):
-                    mql_list = row['mql_disps_90d'].tolist()
-                else:
-                    mql_list = list(row['mql_disps_90d']) if isinstance(row['mql_disps_90d'], (list, tuple)) else []
-                for item in mql_list:
-                    if isinstance(item, dict):
-                        mql_disps_90d[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            mql_disps_lifetime = {}
-            if row.get('mql_disps_lifetime') is not None:
-                if hasattr(row['mql_disps_lifetime'], 'tolist'):
-                    mql_list = row['mql_disps_lifetime'].tolist()
-                else:
-                    mql_list = list(row['mql_disps_lifetime']) if isinstance(row['mql_disps_lifetime'], (list, tuple)) else []
-                for item in mql_list:
-                    if isinstance(item, dict):
-                        mql_disps_lifetime[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            mql_disps_team = {}
-            if row.get('mql_disps_team') is not None:
-                if hasattr(row['mql_disps_team'], 'tolist'):
-                    mql_list = row['mql_disps_team'].tolist()
-                else:
-                    mql_list = list(row['mql_disps_team']) if isinstance(row['mql_disps_team'], (list, tuple)) else []
-                for item in mql_list:
-                    if isinstance(item, dict):
-                        mql_disps_team[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            # Convert SQL dispositions arrays to dictionaries
-            sql_disps_90d = {}
-            if row.get('sql_disps_90d') is not None:
-                if hasattr(row['sql_disps_90d'], 'tolist'):
-                    sql_list = row['sql_disps_90d'].tolist()
-                else:
-                    sql_list = list(row['sql_disps_90d']) if isinstance(row['sql_disps_90d'], (list, tuple)) else []
-                for item in sql_list:
-                    if isinstance(item, dict):
-                        sql_disps_90d[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            sql_disps_lifetime = {}
-            if row.get('sql_disps_lifetime') is not None:
-                if hasattr(row['sql_disps_lifetime'], 'tolist'):
-                    sql_list = row['sql_disps_lifetime'].tolist()
+        for sga_name in sga_names:
+            entry = {'sga_name': sga_name}
+            for map_name in map_names:
+                # Team maps are the same for every SGA
+                owner = '' if map_name.endswith('_team') else sga_name
+                entry[map_name] = dict(disposition_maps.get((owner, map_name), {}))
+            disposition_analysis.append(entry)
+        
+        return disposition_analysis
+    
+    def _active_sgas_sql(self) -> str:
+        """Active SGA roster shared by every report query"""
+        return f"""
+          SELECT DISTINCT
+            u.Name AS sga_name,
+            u.Id AS sga_user_id,
+            u.CreatedDate AS sga_created_date
+          FROM `{self.project_id}.SavvyGTMData.User` u
+          WHERE u.IsSGA__c = TRUE 
+            AND u.IsActive = TRUE
+            AND u.Name NOT IN ('Savvy Marketing', 'Corey Marcello', 'Bryan Belville', 'Anett Diaz')
+        """
+    
+    def _run_tables(self) -> Dict[str, str]:
+        """Tables shared by every section query of a report run (see BigQueryClient.run_context)"""
+        return {
+            'Run_Active_SGAs': self._active_sgas_sql(),
+            'Run_Funnel': f"""
+            SELECT f.*
+            FROM `{self.project_id}.{self.dataset}.vw_funnel_lead_to_joined_v2` f
+            WHERE f.SGA_Owner_Name__c IN (SELECT sga_name FROM Run_Active_SGAs)
+            """,
+        }
+    
+    def _split_call_details(self, call_rows: List[Dict]) -> tuple:
+        """Split tagged call rows into the four call lists (initial/qual x last 7/next 7 days)"""
+        initial_calls_last7 = []
+        initial_calls_next7 = []
+        qual_calls_last7 = []
+        qual_calls_next7 = []
+        
+        for row in call_rows:
+            if row.get('call_type') == 'initial':
+                if row.get('call_window') == 'last7':
+                    initial_calls_last7.append({
+                        'sga_name': row.get('sga_name'),
+                        'advisor_name': row.get('person_name'),
+                        'call_date': row.get('call_date')
+                    })
                 else:
-                    sql_list = list(row['sql_disps_lifetime']) if isinstance(row['sql_disps_lifetime'], (list, tuple)) else []
-                for item in sql_list:
-                    if isinstance(item, dict):
-                        sql_disps_lifetime[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            sql_disps_team = {}
-            if row.get('sql_disps_team') is not None:
-                if hasattr(row['sql_disps_team'], 'tolist'):
-                    sql_list = row['sql_disps_team'].tolist()
+                    initial_calls_next7.append({
+                        'sga_name': row.get('sga_name'),
+                        'prospect_name': row.get('person_name'),
+                        'call_date': row.get('call_date')
+                    })
+            else:
+                call = {
+                    'sga_name': row.get('sga_name'),
+                    'advisor_name': row.get('person_name'),
+                    'call_date': row.get('call_date'),
+                    'sgm_name': row.get('sgm_name')
+                }
+                if row.get('call_window') == 'last7':
+                    qual_calls_last7.append(call)
                 else:
-                    sql_list = list(row['sql_disps_team']) if isinstance(row['sql_disps_team'], (list, tuple)) else []
-                for item in sql_list:
-                    if isinstance(item, dict):
-                        sql_disps_team[item.get('disposition', 'Unknown')] = item.get('count', 0)
-            
-            disposition_analysis.append({
-                'sga_name': sga_name,
-                'mql_dispositions_90d': mql_disps_90d,
-                'mql_dispositions_lifetime': mql_disps_lifetime,
-                'mql_dispositions_team': mql_disps_team,
-                'sql_dispositions_90d': sql_disps_90d,
-                'sql_dispositions_lifetime': sql_disps_lifetime,
-                'sql_dispositions_team': sql_disps_team
-            })
-        
-        print("Analyzing data with LLM...")
+                    qual_calls_next7.append(call)
         
-        # Generate report using LLM
-        report = self.llm_analyzer.analyze_sga_data(
-            qtd_leaderboard=qtd_leaderboard,
-            activity_data=activity_data,
-            conversion_trends=conversion_trends,
-            lost_reasons=lost_reasons,
-            channel_source_data=channel_source_data,
-            initial_calls_last7=initial_calls_last7,
-            initial_calls_next7=initial_calls_next7,
-            qual_calls_last7=qual_calls_last7,
-            qual_calls_next7=qual_calls_next7,
-            contacting_activity=contacting_activity,
-            team_conversion_rates=team_conversion_rates,
-            disposition_analysis=disposition_analysis,
-            current_date=str(current_date),
-            current_quarter_start=str(current_quarter_start),
-            current_year=current_year
-        )
-        
-        # Add header
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        header = f"""# SGA Weekly Performance Report
-
-**Generated:** {timestamp}
-**Quarterly Goals:** SGA-specific (9-12 SQOs per quarter, default: 9)
-**Report Period:** QTD (Quarter to Date) + Last 7 Days Analysis
-
----
-
-"""
-        
-        full_report = header + report
-        
-        # Save to file
-        if output_file is None:
-            timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"sga_weekly_report_{timestamp_file}.md"
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(full_report)
-        
-        print(f"\nReport saved to: {output_file}")
-        
-        return full_report
+        return initial_calls_last7, initial_calls_next7, qual_calls_last7, qual_calls_next7
 
 
 def main():
@@ -1632,6 +1775,14 @@ def main():
         default="savvy_analytics",
         help="BigQuery dataset name"
     )
+    parser.add_argument(
+        "--scratch-dataset",
+        type=str,
+        default=os.getenv("SCRATCH_DATASET") or None,
+        help="Writable dataset for the run's intermediate tables, which expire after "
+             f"{RUN_TABLE_EXPIRATION_HOURS} hours (or set SCRATCH_DATASET env var). "
+             "Without one, the queries read the base views directly"
+    )
     parser.add_argument(
         "--credentials",
         type=str,
@@ -1687,6 +1838,83 @@ def main():
         default=os.getenv("SMTP_PASSWORD"),
         help="SMTP password (or set SMTP_PASSWORD env var)"
     )
+    parser.add_argument(
+        "--max-concurrent-queries",
+        type=int,
+        default=4,
+        help="Maximum number of BigQuery queries running at once (default: 4)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=os.getenv("QUERY_CACHE_DIR", ".query_cache"),
+        help="Directory for cached query results (default: .query_cache or QUERY_CACHE_DIR env var)"
+    )
+    parser.add_argument(
+        "--max-staleness",
+        type=int,
+        default=43200,
+        help="Maximum age in seconds of a cached query result (default: 43200 = 12 hours)"
+    )
+    parser.add_argument(
+        "--cache-max-size-mb",
+        type=int,
+        default=500,
+        help="Maximum query cache size in MB before least recently used results are evicted (default: 500)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run queries against BigQuery (don't read or write the query result cache)"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the LLM (don't reuse cached analyses for unchanged report data)"
+    )
+    parser.add_argument(
+        "--llm-cache-max-age",
+        type=int,
+        default=604800,
+        help="Maximum age in seconds of a cached LLM analysis (default: 604800 = 7 days)"
+    )
+    parser.add_argument(
+        "--hedge-provider",
+        type=str,
+        choices=["openai", "anthropic", "gemini"],
+        default=os.getenv("LLM_HEDGE_PROVIDER") or None,
+        help="Secondary LLM provider that is sent the same request if the primary is slow or rate limited; "
+             "the first to answer is used (or set LLM_HEDGE_PROVIDER env var)"
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=90.0,
+        help="Seconds to wait for the primary LLM provider to start answering before hedging (default: 90)"
+    )
+    parser.add_argument(
+        "--record-fixtures",
+        type=str,
+        default=None,
+        help="Save every query result to this directory as replayable fixtures"
+    )
+    parser.add_argument(
+        "--replay-fixtures",
+        type=str,
+        default=None,
+        help="Serve query results from fixtures recorded with --record-fixtures (no BigQuery access)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate bytes processed for every report query and exit (no queries run, no LLM call)"
+    )
+    parser.add_argument(
+        "--max-bytes-billed",
+        type=int,
+        default=int(os.getenv("MAX_BYTES_BILLED", "0")) or None,
+        help="Fail any query that would bill more than this many bytes (or set MAX_BYTES_BILLED env var)"
+    )
     
     args = parser.parse_args()
     
@@ -1695,10 +1923,26 @@ def main():
             project_id=args.project_id,
             dataset=args.dataset,
             credentials_path=args.credentials,
-            llm_provider=args.llm_provider,
-            llm_api_key=args.api_key
+            llm_provider=None if args.dry_run else args.llm_provider,
+            llm_api_key=args.api_key,
+            max_concurrent_queries=args.max_concurrent_queries,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            llm_cache_path=None if (args.no_cache or args.no_llm_cache) else os.path.join(args.cache_dir, "llm_responses.sqlite"),
+            llm_cache_max_age=args.llm_cache_max_age,
+            cache_max_staleness=args.max_staleness,
+            cache_max_size_mb=args.cache_max_size_mb,
+            max_bytes_billed=args.max_bytes_billed,
+            record_fixtures_dir=args.record_fixtures,
+            bq_client=ReplayBigQueryClient(args.replay_fixtures) if args.replay_fixtures else None,
+            hedge_provider=args.hedge_provider,
+            hedge_after=args.hedge_after,
+            scratch_dataset=args.scratch_dataset
         )
         
+        if args.dry_run:
+            generator.estimate_query_costs()
+            return 0
+        
         report = generator.generate_report(output_file=args.output)
         
         print("\n" + "="*80)
@@ -0,0 +1,117 @@
+"""
+LLM Response Cache Module
+Content-addressed SQLite cache for LLM analysis responses, shared by the report generators
+
+Responses are keyed on a hash of everything that determines the model output:
+provider, model, system prompt, user prompt, temperature and max tokens. The user
+prompt embeds the report data, so re-rendering a report whose data has not changed
+returns the stored analysis in milliseconds instead of re-running a 30-90 second
+generation, while any change in the data (or prompt wording) is a cache miss.
+Entries older than max_age are expired, and the least recently used entries are
+evicted once the cache exceeds its size limit.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Optional
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of LLM responses with age and LRU size eviction"""
+
+    def __init__(self, db_path: str, max_age: int = 604800, max_size_mb: int = 50):
+        """
+        Args:
+            db_path: Path of the SQLite file (created if missing)
+            max_age: Maximum age of a cached response in seconds (default: 7 days)
+            max_size_mb: Total response size before least recently used entries are evicted
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       provider TEXT,
+                       model TEXT,
+                       response TEXT NOT NULL,
+                       size_bytes INTEGER NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_used_at REAL NOT NULL
+                   )"""
+            )
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, prompt: str,
+                 temperature: float, max_tokens: int) -> str:
+        """Build the cache key for an LLM request"""
+        hasher = hashlib.sha256()
+        for part in (provider, model, repr(float(temperature)), str(int(max_tokens)), system_prompt, prompt):
+            # Length-prefix each part so that no two different requests hash the same input
+            encoded = part.encode("utf-8")
+            hasher.update(f"{len(encoded)}:".encode("utf-8"))
+            hasher.update(encoded)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.max_age:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def put(self, key: str, response: str, provider: Optional[str] = None, model: Optional[str] = None) -> None:
+        """Store a response and evict old entries if the cache is over its limits"""
+        if not response:
+            return
+        now = time.time()
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, provider, model, response, size_bytes, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, model, response, len(response.encode("utf-8")), now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            # Caching is best-effort; never fail a report because a response couldn't be stored
+            print(f"Warning: Could not cache LLM response: {e}")
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Expire old entries, then evict least recently used ones until under max_size_bytes"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age,))
+        total_size = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size_bytes FROM responses ORDER BY last_used_at").fetchall():
+            if total_size <= self.max_size_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the cache safe to use across threads
+        return sqlite3.connect(self.db_path, timeout=30)
@@ -0,0 +1,117 @@
+"""
+LLM Request Hedging Module
+Races a primary LLM provider against a secondary one to cap tail latency
+
+The primary provider is called first. If it has not produced any output within the
+hedge threshold, or it fails with a quota/rate-limit error, the same request is sent
+to the secondary provider and whichever starts answering first wins; the other
+response is discarded. Works for streamed responses (the race is decided by the
+first chunk) and for plain calls (a call is a stream of one chunk).
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Whether an LLM client error is a quota / rate limit error (HTTP 429)"""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    error_str = str(error)
+    return ("429" in error_str or "Resource has been exhausted" in error_str
+            or "quota" in error_str.lower() or "rate limit" in error_str.lower())
+
+
+class HedgedRequest:
+    """One LLM request raced between a primary and a secondary provider"""
+
+    def __init__(self, primary: Tuple[str, Callable[[], Iterable[str]]],
+                 secondary: Optional[Tuple[str, Callable[[], Iterable[str]]]],
+                 hedge_after: float):
+        """
+        Args:
+            primary: (provider name, callable that sends the request and returns its text chunks)
+            secondary: Same for the fallback provider, or None to disable hedging
+            hedge_after: Seconds without a first chunk from the primary before the secondary is started
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_after = hedge_after
+        # Name of the provider whose response is used (set once the first chunk arrives)
+        self.winner: Optional[str] = None
+        self._events: "queue.Queue" = queue.Queue()
+
+    def result(self) -> str:
+        """Run the request and return the full response text"""
+        return "".join(self)
+
+    def __iter__(self) -> Iterator[str]:
+        primary_name = self.primary[0]
+        started = [primary_name]
+        errors = {}
+        self._start(*self.primary)
+        deadline = time.monotonic() + self.hedge_after
+
+        # Wait for the first chunk (or end of response) from either provider
+        while True:
+            hedging = self.secondary is not None and len(started) == 1
+            try:
+                name, kind, value = self._events.get(timeout=max(0.0, deadline - time.monotonic()) if hedging else None)
+            except queue.Empty:
+                print(f"No response from {primary_name} after {self.hedge_after:g}s, "
+                      f"also sending the request to {self.secondary[0]}...")
+                self._start(*self.secondary)
+                started.append(self.secondary[0])
+                continue
+
+            if kind == "error":
+                errors[name] = value
+                if hedging and is_quota_error(value):
+                    print(f"{primary_name} is rate limited ({value}); failing over to {self.secondary[0]}...")
+                    self._start(*self.secondary)
+                    started.append(self.secondary[0])
+                    continue
+                if len(errors) == len(started):
+                    raise errors[primary_name]
+                continue
+
+            self.winner = name
+            if name != primary_name:
+                print(f"Using the response from {name}")
+            break
+
+        # Pass through the rest of the winner's response
+        while True:
+            if kind == "chunk":
+                yield value
+            elif kind == "done":
+                return
+            elif kind == "error":
+                raise value
+            name, kind, value = self._events.get()
+            while name != self.winner:
+                name, kind, value = self._events.get()
+
+    def _start(self, name: str, send: Callable[[], Iterable[str]]) -> None:
+        # Daemon threads: a losing request that is still running never holds up process exit
+        threading.Thread(target=self._pump, args=(name, send), name=f"llm-hedge-{name}", daemon=True).start()
+
+    def _pump(self, name: str, send: Callable[[], Iterable[str]]) -> None:
+        """Read one provider's response into the event queue until it finishes or loses the race"""
+        chunks = None
+        try:
+            chunks = send()
+            for chunk in chunks:
+                if self.winner not in (None, name):
+                    return
+                self._events.put((name, "chunk", chunk))
+            self._events.put((name, "done", None))
+        except Exception as e:
+            self._events.put((name, "error", e))
+        finally:
+            # Closing a streamed response releases the connection of a losing request early
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
@@ -0,0 +1,211 @@
+"""
+LLM Providers Module
+Lazily loaded provider plugins used by the report generators' LLM analyzers
+
+Each provider wraps one SDK behind the same two calls (complete and stream). The SDK
+is only imported when a provider is created, so importing a report generator does
+not pay for openai, anthropic and google.generativeai when a run only ever uses one
+of them (this matters most for Cloud Function cold starts). New providers are added
+with register_provider().
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, Optional
+
+
+class LLMProvider(ABC):
+    """Base class for a provider plugin (a subclass missing load, complete or stream can't be created)"""
+
+    name = ""
+    display_name = ""
+    package = ""  # pip package, for the install hint
+    api_key_env_vars = ()  # checked in order
+    default_model = ""
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key or next((os.getenv(var) for var in self.api_key_env_vars if os.getenv(var)), None)
+        self.model = model or self.default_model
+        self.client = None
+
+    @abstractmethod
+    def load(self) -> "LLMProvider":
+        """Import the SDK and create the client (raises ImportError / ValueError with setup hints)"""
+
+    @abstractmethod
+    def complete(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Send one request and return the full response text"""
+
+    @abstractmethod
+    def stream(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Send one request and yield the response text as it is generated"""
+
+    def _missing_package(self) -> ImportError:
+        return ImportError(f"{self.package} package not installed. Run: pip install {self.package}")
+
+    def _require_api_key(self) -> None:
+        if not self.api_key:
+            raise ValueError(f"{self.display_name} API key not found. "
+                             f"Set {' or '.join(self.api_key_env_vars)} environment variable.")
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    display_name = "OpenAI"
+    package = "openai"
+    api_key_env_vars = ("OPENAI_API_KEY",)
+    default_model = "gpt-4o"  # or "gpt-4-turbo-preview"
+
+    def load(self) -> "OpenAIProvider":
+        try:
+            import openai
+        except ImportError:
+            raise self._missing_package()
+        self._require_api_key()
+        # Retries are handled by the shared rate limiter (see llm_rate_limiter.py)
+        self.client = openai.OpenAI(api_key=self.api_key, max_retries=0)
+        return self
+
+    def complete(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    def stream(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+
+class AnthropicProvider(LLMProvider):
+    name = "anthropic"
+    display_name = "Anthropic"
+    package = "anthropic"
+    api_key_env_vars = ("ANTHROPIC_API_KEY",)
+    default_model = "claude-3-5-sonnet-20241022"  # or "claude-3-opus-20240229"
+
+    def load(self) -> "AnthropicProvider":
+        try:
+            from anthropic import Anthropic
+        except ImportError:
+            raise self._missing_package()
+        self._require_api_key()
+        self.client = Anthropic(api_key=self.api_key, max_retries=0)
+        return self
+
+    def complete(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.content[0].text
+
+    def stream(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            yield from stream.text_stream
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+    display_name = "Gemini"
+    package = "google-generativeai"
+    api_key_env_vars = ("GEMINI_API_KEY", "GOOGLE_API_KEY")
+    default_model = "gemini-2.5-pro"  # Latest Gemini model
+
+    def load(self) -> "GeminiProvider":
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise self._missing_package()
+        self._require_api_key()
+        genai.configure(api_key=self.api_key)
+        self.genai = genai
+        self.client = genai.GenerativeModel(self.model)
+        return self
+
+    def complete(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        # Gemini takes the system prompt and user prompt combined
+        response = self.client.generate_content(
+            f"{system_prompt}\n\n{prompt}",
+            generation_config=self.genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            )
+        )
+        return response.text
+
+    def stream(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        response = self.client.generate_content(
+            f"{system_prompt}\n\n{prompt}",
+            generation_config=self.genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            ),
+            stream=True
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+_PROVIDERS: Dict[str, Callable[..., LLMProvider]] = {
+    OpenAIProvider.name: OpenAIProvider,
+    AnthropicProvider.name: AnthropicProvider,
+    GeminiProvider.name: GeminiProvider,
+}
+
+
+def register_provider(name: str, factory: Callable[..., LLMProvider]) -> None:
+    """Add a provider plugin (factory is called with api_key= and model=)"""
+    _PROVIDERS[name.lower()] = factory
+
+
+def available_providers():
+    """Names of the registered providers"""
+    return sorted(_PROVIDERS)
+
+
+def provider_api_key(name: str, api_key: Optional[str] = None) -> Optional[str]:
+    """API key a provider would use: the one given, or the first set environment variable"""
+    factory = _PROVIDERS.get(name.lower())
+    env_vars = getattr(factory, "api_key_env_vars", ())
+    return api_key or next((os.getenv(var) for var in env_vars if os.getenv(var)), None)
+
+
+def load_provider(name: str, api_key: Optional[str] = None, model: Optional[str] = None) -> LLMProvider:
+    """Create a provider and load its SDK"""
+    factory = _PROVIDERS.get(name.lower())
+    if factory is None:
+        quoted = ", ".join(f"'{provider}'" for provider in available_providers())
+        raise ValueError(f"Unsupported LLM provider: {name}. Use {quoted}")
+    return factory(api_key=api_key, model=model).load()
@@ -0,0 +1,177 @@
+"""
+LLM Rate Limiter Module
+Shared per-provider request scheduling for the report generators' LLM calls
+
+Every LLM call goes through the rate limiter of its provider, which keeps two token
+buckets: requests per minute (RPM) and prompt tokens per minute (TPM). Calls wait
+in turn until both buckets have room, so concurrent calls (map-reduce sections,
+hedged requests, several reports in one process) share a single budget instead of
+all hitting the API at once. When a call is still rate limited (HTTP 429), the
+provider's Retry-After hint is honored if it sent one, otherwise the call backs off
+exponentially with full jitter; either way the whole provider is paused, so the
+other queued calls don't stampede into the same 429.
+
+Limits default to DEFAULT_RATE_LIMITS and can be overridden per provider with
+<PROVIDER>_RPM_LIMIT / <PROVIDER>_TPM_LIMIT environment variables
+(e.g. GEMINI_TPM_LIMIT=250000).
+"""
+
+import os
+import re
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+from llm_hedging import is_quota_error
+from prompt_budget import DEFAULT_PROMPT_TOKEN_LIMITS
+
+T = TypeVar("T")
+
+# (requests per minute, prompt tokens per minute) per provider; the TPM defaults
+# match the prompt token budgets, which are sized to the same per-minute limits
+DEFAULT_RATE_LIMITS = {
+    "openai": (500, DEFAULT_PROMPT_TOKEN_LIMITS["openai"]),
+    "anthropic": (50, DEFAULT_PROMPT_TOKEN_LIMITS["anthropic"]),
+    "gemini": (150, DEFAULT_PROMPT_TOKEN_LIMITS["gemini"]),
+}
+
+# Back-off for 429s without a Retry-After hint: full jitter over base * 2^attempt, capped
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Token bucket that refills its full capacity evenly over a period"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if it can be taken now)"""
+        self._refill(now)
+        # A request larger than the bucket can never fit; it only waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.refill_rate)
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """The provider's retry hint from a rate limit error, if it sent one"""
+    # OpenAI / Anthropic SDK errors carry the HTTP response and its headers
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    # Gemini puts the delay in the error details, e.g. "retry_delay { seconds: 17 }" or "retry in 17.2s"
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(error)) or \
+        re.search(r"retry in ([\d.]+)\s*s", str(error), re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class ProviderRateLimiter:
+    """RPM/TPM scheduler with 429 back-off, shared by every LLM call to one provider"""
+
+    def __init__(self, provider: str, requests_per_minute: int, tokens_per_minute: int):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._state_lock = threading.Lock()
+        # Held while waiting for budget, so queued calls are sent one after another
+        self._queue_lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """Wait until one request of this many prompt tokens fits the budget; returns seconds waited"""
+        start = time.monotonic()
+        with self._queue_lock:
+            while True:
+                with self._state_lock:
+                    now = time.monotonic()
+                    wait = max(self._paused_until - now,
+                               self.requests.wait_time(1, now),
+                               self.tokens.wait_time(tokens, now))
+                    if wait <= 0:
+                        self.requests.take(1, now)
+                        self.tokens.take(tokens, now)
+                        return now - start
+                time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every call to this provider for the given time (after a 429)"""
+        with self._state_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def call(self, send: Callable[[], T], tokens: int, max_retries: int = 4) -> T:
+        """Send a request within the rate limits, retrying rate limit errors"""
+        for attempt in range(max_retries):
+            self._wait_for_budget(tokens)
+            try:
+                return send()
+            except Exception as e:
+                self._handle_error(e, attempt, max_retries, tokens)
+
+    def stream(self, send: Callable[[], Iterable[str]], tokens: int, max_retries: int = 4) -> Iterator[str]:
+        """Streaming version of call(); rate limit errors are only retried before the first chunk"""
+        for attempt in range(max_retries):
+            self._wait_for_budget(tokens)
+            started = False
+            try:
+                for chunk in send():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                self._handle_error(e, attempt, max_retries, tokens)
+
+    def _wait_for_budget(self, tokens: int) -> None:
+        waited = self.acquire(tokens)
+        if waited >= 1:
+            print(f"Waited {waited:.1f}s for {self.provider} rate limit budget (~{tokens:,} prompt tokens)")
+
+    def _handle_error(self, error: Exception, attempt: int, max_retries: int, tokens: int) -> None:
+        """Pause and return if a rate limit error should be retried, otherwise raise"""
+        if not is_quota_error(error):
+            raise error
+        if attempt >= max_retries - 1:
+            raise Exception(f"{self.provider} API quota exhausted after {max_retries} attempts "
+                            f"(prompt ~{tokens:,} tokens): {error}") from error
+        wait_time = retry_after_seconds(error)
+        if wait_time is None:
+            wait_time = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt + 1))))
+        print(f"{self.provider} API quota/rate limit hit. Retrying in {wait_time:.1f} seconds... "
+              f"(attempt {attempt + 1}/{max_retries})")
+        self.pause(wait_time)
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """The process-wide rate limiter for a provider (created on first use)"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            default_rpm, default_tpm = DEFAULT_RATE_LIMITS.get(provider, min(DEFAULT_RATE_LIMITS.values()))
+            rpm = int(os.getenv(f"{provider.upper()}_RPM_LIMIT") or default_rpm)
+            tpm = int(os.getenv(f"{provider.upper()}_TPM_LIMIT") or default_tpm)
+            _limiters[provider] = ProviderRateLimiter(provider, rpm, tpm)
+        return _limiters[provider]
@@ -18,6 +18,10 @@ const CONFIG = {
   PROJECT_ID: 'savvy-gtm-analytics',
   DATASET: 'savvy_analytics',
   SCRIPT_URL: 'https://script.google.com/macros/s/YOUR_SCRIPT_ID/exec', // Update after deployment
+  CLOUD_FUNCTION_URL: 'https://YOUR_REGION-YOUR_PROJECT.cloudfunctions.net/generate_capacity_report', // Update with your Cloud Function URL
+  // Run generation as a background job on the Cloud Function and poll for the result,
+  // instead of holding one request open until the report is done (or times out)
+  ASYNC_JOBS: true,
   FROM_EMAIL: 'reports@yourcompany.com', // Update with your email
   FROM_NAME: 'Capacity Report Generator'
 };
@@ -48,6 +52,16 @@ function doPost(e) {
       })).setMimeType(ContentService.MimeType.JSON);
     }
     
+    // Async: start the job and let the page poll checkReportStatus(), which sends the email
+    if (CONFIG.ASYNC_JOBS) {
+      const jobResult = startReportJob(llmProvider, generatePdf);
+      return ContentService.createTextOutput(JSON.stringify(
+        jobResult.success
+          ? { success: true, done: false, jobId: jobResult.jobId, email: email }
+          : jobResult
+      )).setMimeType(ContentService.MimeType.JSON);
+    }
+    
     // Generate the report
     const reportResult = generateReport(llmProvider, generatePdf);
     
@@ -88,7 +102,7 @@ function doPost(e) {
 function generateReport(llmProvider, generatePdf) {
   try {
     // Option 1: Call a Cloud Function that runs the Python script
-    const cloudFunctionUrl = 'https://YOUR_REGION-YOUR_PROJECT.cloudfunctions.net/generate_capacity_report';
+    const cloudFunctionUrl = CONFIG.CLOUD_FUNCTION_URL;
     
     const payload = {
       llm_provider: llmProvider,
@@ -130,6 +144,102 @@ function generateReport(llmProvider, generatePdf) {
   }
 }
 
+/**
+ * Start report generation as a background job on the Cloud Function
+ * Returns the job id to poll with checkReportStatus()
+ */
+function startReportJob(llmProvider, generatePdf) {
+  try {
+    const payload = {
+      llm_provider: llmProvider,
+      project_id: CONFIG.PROJECT_ID,
+      dataset: CONFIG.DATASET,
+      generate_pdf: generatePdf || false,
+      async: true
+    };
+    
+    const options = {
+      method: 'post',
+      contentType: 'application/json',
+      payload: JSON.stringify(payload),
+      muteHttpExceptions: true
+    };
+    
+    const response = UrlFetchApp.fetch(CONFIG.CLOUD_FUNCTION_URL, options);
+    const result = JSON.parse(response.getContentText());
+    
+    if (result.success && result.job_id) {
+      return { success: true, jobId: result.job_id };
+    }
+    return {
+      success: false,
+      error: result.error || 'Failed to start report generation'
+    };
+    
+  } catch (error) {
+    return {
+      success: false,
+      error: `Error starting report generation: ${error.toString()}`
+    };
+  }
+}
+
+/**
+ * Check a report job; once it has finished, email the report and return the final result
+ * Called from Page.html every few seconds until the result has done: true
+ */
+function checkReportStatus(jobId, email) {
+  try {
+    const statusUrl = `${CONFIG.CLOUD_FUNCTION_URL}?job_id=${encodeURIComponent(jobId)}`;
+    const response = UrlFetchApp.fetch(statusUrl, { method: 'get', muteHttpExceptions: true });
+    const result = JSON.parse(response.getContentText());
+    
+    if (result.status === 'queued' || result.status === 'running') {
+      return { success: true, done: false, status: result.status, stage: result.stage || null };
+    }
+    
+    if (result.status !== 'succeeded') {
+      return {
+        success: false,
+        done: true,
+        error: result.error || 'Failed to generate report'
+      };
+    }
+    
+    // Polls can overlap, so only the first one that sees the finished job sends the email
+    const cache = CacheService.getScriptCache();
+    const sentKey = `report_job_emailed_${jobId}`;
+    const lock = LockService.getScriptLock();
+    lock.waitLock(30000);
+    let emailSent;
+    try {
+      emailSent = cache.get(sentKey) === 'true';
+      if (!emailSent) {
+        emailSent = sendReportEmail(email, result.markdown, result.filename, result.pdf_url).success;
+        if (emailSent) {
+          cache.put(sentKey, 'true', 21600);  // 6 hours
+        }
+      }
+    } finally {
+      lock.releaseLock();
+    }
+    
+    return {
+      success: true,
+      done: true,
+      message: 'Report generated and sent successfully',
+      email: email,
+      filename: result.filename,
+      emailSent: emailSent,
+      pdfUrl: result.pdf_url || null
+    };
+    
+  } catch (error) {
+    // Transient fetch errors shouldn't stop the polling
+    return { success: true, done: false, status: 'unknown', error: error.toString() };
+  }
+}
+
 /**
  * Send the report via email
  */
@@ -0,0 +1,147 @@
+"""
+Prompt Budget Module
+Fits the LLM data summary into a per-provider prompt token budget
+
+The data summary is rendered section by section. When the estimated prompt size
+exceeds the budget, the top-N lists inside every section are shrunk step by step
+(e.g. "Top 15 SGMs" -> "Top 10"), and if that is not enough the lowest-priority
+sections are replaced by a one-line note. This keeps prompt size (and therefore
+latency and rate-limit usage) predictable as headcount grows, instead of finding
+out from a 429 that the prompt was too large.
+"""
+
+import math
+import os
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+# Prompt (input) token budgets, sized to typical per-minute input-token rate limits
+# for the models the report generators use. Override with LLM_PROMPT_TOKEN_LIMIT.
+DEFAULT_PROMPT_TOKEN_LIMITS = {
+    "openai": 30000,
+    "anthropic": 40000,
+    "gemini": 120000,
+}
+
+# Rough characters-per-token ratio for English markdown with many numbers/tables
+# (slightly conservative compared to the usual ~4 chars per token)
+CHARS_PER_TOKEN = 3.5
+
+# Sections at this priority are never dropped
+REQUIRED = 100
+
+# Top-N scale factors tried in order before sections are dropped
+DEFAULT_LIST_SCALES = (1.0, 0.67, 0.5, 0.34, 0.2)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text"""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def scale_top_n(n: int, scale: float, minimum: int = 3) -> int:
+    """Shrink a top-N list size by a scale factor (never below minimum)"""
+    if scale >= 1.0:
+        return n
+    return max(minimum, int(n * scale))
+
+
+def prompt_token_limit_for(provider: str, override: Optional[int] = None) -> int:
+    """Prompt token budget for a provider (explicit override > LLM_PROMPT_TOKEN_LIMIT > default)"""
+    if override:
+        return override
+    env_limit = os.getenv("LLM_PROMPT_TOKEN_LIMIT")
+    if env_limit:
+        return int(env_limit)
+    return DEFAULT_PROMPT_TOKEN_LIMITS.get(provider, min(DEFAULT_PROMPT_TOKEN_LIMITS.values()))
+
+
+class PromptBudgeter:
+    """Assembles a data summary from prioritized sections within a token budget"""
+
+    def __init__(self, max_prompt_tokens: int, section_priorities: Optional[Dict[str, int]] = None,
+                 list_scales: Sequence[float] = DEFAULT_LIST_SCALES):
+        """
+        Args:
+            max_prompt_tokens: Budget for the whole prompt (system prompt + instructions + data)
+            section_priorities: Section name -> priority; lower priorities are dropped first,
+                                REQUIRED sections are never dropped (unknown sections default to 1)
+            list_scales: Top-N scale factors to try, largest first
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.section_priorities = section_priorities or {}
+        self.list_scales = list_scales
+        self.last_fit: Dict = {}
+
+    def fit(self, render_sections: Callable[[float], Iterable[Tuple[str, str]]],
+            reserved_tokens: int = 0) -> str:
+        """
+        Render the data summary so that it fits in the budget
+
+        Args:
+            render_sections: Called with a top-N scale factor; yields (section_name, text)
+            reserved_tokens: Tokens already used by the rest of the prompt (system prompt,
+                             instructions) that the data summary has to fit around
+
+        Returns:
+            The assembled data summary
+        """
+        budget = self.max_prompt_tokens - reserved_tokens
+
+        for list_scale in self.list_scales:
+            sections = list(render_sections(list_scale))
+            section_tokens = [estimate_tokens(text) for _, text in sections]
+            if sum(section_tokens) <= budget:
+                break
+
+        # Still over budget at the smallest list sizes: drop the lowest-priority sections
+        dropped = []
+        total_tokens = sum(section_tokens)
+        if total_tokens > budget:
+            drop_order = sorted(range(len(sections)),
+                                key=lambda i: self.section_priorities.get(sections[i][0], 1))
+            for i in drop_order:
+                if total_tokens <= budget:
+                    break
+                name, text = sections[i]
+                if self.section_priorities.get(name, 1) >= REQUIRED:
+                    continue
+                placeholder = self._omitted_placeholder(text)
+                total_tokens -= section_tokens[i] - estimate_tokens(placeholder)
+                dropped.append((i, name, text, section_tokens[i]))
+                section_tokens[i] = estimate_tokens(placeholder)
+                sections[i] = (name, placeholder)
+
+            # Dropping one large section can free enough room to bring back smaller
+            # ones that were dropped before it (highest priority first)
+            for i, name, text, tokens in reversed(dropped[:-1]):
+                if total_tokens - section_tokens[i] + tokens <= budget:
+                    total_tokens += tokens - section_tokens[i]
+                    section_tokens[i] = tokens
+                    sections[i] = (name, text)
+            dropped = [name for i, name, text, _ in dropped if sections[i][1] != text]
+
+        self.last_fit = {
+            'max_prompt_tokens': self.max_prompt_tokens,
+            'estimated_prompt_tokens': total_tokens + reserved_tokens,
+            'list_scale': list_scale,
+            'dropped_sections': dropped,
+            'section_tokens': {name: tokens for (name, _), tokens in zip(sections, section_tokens)},
+        }
+
+        status = f"Prompt size: ~{total_tokens + reserved_tokens:,} of {self.max_prompt_tokens:,} tokens"
+        if list_scale < 1.0:
+            status += f" (top-N lists scaled to {list_scale:.0%})"
+        if dropped:
+            status += f" (omitted sections: {', '.join(dropped)})"
+        if total_tokens > budget:
+            status += " - still over budget"
+        print(status)
+
+        return "".join(text for _, text in sections)
+
+    @staticmethod
+    def _omitted_placeholder(text: str) -> str:
+        """Keep a section's heading and replace its body with a short note"""
+        heading = next((line for line in text.splitlines() if line.startswith("#")), "")
+        note = "*Section omitted to fit the prompt size budget.*\n"
+        return f"\n{heading}\n{note}" if heading else f"\n{note}"
@@ -0,0 +1,134 @@
+"""
+Query Result Cache Module
+On-disk Parquet cache for BigQuery query results, shared by the report generators
+
+Entries are keyed on the normalized query text, project/dataset and the as-of date,
+so re-running a report on the same day (e.g. after an LLM quota error) reuses the
+results instead of re-executing every query. Entries older than max_staleness are
+ignored, and the least recently used files are evicted once the cache exceeds its
+size limit.
+"""
+
+import os
+import re
+import glob
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+# pandas is imported when a result is first read (keeps importing the report modules fast)
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class QueryResultCache:
+    """On-disk Parquet cache for query results with TTL and LRU size eviction"""
+
+    def __init__(self, cache_dir: str, project_id: str, dataset: str,
+                 max_staleness: int = 43200, max_size_mb: int = 500):
+        """
+        Args:
+            cache_dir: Directory that holds the Parquet files
+            project_id: BigQuery project the queries run against
+            dataset: BigQuery dataset the queries read from
+            max_staleness: Maximum age of a cached result in seconds (default: 12 hours)
+            max_size_mb: Total cache size before least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.project_id = project_id
+        self.dataset = dataset
+        self.max_staleness = max_staleness
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, query: str, as_of: Optional[str] = None) -> str:
+        """Build the cache key for a query (whitespace-insensitive)"""
+        normalized_query = re.sub(r"\s+", " ", query).strip()
+        as_of = as_of or datetime.now().strftime("%Y-%m-%d")
+        key_source = f"{self.project_id}|{self.dataset}|{as_of}|{normalized_query}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> Optional["pd.DataFrame"]:
+        """Return the cached result for a query, or None on a miss or stale entry"""
+        key = self.make_key(query)
+        for path in glob.glob(os.path.join(self.cache_dir, f"{key}__*.parquet")):
+            created_at = self._created_at(path)
+            if time.time() - created_at > self.max_staleness:
+                self._remove(path)
+                continue
+            try:
+                import pandas as pd
+                df = pd.read_parquet(path)
+            except Exception as e:
+                print(f"Warning: Could not read cached result {path}: {e}")
+                self._remove(path)
+                continue
+            # Touch the file so LRU eviction sees it as recently used
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return df
+        return None
+
+    def put(self, query: str, df: "pd.DataFrame") -> None:
+        """Store a query result and evict old entries if the cache is over its size limit"""
+        key = self.make_key(query)
+        path = os.path.join(self.cache_dir, f"{key}__{int(time.time())}.parquet")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # Caching is best-effort; never fail a report because a result couldn't be stored
+            print(f"Warning: Could not cache query result: {e}")
+            self._remove(tmp_path)
+            return
+
+        # Drop older entries for the same key
+        for old_path in glob.glob(os.path.join(self.cache_dir, f"{key}__*.parquet")):
+            if old_path != path:
+                self._remove(old_path)
+
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every cached result"""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.parquet")):
+            self._remove(path)
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the cache fits in max_size_bytes"""
+        with self._lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.cache_dir, "*.parquet")):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                self._remove(path)
+                total_size -= size
+
+    @staticmethod
+    def _created_at(path: str) -> float:
+        """Creation time encoded in the file name (mtime is reused for LRU ordering)"""
+        try:
+            return float(os.path.basename(path).split("__")[1].split(".")[0])
+        except (IndexError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,126 @@
+"""
+Report Dataset Module
+Query results of one capacity report run, with the derived views both report stages need
+
+The LLM prompt builder (LLMAnalyzer) and the report formatter (CapacityReportGenerator)
+read the same query results, and both used to sort and filter them on their own: SGMs
+by required SQOs, what-if routing by gap priority, SGAs by rate change, and the totals
+over each. The prompt is also rebuilt several times per run when it is fitted to the
+token budget. A ReportDataset is built once after the queries return; its sort orders,
+table slices and totals are computed once and shared by every reader.
+
+Lists in a ReportDataset are shared, not copied: treat them as read-only.
+"""
+
+from typing import Dict, List
+
+from conversion_rate_index import ConversionRateIndex, SGAConversionRates
+
+# Rows shown in the report's appendix tables
+REQUIRED_SQOS_TABLE_SIZE = 20
+WHAT_IF_TABLE_SIZE = 30
+DEALS_TABLE_SIZE = 15
+SGA_TABLE_SIZE = 15
+
+
+def _what_if_priority(row: Dict) -> tuple:
+    """Current quarter gaps first (largest first), then next quarter gaps"""
+    return (
+        row.get('current_qtr_gap_millions', 0) > 0,  # Current quarter gaps first
+        -row.get('current_qtr_gap_millions', 0),  # Largest gaps first
+        row.get('next_qtr_gap_millions', 0) > 0,  # Then next quarter gaps
+        -row.get('next_qtr_gap_millions', 0)
+    )
+
+
+def _totals(rows: List[Dict], columns: List[str]) -> Dict[str, float]:
+    """{column: sum over rows} in one pass (missing values count as 0)"""
+    totals = dict.fromkeys(columns, 0)
+    for row in rows:
+        for column in columns:
+            totals[column] += row.get(column, 0)
+    return totals
+
+
+class ReportDataset:
+    """Capacity report query results plus precomputed sort orders, slices and totals"""
+
+    __slots__ = (
+        # Query results
+        'firm_summary', 'coverage_summary', 'sgm_coverage_data', 'sgm_risk_data', 'deals_data',
+        'conversion_rates', 'conversion_trends_data', 'sga_conversion_rates',
+        'quarterly_forecast_data', 'forecast_velocity_data', 'what_if_analysis_data',
+        'concentration_data', 'stage_dist_data',
+        # Derived
+        'sgms_by_required_sqos', 'required_sqos_table', 'deals_table', 'sga_table',
+        'what_if_by_priority', 'what_if_table', 'what_if_totals',
+        'what_if_current_qtr_gaps', 'what_if_next_qtr_gaps', 'what_if_current_gap_totals',
+        'what_if_next_gap_totals', 'velocity_by_current_qtr', 'velocity_totals',
+        'forecast_by_actuals', 'forecast_totals', 'concentration_by_pct',
+    )
+
+    def __init__(self, firm_summary: Dict, coverage_summary: Dict,
+                 sgm_coverage_data: List[Dict], sgm_risk_data: List[Dict],
+                 deals_data: List[Dict], conversion_rates_data: List[Dict],
+                 conversion_trends_data: List[Dict], sga_conversion_rates_data: List[Dict],
+                 quarterly_forecast_data: List[Dict], forecast_velocity_data: List[Dict],
+                 what_if_analysis_data: List[Dict], concentration_data: List[Dict],
+                 stage_dist_data: List[Dict]):
+        self.firm_summary = firm_summary
+        self.coverage_summary = coverage_summary
+        self.sgm_coverage_data = sgm_coverage_data
+        self.sgm_risk_data = sgm_risk_data
+        self.deals_data = deals_data
+        self.conversion_rates = ConversionRateIndex.of(conversion_rates_data)
+        self.conversion_trends_data = conversion_trends_data
+        self.sga_conversion_rates = SGAConversionRates.of(sga_conversion_rates_data)
+        self.quarterly_forecast_data = quarterly_forecast_data
+        self.forecast_velocity_data = forecast_velocity_data
+        self.what_if_analysis_data = what_if_analysis_data
+        self.concentration_data = concentration_data
+        self.stage_dist_data = stage_dist_data
+
+        # Required metrics: SGMs with a requirement, highest required SQOs first
+        self.sgms_by_required_sqos = sorted(
+            [s for s in sgm_risk_data if s.get('required_sqos_per_quarter') is not None],
+            key=lambda x: x.get('required_sqos_per_quarter', 0),
+            reverse=True
+        )
+        self.required_sqos_table = self.sgms_by_required_sqos[:REQUIRED_SQOS_TABLE_SIZE]
+        self.deals_table = deals_data[:DEALS_TABLE_SIZE]
+        self.sga_table = self.sga_conversion_rates.by_rate_change[:SGA_TABLE_SIZE]
+
+        # What-if routing: priority order, the gap groups and their totals
+        self.what_if_by_priority = sorted(what_if_analysis_data, key=_what_if_priority, reverse=True)
+        self.what_if_table = self.what_if_by_priority[:WHAT_IF_TABLE_SIZE]
+        self.what_if_current_qtr_gaps = []
+        self.what_if_next_qtr_gaps = []
+        for row in self.what_if_by_priority:
+            if row.get('current_qtr_gap_millions', 0) > 0:
+                self.what_if_current_qtr_gaps.append(row)
+            if row.get('next_qtr_gap_millions', 0) > 0 and row.get('current_qtr_gap_millions', 0) <= 0:
+                self.what_if_next_qtr_gaps.append(row)
+        needed_columns = ['sqos_needed_current_qtr', 'sqls_needed_current_qtr',
+                          'sqos_needed_next_qtr', 'sqls_needed_next_qtr']
+        self.what_if_totals = _totals(self.what_if_by_priority, needed_columns)
+        self.what_if_current_gap_totals = _totals(self.what_if_current_qtr_gaps, needed_columns)
+        self.what_if_next_gap_totals = _totals(self.what_if_next_qtr_gaps, needed_columns)
+
+        # Velocity and quarterly forecasts: firm-wide totals and SGM order
+        self.velocity_by_current_qtr = sorted(forecast_velocity_data,
+                                              key=lambda x: x.get('current_qtr_velocity_forecast', 0),
+                                              reverse=True)
+        self.velocity_totals = _totals(forecast_velocity_data, [
+            'current_qtr_velocity_forecast', 'overdue_slip_forecast', 'next_qtr_velocity_forecast',
+            'overdue_deal_count', 'next_qtr_deal_count'])
+        self.forecast_by_actuals = sorted(quarterly_forecast_data,
+                                          key=lambda x: x.get('current_quarter_actuals', 0),
+                                          reverse=True)
+        self.forecast_totals = _totals(quarterly_forecast_data, [
+            'current_quarter_actuals', 'expected_end_of_quarter', 'expected_next_quarter'])
+
+        # Concentration risk: highest top-deal share first
+        self.concentration_by_pct = sorted(concentration_data,
+                                           key=lambda x: x.get('top_deal_concentration_pct', 0),
+                                           reverse=True)
+
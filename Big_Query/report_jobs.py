@@ -0,0 +1,139 @@
+"""
+Report Jobs Module
+Background report generation with pollable job status, for the Cloud Function's async mode
+
+A job is submitted with a function that generates the report; the caller gets a job
+id back immediately while the report is generated on a worker thread. The job record
+(status, current stage, and finally the markdown / PDF URL or the error) is kept in a
+job store and served by the status endpoint.
+
+Job stores:
+- InMemoryJobStore: the default; status requests have to reach the same instance
+  that runs the job (e.g. a Cloud Function deployed with --max-instances 1)
+- GCSJobStore: job records are JSON objects in a Cloud Storage bucket, so any
+  instance can answer status requests (set REPORT_JOBS_BUCKET)
+"""
+
+import os
+import json
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+
+class InMemoryJobStore:
+    """Job records held in this process (lost on restart, not shared between instances)"""
+
+    def __init__(self, max_age_hours: int = 24):
+        self.max_age = timedelta(hours=max_age_hours)
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Dict) -> None:
+        with self._lock:
+            self._jobs[job['job_id']] = dict(job)
+            # Drop finished jobs nobody collected
+            cutoff = (datetime.now() - self.max_age).isoformat()
+            for job_id in [j for j, record in self._jobs.items() if record['updated_at'] < cutoff]:
+                del self._jobs[job_id]
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class GCSJobStore:
+    """Job records stored as JSON objects in a Cloud Storage bucket"""
+
+    def __init__(self, bucket_name: str, prefix: str = "report_jobs/"):
+        """
+        Args:
+            bucket_name: Existing bucket (use a lifecycle rule to delete old job records)
+            prefix: Object name prefix for job records
+        """
+        # Imported here rather than at module level to keep Cloud Function cold starts fast
+        try:
+            from google.cloud import storage
+        except ImportError:
+            raise ImportError("google-cloud-storage package not installed. Run: pip install google-cloud-storage")
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix
+
+    def save(self, job: Dict) -> None:
+        blob = self.bucket.blob(f"{self.prefix}{job['job_id']}.json")
+        blob.upload_from_string(json.dumps(job, default=str), content_type='application/json')
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        from google.api_core.exceptions import NotFound
+        try:
+            return json.loads(self.bucket.blob(f"{self.prefix}{job_id}.json").download_as_text())
+        except NotFound:
+            return None
+
+
+def default_job_store():
+    """GCSJobStore if REPORT_JOBS_BUCKET is set, otherwise InMemoryJobStore"""
+    bucket_name = os.getenv("REPORT_JOBS_BUCKET")
+    if bucket_name:
+        return GCSJobStore(bucket_name)
+    return InMemoryJobStore()
+
+
+class ReportJobs:
+    """Runs report generation jobs in the background and tracks their status"""
+
+    def __init__(self, store=None, max_concurrent_jobs: int = 2):
+        """
+        Args:
+            store: Job store (default: default_job_store())
+            max_concurrent_jobs: Jobs generated at the same time; later jobs wait as "queued"
+        """
+        self.store = store or default_job_store()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="report-job")
+
+    def submit(self, run: Callable[[Callable[[str], None]], Dict], params: Optional[Dict] = None) -> Dict:
+        """
+        Start a job
+
+        Args:
+            run: Generates the report; called with a progress function (takes the name of
+                 the stage being started) and returns the result fields (markdown, filename, ...)
+            params: Request parameters to keep on the job record
+
+        Returns:
+            The new job record
+        """
+        now = datetime.now().isoformat()
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'stage': None,
+            'params': params or {},
+            'created_at': now,
+            'updated_at': now,
+            'result': None,
+            'error': None,
+        }
+        self.store.save(job)
+        self._executor.submit(self._run_job, dict(job), run)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Current record of a job, or None if it is unknown (or expired)"""
+        return self.store.load(job_id)
+
+    def _run_job(self, job: Dict, run: Callable[[Callable[[str], None]], Dict]) -> None:
+        def update(**fields):
+            job.update(fields, updated_at=datetime.now().isoformat())
+            self.store.save(job)
+
+        update(status='running')
+        try:
+            result = run(lambda stage: update(stage=stage))
+            update(status='succeeded', stage=None, result=result)
+        except Exception as e:
+            print(f"Report job {job['job_id']} failed: {e}")
+            update(status='failed', error=str(e))
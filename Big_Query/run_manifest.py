@@ -0,0 +1,126 @@
+"""
+Run Manifest Module
+Collects execution statistics for a report run and writes them as JSON
+
+For every query the manifest records wall time, queue time, bytes processed,
+bytes billed, slot-milliseconds, cache hit and row count (taken from the BigQuery
+QueryJob), plus wall-clock totals for the other stages of the run (LLM analysis,
+report formatting, ...). The JSON file is written next to the markdown report.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+class RunManifest:
+    """Per-run execution statistics for queries and report stages"""
+
+    def __init__(self, report_name: str, on_stage: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            report_name: Report the manifest belongs to (e.g. "capacity_summary")
+            on_stage: Called with the stage name whenever a stage starts (progress reporting)
+        """
+        self.report_name = report_name
+        self.on_stage = on_stage
+        self.started_at = datetime.now()
+        self.queries: List[Dict] = []
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_query(self, name: str, query_job=None, wall_time: float = 0.0,
+                     rows: int = 0, source: str = "bigquery") -> None:
+        """
+        Record statistics for one query
+
+        Args:
+            name: Query name (e.g. "firm_summary" or "query_a")
+            query_job: The finished QueryJob, if the query ran in BigQuery
+            wall_time: Seconds from submission until the result was downloaded
+            rows: Number of result rows
+            source: Where the result came from ("bigquery", "local_cache", "replay", ...)
+        """
+        entry = {
+            'name': name,
+            'source': source,
+            'wall_time_s': round(wall_time, 3),
+            'rows': int(rows),
+            'job_id': None,
+            'queue_time_s': None,
+            'execution_time_s': None,
+            'bytes_processed': None,
+            'bytes_billed': None,
+            'slot_ms': None,
+            'cache_hit': None,
+        }
+
+        if query_job is not None:
+            created = getattr(query_job, 'created', None)
+            started = getattr(query_job, 'started', None)
+            ended = getattr(query_job, 'ended', None)
+            entry.update({
+                'job_id': getattr(query_job, 'job_id', None),
+                'queue_time_s': round((started - created).total_seconds(), 3) if created and started else None,
+                'execution_time_s': round((ended - started).total_seconds(), 3) if started and ended else None,
+                'bytes_processed': getattr(query_job, 'total_bytes_processed', None),
+                'bytes_billed': getattr(query_job, 'total_bytes_billed', None),
+                'slot_ms': getattr(query_job, 'slot_millis', None),
+                'cache_hit': getattr(query_job, 'cache_hit', None),
+            })
+
+        with self._lock:
+            self.queries.append(entry)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage of the run (e.g. "queries", "llm_analysis", "formatting")"""
+        if self.on_stage is not None:
+            self.on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - start, 3)
+
+    def to_dict(self) -> Dict:
+        """Manifest contents, including per-run totals"""
+        with self._lock:
+            queries = sorted(self.queries, key=lambda q: q['name'])
+            stages = dict(self.stages)
+
+        return {
+            'report': self.report_name,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'stages': stages,
+            'totals': {
+                'queries': len(queries),
+                'query_wall_time_s': round(sum(q['wall_time_s'] for q in queries), 3),
+                'bytes_processed': sum(q['bytes_processed'] or 0 for q in queries),
+                'bytes_billed': sum(q['bytes_billed'] or 0 for q in queries),
+                'slot_ms': sum(q['slot_ms'] or 0 for q in queries),
+                'rows': sum(q['rows'] for q in queries),
+                'run_time_s': round((datetime.now() - self.started_at).total_seconds(), 3),
+            },
+            'queries': queries,
+        }
+
+    def write(self, path: str) -> None:
+        """Write the manifest as JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    @staticmethod
+    def path_for_report(report_path: str) -> str:
+        """Manifest path next to a report file (report.md -> report.manifest.json)"""
+        base, _ = os.path.splitext(report_path)
+        return f"{base}.manifest.json"